@@ -0,0 +1,179 @@
+import argparse
+import json
+import logging
+import os
+import platform
+import sys
+import time
+from datetime import timedelta
+from benchmarks.synthetic import generate_events, generate_bars, generate_hourly_bars
+from trading.backtest import HistoricalBars, SimulatedBroker
+from trading.data import MarketData
+from trading.indicators import RollingWindow
+from trading.strategy import TradingStrategy
+from utils.clock import SimulatedClock
+from utils.metrics import LatencyHistogram
+
+BASELINE_PATH = os.path.join(os.path.dirname(__file__), 'baseline.json')
+
+# Benchmarks must not measure log I/O
+_logger = logging.getLogger('benchmark')
+_logger.setLevel(logging.CRITICAL)
+_logger.propagate = False
+
+def _measure(operations):
+    """Run each zero-argument callable once, timing each call"""
+    histogram = LatencyHistogram()
+    clock = time.perf_counter_ns
+    started = clock()
+    for operation in operations:
+        begin = clock()
+        operation()
+        histogram.record(clock() - begin)
+    elapsed = (clock() - started) / 1e9
+    return {
+        'ops': histogram.count,
+        'ops_per_sec': histogram.count / elapsed if elapsed else 0.0,
+        'p50_us': histogram.percentile(50) / 1e3,
+        'p99_us': histogram.percentile(99) / 1e3,
+    }
+
+def bench_rolling_window(size, count):
+    window = RollingWindow(size)
+    events = generate_events("SYN/USD", count)
+    return _measure(
+        (lambda bar=bar: window.append(bar.close)) if kind == "bar" else (lambda bar=bar: window.replace_last(bar.close))
+        for kind, bar in events
+    )
+
+def bench_market_data(window, symbols, count):
+    names = [f"SYN{i}/USD" for i in range(symbols)]
+    market_data = MarketData(_logger, bar_cache=object(), symbols=names, start_stream=False, window=window)
+    # Interleave every symbol's stream the way one shared connection delivers it
+    streams = [generate_events(name, count // symbols, seed=i) for i, name in enumerate(names)]
+    events = [event for batch in zip(*streams) for event in batch]
+
+    def handle(kind, bar):
+        if kind == "bar":
+            market_data._on_bar(bar)
+        else:
+            market_data._on_update(bar)
+        market_data.events.wait(timeout=0)
+
+    return _measure((lambda kind=kind, bar=bar: handle(kind, bar)) for kind, bar in events)
+
+def _strategy(count, local_min_window=5):
+    symbol = "SYN/USD"
+    bars = generate_bars(symbol, count)
+    hourly = generate_hourly_bars(symbol, count // 60 + 48, seed=1, start=bars[0].timestamp - timedelta(hours=48))
+    clock = SimulatedClock(bars[0].timestamp)
+    bar_source = HistoricalBars({symbol: hourly}, clock)
+    broker = SimulatedBroker(bar_source, clock, _logger)
+    market_data = MarketData(_logger, bar_source, [symbol], start_stream=False)
+    market_data.seed_resamplers(bars[0].timestamp)
+    strategy = TradingStrategy(broker, market_data, _logger, symbol=symbol, clock=clock,
+                               params={'local_min_window': local_min_window})
+    # (price, hourly view) per bar as the stream side publishes them, built outside the timed calls
+    inputs = []
+    for bar in bars:
+        market_data._on_bar(bar)
+        market_data.events.wait(timeout=0)
+        inputs.append((bar.close, market_data.get_snapshot(symbol).hourly))
+    return strategy, inputs
+
+def bench_should_buy(local_min_window, count):
+    strategy, inputs = _strategy(count, local_min_window)
+    return _measure((lambda price=price, hourly=hourly: strategy.should_buy(price, hourly, "bar"))
+                    for price, hourly in inputs)
+
+def bench_analyze_hourly_pattern(count):
+    strategy, inputs = _strategy(count)
+    return _measure((lambda price=price, hourly=hourly: strategy.analyze_hourly_pattern(price, hourly))
+                    for price, hourly in inputs)
+
+def bench_is_local_minimum(window, count):
+    # Each call records a minute price and checks the window, as should_buy does
+    strategy, inputs = _strategy(count, window)
+
+    def check(price):
+        strategy.local_min_window.append(price)
+        strategy.is_local_minimum()
+
+    return _measure((lambda price=price: check(price)) for price, _ in inputs)
+
+def benchmarks(quick=False):
+    """(name, callable) for every benchmark in the suite"""
+    n = 20000 if quick else 200000
+    suite = []
+    for size in (30, 500, 5000):
+        suite.append((f"rolling_window[size={size}]", lambda size=size: bench_rolling_window(size, n)))
+    for window in (500, 5000):
+        for symbols in (1, 10, 50):
+            suite.append((f"market_data[window={window},symbols={symbols}]",
+                          lambda window=window, symbols=symbols: bench_market_data(window, symbols, n)))
+    for window in (5, 15, 61):
+        suite.append((f"should_buy[local_min_window={window}]",
+                      lambda window=window: bench_should_buy(window, n // 4)))
+    suite.append(("analyze_hourly_pattern", lambda: bench_analyze_hourly_pattern(n // 4)))
+    for window in (5, 51, 501):
+        suite.append((f"is_local_minimum[window={window}]", lambda window=window: bench_is_local_minimum(window, n // 4)))
+    return suite
+
+def compare(results, baseline, threshold):
+    """Print throughput against the baseline; return the names that regressed"""
+    regressions = []
+    for name, result in results.items():
+        before = baseline.get('results', {}).get(name)
+        if not before:
+            continue
+        change = result['ops_per_sec'] / before['ops_per_sec'] - 1
+        flag = ""
+        if change < -threshold:
+            flag = "  REGRESSION"
+            regressions.append(name)
+        print(f"  {name:<45} {change * 100:+7.1f}% ops/s vs baseline{flag}")
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline benchmarks for the data and strategy hot paths")
+    parser.add_argument('--quick', action='store_true', help="fewer iterations, for a fast check")
+    parser.add_argument('--filter', help="only run benchmarks whose name contains this")
+    parser.add_argument('--baseline', default=BASELINE_PATH)
+    parser.add_argument('--save', action='store_true', help="store these results as the new baseline")
+    parser.add_argument('--threshold', type=float, default=0.2, help="throughput drop that counts as a regression")
+    args = parser.parse_args()
+
+    results = {}
+    for name, bench in benchmarks(args.quick):
+        if args.filter and args.filter not in name:
+            continue
+        results[name] = bench()
+        r = results[name]
+        print(f"{name:<47} {r['ops_per_sec']:>12,.0f} ops/s  p50 {r['p50_us']:8.2f}us  p99 {r['p99_us']:8.2f}us")
+
+    regressions = []
+    if os.path.exists(args.baseline) and not args.save:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        print(f"\nCompared with baseline from {baseline.get('created', 'unknown')}:")
+        here = (platform.python_version(), platform.machine())
+        if (baseline.get('python'), baseline.get('machine')) != here:
+            print(f"  (recorded on Python {baseline.get('python')} {baseline.get('machine')}, running on Python "
+                  f"{here[0]} {here[1]}; refresh it with --save for a fair comparison)")
+        regressions = compare(results, baseline, args.threshold)
+
+    if args.save:
+        with open(args.baseline, 'w') as f:
+            json.dump({
+                'created': time.strftime('%Y-%m-%d %H:%M:%S'),
+                'python': platform.python_version(),
+                'machine': platform.machine(),
+                'quick': args.quick,
+                'results': results,
+            }, f, indent=2)
+        print(f"\nSaved baseline to {args.baseline}")
+
+    sys.exit(1 if regressions else 0)
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
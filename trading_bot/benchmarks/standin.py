@@ -0,0 +1,617 @@
+import argparse
+import asyncio
+import json
+import logging
+import random
+import threading
+import time
+import uuid
+from bisect import bisect_left, bisect_right
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+import msgpack
+from websockets.asyncio.server import serve
+from websockets.exceptions import ConnectionClosed
+from benchmarks.synthetic import generate_events
+from trading.bars import Bar, load_bars_csv, resample_bars
+
+# Bar lengths in seconds for the timeframes the bot requests
+TIMEFRAMES = {'1Min': 60, '1Hour': 3600, '1Day': 86400}
+
+ACCOUNT_ID = str(uuid.uuid5(uuid.NAMESPACE_URL, 'standin-account'))
+
+def _epoch(timestamp):
+    return int(timestamp.timestamp())
+
+def _iso(seconds):
+    return datetime.fromtimestamp(seconds, timezone.utc).isoformat().replace('+00:00', 'Z')
+
+def _parse_time(value, default):
+    if not value:
+        return default
+    return _epoch(datetime.fromisoformat(value.replace('Z', '+00:00')))
+
+def _rest_bar(bar):
+    return {'t': _iso(_epoch(bar.timestamp)), 'o': bar.open, 'h': bar.high, 'l': bar.low, 'c': bar.close,
+            'v': bar.volume, 'n': 0, 'vw': bar.close}
+
+def _stream_bar(kind, bar):
+    return {'T': 'b' if kind == "bar" else 'u', 'S': bar.symbol, 'o': bar.open, 'h': bar.high, 'l': bar.low,
+            'c': bar.close, 'v': bar.volume, 't': msgpack.Timestamp(_epoch(bar.timestamp)), 'n': 0,
+            'vw': bar.close}
+
+def _stream_ticks(symbol, price, seconds, trade_id, spread=0.0002):
+    """A quote around `price` and a trade at it, as crypto stream messages"""
+    timestamp = msgpack.Timestamp.from_unix(seconds)
+    return [{'T': 'q', 'S': symbol, 'bp': price * (1 - spread / 2), 'bs': 1.0, 'ap': price * (1 + spread / 2),
+             'as': 1.0, 't': timestamp},
+            {'T': 't', 'S': symbol, 'p': price, 's': 0.01, 't': timestamp, 'i': trade_id, 'tks': 'B'}]
+
+class ReplayFeed:
+    """Minute bars for every symbol, released on a clock running `speed` times real time.
+
+    The replay clock starts at `origin`; bars before it are history that is
+    only served over REST. A bar (and any correction of it) goes out on the
+    stream once its minute has closed on the replay clock, and only then
+    shows up in REST responses.
+    """
+    def __init__(self, events_by_symbol, origin, speed=1.0):
+        self.origin = origin
+        self.speed = speed
+        self.started = time.monotonic()
+        self.events = {}  # symbol -> [(close time, kind, bar)], oldest first
+        self.bars = {}  # symbol -> final minute bars, oldest first
+        self.times = {}  # symbol -> start of each of those bars, epoch seconds
+        self.cursors = {}  # symbol -> index of the next event to release
+        self.prices = {}  # symbol -> latest released close
+        self._resampled = {}
+        for symbol, events in events_by_symbol.items():
+            self.events[symbol] = [(_epoch(bar.timestamp) + 60, kind, bar) for kind, bar in events]
+            final = {}
+            for _, bar in events:
+                final[bar.timestamp] = bar
+            self.bars[symbol] = list(final.values())
+            self.times[symbol] = [_epoch(bar.timestamp) for bar in self.bars[symbol]]
+            cursor = bisect_right([closes for closes, _, _ in self.events[symbol]], origin)
+            self.cursors[symbol] = cursor
+            self.prices[symbol] = self.events[symbol][cursor - 1][2].close if cursor else None
+
+    @property
+    def symbols(self):
+        return list(self.events)
+
+    def now(self):
+        """Replay clock, epoch seconds"""
+        return self.origin + (time.monotonic() - self.started) * self.speed
+
+    def finished(self):
+        return all(self.cursors[symbol] == len(events) for symbol, events in self.events.items())
+
+    def release(self):
+        """(kind, bar) for every event that became due since the last call"""
+        now = self.now()
+        released = []
+        for symbol, events in self.events.items():
+            cursor = self.cursors[symbol]
+            while cursor < len(events) and events[cursor][0] <= now:
+                _, kind, bar = events[cursor]
+                released.append((kind, bar))
+                self.prices[symbol] = bar.close
+                cursor += 1
+            self.cursors[symbol] = cursor
+        return released
+
+    def price_now(self, symbol):
+        """Latest released close, moved toward the next bar's close as its minute passes"""
+        previous = self.prices[symbol]
+        events, cursor = self.events[symbol], self.cursors[symbol]
+        if previous is None or cursor == len(events):
+            return previous
+        closes_at, _, bar = events[cursor]
+        progress = min(max(1 - (closes_at - self.now()) / 60, 0.0), 1.0)
+        return previous + (bar.close - previous) * progress
+
+    def get_bars(self, symbol, period, start, end):
+        """Released bars of `period` seconds starting in [start, end], plus the forming bar"""
+        if symbol not in self.bars:
+            return []
+        now = self.now()
+        if period == 60:
+            bars, times = self.bars[symbol], self.times[symbol]
+        else:
+            bars, times = self._resample(symbol, period)
+        complete = bars[bisect_left(times, start):bisect_right(times, min(end, now - period))]
+
+        # Like Alpaca, longer timeframes include the bar still being formed
+        forming = int(now // period * period)
+        if period > 60 and start <= forming <= end:
+            minutes = self.bars[symbol][bisect_left(self.times[symbol], forming):
+                                        bisect_right(self.times[symbol], now - 60)]
+            complete = complete + resample_bars(minutes, timedelta(seconds=period))
+        return complete
+
+    def _resample(self, symbol, period):
+        key = (symbol, period)
+        if key not in self._resampled:
+            bars = resample_bars(self.bars[symbol], timedelta(seconds=period))
+            self._resampled[key] = (bars, [_epoch(bar.timestamp) for bar in bars])
+        return self._resampled[key]
+
+def synthetic_feed(symbols, history_hours, minutes, speed, seed=0):
+    """Random-walk bars for each symbol: history_hours of history, then `minutes` to replay"""
+    origin = int(time.time()) // 60 * 60
+    start = datetime.fromtimestamp(origin, timezone.utc) - timedelta(hours=history_hours)
+    events = {symbol: generate_events(symbol, history_hours * 60 + minutes, seed=seed + i, start=start)
+              for i, symbol in enumerate(symbols)}
+    return ReplayFeed(events, origin, speed)
+
+def recorded_feed(paths, history_hours, speed):
+    """Bars from CSV files, shifted so their first history_hours are history and the rest replays from now"""
+    origin = int(time.time()) // 60 * 60
+    events = {}
+    for symbol, path in paths.items():
+        bars = load_bars_csv(path, symbol)
+        if not bars:
+            continue
+        shift = timedelta(seconds=(origin - history_hours * 3600 - _epoch(bars[0].timestamp)) // 60 * 60)
+        events[symbol] = [("bar", Bar(symbol, bar.timestamp + shift, bar.open, bar.high, bar.low, bar.close,
+                                      bar.volume)) for bar in bars]
+    return ReplayFeed(events, origin, speed)
+
+class _Connection:
+    """One websocket client; frames are sent in order by a task that applies the injected latency"""
+    def __init__(self, websocket):
+        self.websocket = websocket
+        self.channels = {'bars': set(), 'updatedBars': set(), 'quotes': set(), 'trades': set()}
+        self.outbox = asyncio.Queue()
+
+    def wants(self, channel, symbol):
+        symbols = self.channels[channel]
+        return symbol in symbols or '*' in symbols
+
+    async def pump(self):
+        while True:
+            frame, due = await self.outbox.get()
+            delay = due - time.monotonic()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            try:
+                await self.websocket.send(frame)
+            except ConnectionClosed:
+                return
+
+class StandinServer:
+    """Local stand-in for the parts of Alpaca this bot uses.
+
+    Serves the trading REST API (account, positions, market orders and
+    order lookups), historical crypto bars, the crypto market data stream
+    (msgpack) and the trade updates stream, all fed from a ReplayFeed.
+    Orders fill at the latest released close after `fill_delay` seconds.
+    Faults can be injected: extra latency on every REST response and
+    stream frame, a fraction of REST requests answered with 429, and
+    market data connections dropped every `disconnect_every` seconds.
+    Subscribers to quotes and trades get `quotes_per_second` of each per
+    symbol, priced along the path between consecutive minute closes.
+    """
+    def __init__(self, feed, logger, cash=100000.0, latency_ms=0.0, jitter_ms=0.0, rate_limit=0.0,
+                 disconnect_every=0.0, fill_delay=0.2, tick=0.05, seed=0, quotes_per_second=10.0):
+        self.feed = feed
+        self.logger = logger
+        self.starting_cash = cash
+        self.cash = cash
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.rate_limit = rate_limit
+        self.disconnect_every = disconnect_every
+        self.fill_delay = fill_delay
+        self.tick = tick
+        self.quotes_per_second = quotes_per_second
+        self.trade_ids = 0
+        self.orders = {}  # order id -> order as served
+        self.client_order_ids = {}  # client order id -> order id
+        self.positions = {}  # position symbol -> [qty, cost basis]
+        self.pending = 0.0  # notional of accepted orders that haven't filled
+        self.requests = 0
+        self.rate_limited = 0
+        self._data_connections = set()
+        self._trade_connections = set()
+        self._lock = threading.Lock()
+        self._random = random.Random(seed)
+        self.loop = None
+
+    def _latency(self):
+        return max(self.latency_ms + self._random.uniform(-self.jitter_ms, self.jitter_ms), 0.0) / 1000
+
+    # REST
+
+    def route(self, method, path, query, body):
+        """(status, payload) for one REST request"""
+        if method == 'GET' and path == '/v2/account':
+            return 200, self.account()
+        if method == 'GET' and path == '/v2/positions':
+            return 200, self.position_list()
+        if method == 'POST' and path == '/v2/orders':
+            return self.submit_order(body)
+        if method == 'GET' and path == '/v2/orders:by_client_order_id':
+            order_id = self.client_order_ids.get(query.get('client_order_id', [''])[0])
+            return self.get_order(order_id)
+        if method == 'GET' and path.startswith('/v2/orders/'):
+            return self.get_order(path[len('/v2/orders/'):])
+        if method == 'GET' and path.startswith('/v1beta3/crypto/') and path.endswith('/bars'):
+            return self.get_bars(query)
+        return 404, {'code': 40410000, 'message': f"endpoint not found: {method} {path}"}
+
+    def account(self):
+        with self._lock:
+            equity = self.cash + sum(qty * (self.feed.prices.get(self._order_symbol(key)) or 0)
+                                     for key, (qty, _) in self.positions.items())
+            return {
+                'id': ACCOUNT_ID,
+                'account_number': 'STANDIN',
+                'status': 'ACTIVE',
+                'crypto_status': 'ACTIVE',
+                'currency': 'USD',
+                'cash': str(self.cash),
+                'buying_power': str(self.cash - self.pending),
+                'non_marginable_buying_power': str(self.cash - self.pending),
+                'portfolio_value': str(equity),
+                'equity': str(equity),
+                'last_equity': str(self.starting_cash),
+                'pattern_day_trader': False,
+                'trading_blocked': False,
+                'transfers_blocked': False,
+                'account_blocked': False,
+            }
+
+    def position_list(self):
+        with self._lock:
+            positions = []
+            for key, (qty, cost) in self.positions.items():
+                price = self.feed.prices.get(self._order_symbol(key)) or 0
+                positions.append({
+                    'asset_id': str(uuid.uuid5(uuid.NAMESPACE_URL, key)),
+                    'symbol': key,
+                    'exchange': 'CRYPTO',
+                    'asset_class': 'crypto',
+                    'avg_entry_price': str(cost / qty if qty else 0),
+                    'qty': str(qty),
+                    'qty_available': str(qty),
+                    'side': 'long',
+                    'cost_basis': str(cost),
+                    'market_value': str(qty * price),
+                    'current_price': str(price),
+                })
+            return positions
+
+    def _order_symbol(self, position_key):
+        for symbol in self.feed.symbols:
+            if symbol.replace('/', '') == position_key:
+                return symbol
+        return position_key
+
+    def submit_order(self, body):
+        symbol = body.get('symbol')
+        price = self.feed.prices.get(symbol)
+        if price is None:
+            return 422, {'code': 40010001, 'message': f"unknown symbol {symbol}"}
+        if body.get('side') != 'buy' or body.get('type') != 'market':
+            return 422, {'code': 40010001, 'message': "the stand-in only accepts market buy orders"}
+        notional = float(body['notional']) if body.get('notional') else float(body.get('qty') or 0) * price
+
+        now = _iso(time.time())
+        with self._lock:
+            client_order_id = body.get('client_order_id') or str(uuid.uuid4())
+            if client_order_id in self.client_order_ids:
+                return 422, {'code': 40010001, 'message': "client_order_id must be unique"}
+            if notional <= 0 or notional > self.cash - self.pending:
+                return 403, {'code': 40310000, 'message': "insufficient balance for USD"}
+            order = {
+                'id': str(uuid.uuid4()),
+                'client_order_id': client_order_id,
+                'created_at': now,
+                'updated_at': now,
+                'submitted_at': now,
+                'filled_at': None,
+                'asset_id': str(uuid.uuid5(uuid.NAMESPACE_URL, symbol.replace('/', ''))),
+                'symbol': symbol,
+                'asset_class': 'crypto',
+                'notional': str(notional),
+                'qty': body.get('qty'),
+                'filled_qty': '0',
+                'filled_avg_price': None,
+                'order_class': 'simple',
+                'order_type': 'market',
+                'type': 'market',
+                'side': 'buy',
+                'time_in_force': body.get('time_in_force', 'gtc'),
+                'status': 'pending_new',
+                'extended_hours': False,
+            }
+            self.orders[order['id']] = order
+            self.client_order_ids[client_order_id] = order['id']
+            self.pending += notional
+            accepted = dict(order)
+        self.loop.call_soon_threadsafe(self._accept, order['id'])
+        return 200, accepted
+
+    def get_order(self, order_id):
+        with self._lock:
+            order = self.orders.get(order_id)
+            if order is None:
+                return 404, {'code': 40410000, 'message': "order not found"}
+            return 200, dict(order)
+
+    def get_bars(self, query):
+        period = TIMEFRAMES.get(query.get('timeframe', [''])[0])
+        if period is None:
+            return 422, {'code': 42210000, 'message': f"unsupported timeframe {query.get('timeframe')}"}
+        now = int(self.feed.now())
+        start = _parse_time(query.get('start', [''])[0], now // 86400 * 86400)
+        end = _parse_time(query.get('end', [''])[0], now)
+        limit = int(query.get('limit', ['1000'])[0] or 1000)
+        offset = int(query.get('page_token', ['0'])[0] or 0)
+
+        # Pages run through the symbols in order, as Alpaca's do
+        matches = [(symbol, bar) for symbol in query.get('symbols', [''])[0].split(',')
+                   for bar in self.feed.get_bars(symbol, period, start, end)]
+        page = matches[offset:offset + limit]
+        bars = {}
+        for symbol, bar in page:
+            bars.setdefault(symbol, []).append(_rest_bar(bar))
+        more = offset + limit < len(matches)
+        return 200, {'bars': bars, 'next_page_token': str(offset + limit) if more else None}
+
+    def _rest_handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'  # keep-alive, like the real API
+
+            def do_GET(self):
+                self._handle('GET')
+
+            def do_POST(self):
+                self._handle('POST')
+
+            def _handle(self, method):
+                length = int(self.headers.get('Content-Length') or 0)
+                body = json.loads(self.rfile.read(length) or b'{}') if length else {}
+                url = urlparse(self.path)
+                time.sleep(server._latency())
+                with server._lock:
+                    server.requests += 1
+                    limited = server._random.random() < server.rate_limit
+                    server.rate_limited += limited
+                if limited:
+                    status, payload = 429, {'code': 42910000, 'message': "rate limit exceeded"}
+                else:
+                    try:
+                        status, payload = server.route(method, url.path, parse_qs(url.query), body)
+                    except Exception as e:
+                        server.logger.error(f"Error handling {method} {self.path}: {str(e)}")
+                        status, payload = 500, {'code': 50010000, 'message': str(e)}
+                data = json.dumps(payload).encode()
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
+
+    # Orders fill on the event loop so trade updates go out in order
+
+    def _accept(self, order_id):
+        with self._lock:
+            order = self.orders[order_id]
+            order['status'] = 'new'
+            order['updated_at'] = _iso(time.time())
+            update = dict(order)
+        self._publish_trade_update('new', update)
+        self.loop.call_later(self.fill_delay, self._fill, order_id)
+
+    def _fill(self, order_id):
+        with self._lock:
+            order = self.orders[order_id]
+            price = self.feed.prices[order['symbol']]
+            notional = float(order['notional'])
+            qty = notional / price
+            now = _iso(time.time())
+            order.update(status='filled', filled_qty=str(qty), filled_avg_price=str(price), filled_at=now,
+                         updated_at=now)
+            self.pending -= notional
+            self.cash -= notional
+            key = order['symbol'].replace('/', '')
+            position = self.positions.setdefault(key, [0.0, 0.0])
+            position[0] += qty
+            position[1] += notional
+            update = dict(order)
+            position_qty = position[0]
+        self._publish_trade_update('fill', update, price=str(price), qty=str(qty), position_qty=str(position_qty))
+
+    def _publish_trade_update(self, event, order, **fields):
+        frame = json.dumps({'stream': 'trade_updates',
+                            'data': {'event': event, 'order': order, 'timestamp': order['updated_at'], **fields}})
+        due = time.monotonic() + self._latency()
+        for connection in list(self._trade_connections):
+            connection.outbox.put_nowait((frame, due))
+
+    # Websockets
+
+    async def _handle_websocket(self, websocket):
+        connection = _Connection(websocket)
+        pump = asyncio.create_task(connection.pump())
+        try:
+            if websocket.request.path.startswith('/stream'):
+                await self._serve_trade_updates(connection)
+            else:
+                await self._serve_market_data(connection)
+        except ConnectionClosed:
+            pass
+        finally:
+            self._data_connections.discard(connection)
+            self._trade_connections.discard(connection)
+            pump.cancel()
+
+    async def _serve_market_data(self, connection):
+        websocket = connection.websocket
+        await websocket.send(msgpack.packb([{'T': 'success', 'msg': 'connected'}]))
+        auth = msgpack.unpackb(await websocket.recv())
+        if auth.get('action') != 'auth' or not auth.get('key') or not auth.get('secret'):
+            await websocket.send(msgpack.packb([{'T': 'error', 'code': 402, 'msg': 'auth failed'}]))
+            return
+        await websocket.send(msgpack.packb([{'T': 'success', 'msg': 'authenticated'}]))
+        self._data_connections.add(connection)
+
+        async for message in websocket:
+            request = msgpack.unpackb(message)
+            action = request.get('action')
+            for channel, symbols in connection.channels.items():
+                if action == 'subscribe':
+                    symbols.update(request.get(channel, []))
+                elif action == 'unsubscribe':
+                    symbols.difference_update(request.get(channel, []))
+            reply = {'T': 'subscription',
+                     **{channel: sorted(symbols) for channel, symbols in connection.channels.items()}}
+            connection.outbox.put_nowait((msgpack.packb([reply]), time.monotonic()))
+
+    async def _serve_trade_updates(self, connection):
+        websocket = connection.websocket
+        auth = json.loads(await websocket.recv())
+        authorized = auth.get('action') == 'authenticate' and auth.get('data', {}).get('key_id')
+        await websocket.send(json.dumps({'stream': 'authorization', 'data': {
+            'action': 'authenticate', 'status': 'authorized' if authorized else 'unauthorized'}}))
+        if not authorized:
+            return
+
+        async for message in websocket:
+            request = json.loads(message)
+            if request.get('action') != 'listen':
+                continue
+            streams = request.get('data', {}).get('streams', [])
+            if 'trade_updates' in streams:
+                self._trade_connections.add(connection)
+            connection.outbox.put_nowait((json.dumps({'stream': 'listening', 'data': {'streams': streams}}),
+                                          time.monotonic()))
+
+    async def _replay(self):
+        """Send each tick's due bars to the connections subscribed to them"""
+        next_disconnect = time.monotonic() + self.disconnect_every if self.disconnect_every else None
+        next_ticks = time.monotonic()
+        finished = False
+        while True:
+            released = self.feed.release()
+            if released:
+                due = time.monotonic() + self._latency()
+                for connection in list(self._data_connections):
+                    messages = [_stream_bar(kind, bar) for kind, bar in released
+                                if connection.wants('bars' if kind == "bar" else 'updatedBars', bar.symbol)]
+                    if messages:
+                        connection.outbox.put_nowait((msgpack.packb(messages), due))
+
+            if self.quotes_per_second and time.monotonic() >= next_ticks:
+                next_ticks += 1 / self.quotes_per_second
+                self._send_ticks()
+
+            if next_disconnect is not None and time.monotonic() >= next_disconnect:
+                self.logger.info(f"Dropping {len(self._data_connections)} market data connection(s)")
+                for connection in list(self._data_connections):
+                    await connection.websocket.close(1011, "stand-in disconnect")
+                next_disconnect += self.disconnect_every
+
+            if not finished and self.feed.finished():
+                finished = True
+                self.logger.info("Replay finished; no more bars will be streamed")
+            await asyncio.sleep(self.tick)
+
+    def _send_ticks(self):
+        """One quote and one trade per symbol to the connections subscribed to them"""
+        now = self.feed.now()
+        ticks = {}
+        for symbol in self.feed.symbols:
+            price = self.feed.price_now(symbol)
+            if price is not None:
+                self.trade_ids += 1
+                ticks[symbol] = _stream_ticks(symbol, price, now, self.trade_ids)
+        due = time.monotonic() + self._latency()
+        for connection in list(self._data_connections):
+            messages = []
+            for symbol, (quote, trade) in ticks.items():
+                if connection.wants('quotes', symbol):
+                    messages.append(quote)
+                if connection.wants('trades', symbol):
+                    messages.append(trade)
+            if messages:
+                connection.outbox.put_nowait((msgpack.packb(messages), due))
+
+    async def _report(self, interval):
+        while True:
+            await asyncio.sleep(interval)
+            replay_time = datetime.fromtimestamp(self.feed.now(), timezone.utc)
+            self.logger.info(f"Replay at {replay_time:%Y-%m-%d %H:%M} | {len(self._data_connections)} data / "
+                             f"{len(self._trade_connections)} trade connection(s) | {self.requests} REST requests "
+                             f"({self.rate_limited} rate limited) | {len(self.orders)} orders")
+
+    async def run(self, host, port, stream_port, report_interval=60):
+        self.loop = asyncio.get_running_loop()
+        rest = ThreadingHTTPServer((host, port), self._rest_handler())
+        threading.Thread(target=rest.serve_forever, daemon=True).start()
+        async with serve(self._handle_websocket, host, stream_port, max_size=None):
+            self.logger.info(f"Stand-in serving {len(self.feed.symbols)} symbol(s) at {self.feed.speed:g}x")
+            asyncio.create_task(self._report(report_interval))
+            await self._replay()
+
+def main():
+    parser = argparse.ArgumentParser(description="Local stand-in for the Alpaca REST and websocket APIs")
+    parser.add_argument('--symbols', default="BTC/USD", help="comma-separated symbols to generate bars for")
+    parser.add_argument('--synthetic', type=int, help="generate this many symbols (SYN0/USD, SYN1/USD, ...)")
+    parser.add_argument('--bars', action='append', default=[], metavar='SYMBOL=CSV',
+                        help="replay recorded minute bars instead of synthetic ones")
+    parser.add_argument('--history-hours', type=int, default=48, help="bars before the replay start, REST only")
+    parser.add_argument('--minutes', type=int, default=7 * 24 * 60, help="synthetic minutes to replay")
+    parser.add_argument('--speed', type=float, default=1.0, help="replay clock speed, e.g. 1000 for 1000x")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8780, help="REST port")
+    parser.add_argument('--stream-port', type=int, default=8781, help="websocket port")
+    parser.add_argument('--cash', type=float, default=100000.0)
+    parser.add_argument('--fill-delay', type=float, default=0.2, help="seconds before an order fills")
+    parser.add_argument('--latency-ms', type=float, default=0.0, help="added to every response and stream frame")
+    parser.add_argument('--jitter-ms', type=float, default=0.0)
+    parser.add_argument('--rate-limit', type=float, default=0.0, help="fraction of REST requests answered with 429")
+    parser.add_argument('--disconnect-every', type=float, default=0.0,
+                        help="drop market data connections every this many seconds")
+    parser.add_argument('--quotes-per-second', type=float, default=10.0,
+                        help="quotes and trades streamed per symbol to their subscribers (0 disables)")
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    logger = logging.getLogger('standin')
+
+    if args.bars:
+        feed = recorded_feed(dict(spec.split('=', 1) for spec in args.bars), args.history_hours, args.speed)
+    else:
+        symbols = ([f"SYN{i}/USD" for i in range(args.synthetic)] if args.synthetic
+                   else args.symbols.split(','))
+        feed = synthetic_feed(symbols, args.history_hours, args.minutes, args.speed, args.seed)
+
+    print("Point the bot at the stand-in with:")
+    print(f"  ALPACA_API_KEY=standin ALPACA_SECRET_KEY=standin TRADING_SYMBOLS={','.join(feed.symbols)}")
+    print(f"  ALPACA_TRADING_URL=http://{args.host}:{args.port} ALPACA_DATA_URL=http://{args.host}:{args.port}")
+    print(f"  ALPACA_DATA_STREAM_URL=ws://{args.host}:{args.stream_port}/v1beta3/crypto/us")
+    print(f"  ALPACA_TRADING_STREAM_URL=ws://{args.host}:{args.stream_port}/stream")
+
+    server = StandinServer(feed, logger, cash=args.cash, latency_ms=args.latency_ms, jitter_ms=args.jitter_ms,
+                           rate_limit=args.rate_limit, disconnect_every=args.disconnect_every,
+                           fill_delay=args.fill_delay, seed=args.seed, quotes_per_second=args.quotes_per_second)
+    try:
+        asyncio.run(server.run(args.host, args.port, args.stream_port))
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
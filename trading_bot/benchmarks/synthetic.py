@@ -0,0 +1,46 @@
+import math
+import random
+from datetime import datetime, timedelta, timezone
+from trading.bars import Bar, resample_bars
+
+def generate_events(symbol, count, seed=0, start=None, price=50000.0, volatility=0.001,
+                    gap_probability=0.002, max_gap=30, correction_probability=0.05):
+    """Seeded random-walk minute bars as ("bar" | "update", Bar) stream events.
+
+    Minutes are occasionally skipped (gaps of up to max_gap minutes) and
+    some bars are followed by an "update" correcting their close and volume,
+    like the updated-bars stream.
+    """
+    rng = random.Random(seed)
+    timestamp = start or datetime(2024, 1, 1, tzinfo=timezone.utc)
+    events = []
+    bars = 0
+    while bars < count:
+        if rng.random() < gap_probability:
+            timestamp += timedelta(minutes=rng.randint(2, max_gap))
+        open_ = price
+        price *= math.exp(rng.gauss(0, volatility))
+        spread = abs(rng.gauss(0, volatility / 2))
+        high = max(open_, price) * (1 + spread)
+        low = min(open_, price) * (1 - spread)
+        volume = rng.expovariate(1.0)
+        events.append(("bar", Bar(symbol, timestamp, open_, high, low, price, volume)))
+        bars += 1
+
+        if rng.random() < correction_probability:
+            corrected = price * math.exp(rng.gauss(0, volatility / 4))
+            events.append(("update", Bar(symbol, timestamp, open_, max(high, corrected), min(low, corrected),
+                                         corrected, volume * (1 + rng.random() / 10))))
+            price = corrected
+        timestamp += timedelta(minutes=1)
+    return events
+
+def generate_bars(symbol, count, seed=0, **kwargs):
+    """Final minute bars (corrections applied), oldest first"""
+    final = {}
+    for _, bar in generate_events(symbol, count, seed, **kwargs):
+        final[bar.timestamp] = bar
+    return list(final.values())
+
+def generate_hourly_bars(symbol, hours, seed=0, **kwargs):
+    return resample_bars(generate_bars(symbol, hours * 60, seed, **kwargs))
\ No newline at end of file
@@ -9,15 +9,147 @@ ALPACA_API_KEY = os.getenv('ALPACA_API_KEY')
 ALPACA_SECRET_KEY = os.getenv('ALPACA_SECRET_KEY')
 PAPER_TRADING = True
 
+# Endpoint overrides, e.g. to run against the local stand-in server
+# (python -m benchmarks.standin); unset uses Alpaca's hosted endpoints
+ALPACA_TRADING_URL = os.getenv('ALPACA_TRADING_URL')
+ALPACA_DATA_URL = os.getenv('ALPACA_DATA_URL')
+ALPACA_DATA_STREAM_URL = os.getenv('ALPACA_DATA_STREAM_URL')
+ALPACA_TRADING_STREAM_URL = os.getenv('ALPACA_TRADING_STREAM_URL')
+
 # Trading Parameters
-SYMBOL = "BTC/USD"
+# Every pair is served by one shared stream connection; TRADING_SYMBOLS="BTC/USD,ETH/USD" overrides
+SYMBOLS = os.getenv('TRADING_SYMBOLS', "BTC/USD").split(",")
 TRADE_AMOUNT = 10.00  # Minimum $10 for crypto
 MIN_TRADE_INTERVAL = 120  # 2 minutes
 
+# Account state is streamed from trade updates; re-check against REST this often (seconds)
+ACCOUNT_RECONCILE_INTERVAL = 300
+
+# Order pipeline: orders are submitted off the strategy thread and retried safely
+ORDER_QUEUE_SIZE = 100  # pending orders before new ones are rejected
+ORDER_WORKERS = 2  # threads submitting orders
+ORDER_MAX_RETRIES = 3
+ORDER_RETRY_BACKOFF = 0.5  # seconds, doubled on each retry
+ORDER_STATUS_POLL_INTERVAL = 10  # seconds without a trade update before an open order is checked over REST
+
+# Startup: the account fetch, history warm-up and stream connect run at the same
+# time; a warning is logged if the bot isn't ready to trade STARTUP_BUDGET_MS after
+# the process starts
+STARTUP_BUDGET_MS = 1000
+STARTUP_TIMEOUT = 30  # seconds to wait for market data before trading anyway
+
+# REST gateway: every Alpaca REST call shares one token bucket, orders first.
+# Alpaca allows 200 requests a minute per account; lower-priority calls (account
+# checks, historical bars) can't spend the last REST_ORDER_RESERVE tokens
+REST_RATE_LIMIT = 180  # requests per minute
+REST_BURST = 20  # requests that can go out back to back after a quiet spell
+REST_ORDER_RESERVE = 5
+REST_RETRIES = 2  # times a call Alpaca rejected with a 429 is retried once the bucket has refilled
+
+# Execution scheduler: work each buy as child orders instead of one market order.
+# "twap" sends EXECUTION_SLICES equal children over EXECUTION_DURATION; "pov" sends
+# EXECUTION_PARTICIPATION of each new minute bar's traded notional until done or
+# EXECUTION_DURATION has passed, then the rest. None places one market order
+EXECUTION_STYLE = None
+EXECUTION_DURATION = 600  # seconds
+EXECUTION_SLICES = 5
+EXECUTION_PARTICIPATION = 0.05
+EXECUTION_MIN_CHILD = 10.00  # smallest child order in dollars (fewer, larger slices if needed)
+EXECUTION_INTERVAL = 1  # seconds between scheduler checks
+
+# Logging: written by a background thread and rotated instead of deleted
+LOG_FILE = "trading_bot.log"
+LOG_MAX_BYTES = 0  # rotate at this size; 0 rotates at midnight instead
+LOG_BACKUP_COUNT = 7  # rotated files to keep
+# Log at most one line per interval (seconds) for these frequent messages
+LOG_RATE_LIMITS = {
+    "NEW PRICE": 60,
+    "Hourly ": 60,
+    "Buy Signal Analysis": 60,
+    "Bar-to-decision latency": 60,
+}
+
+# Latency metrics: percentiles per stage are logged every interval and served
+# as JSON on 127.0.0.1:METRICS_PORT (None disables the endpoint)
+METRICS_REPORT_INTERVAL = 300  # seconds
+METRICS_PORT = 8765
+LATENCY_ALERT_MS = {  # warn when a stage's p99 over the interval exceeds this
+    'bar_to_decision': 500,
+    'tick_to_decision': 500,
+    'order_ack': 2000,
+}
+
+# Sampling profiler: `kill -USR1 <pid>` (or a POST to /profile?seconds=N on the
+# metrics port) samples every thread's stack for PROFILE_DURATION seconds; a second
+# SIGUSR1 stops it early. Collapsed stacks and per-function times go to PROFILE_DIR
+PROFILE_DIR = "profiles"
+PROFILE_DURATION = 30  # seconds
+PROFILE_INTERVAL = 0.01  # seconds between samples
+
+# Run Mode
+RUN_MODE = "event"  # "event" reacts to stream bars, "poll" checks on a fixed interval
+HEARTBEAT_INTERVAL = 30  # seconds; event mode still evaluates a symbol that has had no bar for this long
+POLL_INTERVAL = 30  # seconds between checks in poll mode
+ERROR_BACKOFF = 1  # seconds the main loop pauses after an error, doubled while errors repeat (up to 60)
+
+# Process topology: "single" runs everything in one process. "multi" keeps the
+# market data stream in the main process, which writes every bar to a shared-memory
+# ring read by STRATEGY_WORKERS strategy processes (symbols split between them);
+# they send orders to one execution process
+PROCESS_MODE = "single"
+STRATEGY_WORKERS = 2
+BAR_RING_CAPACITY = 65536  # bars held in shared memory (64 bytes each)
+BAR_RING_POLL_INTERVAL = 0.005  # seconds between checks for new bars in the ring
+
 # Strategy Parameters
 SMA_WINDOW = 24  # hours
 SMA_THRESHOLD = 0.95  # 5% below SMA
 PRICE_DROP_THRESHOLD = 1.0  # 1% price drop
+NEAR_HOUR_LOW_PCT = 0.5  # buy only within 0.5% of the hour's low
+HOUR_LOW_DROP_PCT = -0.1  # hour's low counts as dropping below -0.1% change
+LOCAL_MIN_WINDOW = 5  # minutes checked for a local minimum
+# Besides being near the hour's low, a buy needs: "either" a dropping hourly low or a
+# local minimum, "both", or only one of them ("dropping" / "local_min")
+BUY_RULE = "either"
+
+# Shadow variants: evaluated on every bar next to the live strategy, trading only on
+# paper. Each is a name plus strategy param overrides, e.g.
+# {'name': 'tight', 'near_low_pct': 0.25, 'rule': "both"}; SHADOW_GRID adds every
+# combination of its values, e.g. {'near_low_pct': [0.25, 0.5, 1.0], 'local_min_window': [5, 15]}
+SHADOW_VARIANTS = []
+SHADOW_GRID = None
+SHADOW_REPORT_INTERVAL = 3600  # seconds between shadow P&L summaries
+
+# Market data stream supervision: the SDK reconnects a stream that has sent no market
+# data for this long, and missed minutes are backfilled in one request after every reconnect
+STREAM_STALL_TIMEOUT = 180  # seconds
+STREAM_RECONNECT_BACKOFF = 1  # seconds before restarting a stream that stopped, doubled per failure
+STREAM_RECONNECT_MAX_BACKOFF = 60
+
+# Hourly (and any other RESAMPLE_PERIODS, in minutes) bars are built from the
+# minute stream; REST is only used to seed them at startup and to check them
+RESAMPLE_PERIODS = [60]
+RESAMPLE_HISTORY_HOURS = 24  # completed bars kept per period
+RESAMPLE_VERIFY_INTERVAL = 3600  # seconds between checks against REST hourly bars (0 disables)
+
+# High-frequency mode: also stream quotes and trades and re-evaluate on the live
+# mid price between minute bars. Bursts are coalesced so each symbol's strategy
+# sees at most one tick update per TICK_COALESCE_INTERVAL
+TICK_MODE = False
+TICK_COALESCE_INTERVAL = 1.0  # seconds
+TICK_BUFFER_SIZE = 1000  # recent trades kept per symbol
+
+# Historical bar cache: refresh at most this often (seconds), and always at a new bar
+BAR_CACHE_TTL = 60
+
+# Local minute-bar history used to warm start the minute SMA (None disables it)
+BAR_STORE_DIR = "bar_store"
+
+# Crash-safe checkpoint of strategy and market state, written every CHECKPOINT_INTERVAL
+# seconds and on shutdown, and restored at startup (None disables it)
+CHECKPOINT_PATH = "checkpoint.bin"
+CHECKPOINT_INTERVAL = 60  # seconds
+CHECKPOINT_MAX_AGE = 600  # seconds; an older checkpoint only restores the trade cooldown
 
 # How many 1-minute bars to use for our SMA
 MINUTE_SMA_WINDOW = 500 
\ No newline at end of file
@@ -1,24 +1,162 @@
+import time
+STARTED = time.monotonic()  # startup is timed from here, so the imports below count against the budget
 from utils.logger import setup_logger
+from trading.account import AccountState
+from trading.bar_cache import BarCache
+from trading.bar_store import BarStore
+from trading.checkpoint import Checkpointer, load_checkpoint, restore_strategies
 from trading.client import AlpacaTradingClient
 from trading.data import MarketData
+from trading.events import BarEvent
+from trading.execution import ExecutionScheduler
+from trading.orders import OrderPipeline
+from trading.shadow import shadow_books
 from trading.strategy import TradingStrategy
-from config.settings import SYMBOL, TRADE_AMOUNT
-import time
+from trading.topology import run_multiprocess
+from utils.metrics import metrics
+from utils.profiler import profile_on_signal
+from utils.startup import StartupTimer, preload
+from config.settings import (SYMBOLS, TRADE_AMOUNT, RUN_MODE, HEARTBEAT_INTERVAL, POLL_INTERVAL, ERROR_BACKOFF,
+                             BAR_STORE_DIR,
+                             METRICS_REPORT_INTERVAL, METRICS_PORT, LATENCY_ALERT_MS, EXECUTION_STYLE,
+                             CHECKPOINT_PATH, PROCESS_MODE, STARTUP_BUDGET_MS, STARTUP_TIMEOUT)
+import signal
+import sys
+
+# Alpaca SDK modules the live bot needs; together they take most of a second to import
+SDK_MODULES = ("alpaca.trading.client", "alpaca.trading.stream", "alpaca.data.historical.crypto",
+               "alpaca.data.live")
+
+def run_event_loop(strategies, market_data, logger, checkpointer=None):
+    """Evaluate a symbol's strategy once per new or corrected stream bar"""
+    # When each symbol was last evaluated; a symbol with no bar for a heartbeat
+    # interval is evaluated anyway, so cooldown tracking keeps moving when its
+    # market is quiet, however busy the other symbols are
+    evaluated = dict.fromkeys(strategies, time.monotonic())
+    errors = 0
+    while True:
+        try:
+            # Between decisions, so strategy state isn't changing underneath it
+            if checkpointer is not None:
+                checkpointer.maybe_save()
+
+            # Sleep until the stream publishes a bar or the next heartbeat is due
+            due = min(evaluated.values(), default=time.monotonic()) + HEARTBEAT_INTERVAL
+            event = market_data.wait_for_event(timeout=max(due - time.monotonic(), 0))
+            if event is not None:
+                strategy = strategies.get(event.symbol)
+                if strategy is not None:
+                    evaluated[event.symbol] = time.monotonic()
+                    strategy.execute(event.symbol, TRADE_AMOUNT, event)
+                    metrics.record_since('tick_to_decision' if event.kind == "tick" else 'bar_to_decision',
+                                         event.received_at)
+                    logger.info("Bar-to-decision latency %s: %.2f ms (%s @ %s)", event.symbol,
+                                event.latency() * 1000, event.kind, event.timestamp)
+
+            now = time.monotonic()
+            for symbol, strategy in strategies.items():
+                if now - evaluated[symbol] >= HEARTBEAT_INTERVAL:
+                    evaluated[symbol] = now  # first, so a heartbeat that fails isn't retried right away
+                    strategy.execute(symbol, TRADE_AMOUNT)
+            errors = 0
+        except Exception as e:
+            errors = _pause_after_error(logger, e, errors)
+
+def run_polling_loop(strategies, market_data, logger, checkpointer=None):
+    """Evaluate every symbol's strategy on a fixed interval"""
+    errors = 0
+    while True:
+        try:
+            if checkpointer is not None:
+                checkpointer.maybe_save()
+
+            # Always execute to keep monitoring prices, even during cooldown; the newest
+            # minute bar goes with it, so each minute joins the price history once
+            for symbol, strategy in strategies.items():
+                bar = market_data.get_latest_bar(symbol)
+                event = BarEvent("bar", symbol, bar.timestamp, bar.close) if bar is not None else None
+                strategy.execute(symbol, TRADE_AMOUNT, event)
+            errors = 0
+            time.sleep(POLL_INTERVAL)
+        except Exception as e:
+            errors = _pause_after_error(logger, e, errors)
+
+def _pause_after_error(logger, error, errors):
+    """Log a main loop error and back off briefly, longer while errors keep coming; returns the error count"""
+    logger.error(f"Error in main loop: {str(error)}", exc_info=True)
+    # Short, so events queued meanwhile aren't held up for long
+    time.sleep(min(ERROR_BACKOFF * 2 ** errors, 60))
+    return errors + 1
 
 def main():
+    startup = StartupTimer(STARTED)
+    startup.record("imports", STARTED)
+    # The SDK import is the slowest step of startup; it runs while the local setup below does
+    sdk = startup.run("sdk import", preload, *SDK_MODULES)
+
     # Setup logger
     logger = setup_logger(__name__)
     logger.info("=" * 50)
     logger.info("TRADING BOT STARTUP")
     logger.info("=" * 50)
 
+    # Per-stage latency percentiles, logged periodically and served locally
+    # (along with the profiler's control endpoint; SIGUSR1 also starts a profile)
+    profiler = profile_on_signal(logger)
+    metrics.start_reporter(logger, METRICS_REPORT_INTERVAL, METRICS_PORT, LATENCY_ALERT_MS, profiler)
+
     # Initialize components
-    trading_client = AlpacaTradingClient(logger)
-    market_data = MarketData(logger)
-    strategy = TradingStrategy(trading_client, market_data, logger)
+    bar_cache = BarCache(logger)  # one hourly-bar cache shared by every caller
+    # Minute windows are warm-started from the local bar store when it's enabled
+    bar_store = BarStore(BAR_STORE_DIR, logger) if BAR_STORE_DIR else None
+    if PROCESS_MODE == "multi":
+        # Strategies and order execution run in child processes fed from shared memory
+        signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+        run_multiprocess(logger, bar_cache, bar_store)
+        return
+    # Resume from the last checkpoint, if there is one
+    with startup.phase("checkpoint"):
+        checkpoint = load_checkpoint(logger) if CHECKPOINT_PATH else None
+    sdk.result()
+
+    def connect_account():
+        trading_client = AlpacaTradingClient(logger, bar_cache)
+        # Seeded from REST once, then kept current from the trade updates stream
+        return trading_client, AccountState(trading_client, logger)
+
+    # The account fetch, the history warm-up (here) and the stream connect (in
+    # MarketData's stream thread) all run at once
+    account = startup.run("account", connect_account)
+    market_data = MarketData(logger, bar_cache, bar_store=bar_store,
+                             restore=checkpoint['market'] if checkpoint else None, startup=startup)
+    trading_client, account_state = account.result()
+    # One strategy instance per symbol, all fed by the same MarketData stream
+    order_pipeline = OrderPipeline(trading_client, logger)
+    # Fills and cancels reach the pipeline from the trade updates stream
+    account_state.add_trade_listener(order_pipeline.on_trade_update)
+    # Buys are sliced into TWAP/POV child orders when an execution style is set
+    execution = ExecutionScheduler(order_pipeline, market_data, logger) if EXECUTION_STYLE else None
+    # Paper-traded variants of each strategy, when any are configured
+    shadows = shadow_books(SYMBOLS, logger)
+    strategies = {
+        symbol: TradingStrategy(trading_client, market_data, logger, account_state, symbol,
+                                order_pipeline=order_pipeline, execution=execution, shadow=shadows.get(symbol))
+        for symbol in SYMBOLS
+    }
+    checkpointer = None
+    if CHECKPOINT_PATH:
+        if checkpoint:
+            # Cooldowns and price windows carry over, so trading resumes where it left off
+            restore_strategies(strategies, checkpoint)
+        checkpointer = Checkpointer(market_data, strategies, logger)
+
+    # Live bars are held until the stream's first backfill is in
+    if not market_data.ready.wait(STARTUP_TIMEOUT):
+        logger.warning(f"Market data not ready after {STARTUP_TIMEOUT}s, starting anyway")
+    startup.report(logger, STARTUP_BUDGET_MS)
 
     # Log initial account information
-    account_info = trading_client.get_account_info()
+    account_info = account_state.get_account_info()
     if account_info:
         logger.info("\nInitial Account Information:")
         logger.info(f"  Cash Balance: ${account_info['cash']:,.2f}")
@@ -28,16 +166,19 @@ def main():
 
     # Run the trading strategy
     logger.info("\nStarting Trading Strategy")
-    logger.info(f"Trading {SYMBOL} with ${TRADE_AMOUNT} orders")
+    logger.info(f"Trading {', '.join(SYMBOLS)} with ${TRADE_AMOUNT} orders ({RUN_MODE} mode)")
 
-    while True:
-        try:
-            # Always execute to keep monitoring prices, even during cooldown
-            strategy.execute(SYMBOL, TRADE_AMOUNT)
-            time.sleep(30)  # Check every 30 seconds instead of 10
-        except Exception as e:
-            logger.error(f"Error in main loop: {str(e)}")
-            time.sleep(60)  # Wait longer on errors
+    # Stop cleanly on SIGTERM (e.g. a deploy) so the final checkpoint is written
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+    try:
+        if RUN_MODE == "event":
+            run_event_loop(strategies, market_data, logger, checkpointer)
+        else:
+            run_polling_loop(strategies, market_data, logger, checkpointer)
+    finally:
+        if checkpointer is not None:
+            checkpointer.save()
+            logger.info(f"Checkpoint saved to {CHECKPOINT_PATH}")
 
 if __name__ == "__main__":
-    main() 
\ No newline at end of file
+    main()
\ No newline at end of file
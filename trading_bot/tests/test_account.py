@@ -0,0 +1,88 @@
+import logging
+from types import SimpleNamespace
+import pytest
+from trading import account
+from trading.account import AccountState
+
+class FakeTradingClient:
+    def __init__(self, buying_power=1000.0):
+        self.buying_power = buying_power
+
+    def get_account_info(self):
+        return {'cash': self.buying_power, 'portfolio_value': self.buying_power, 'buying_power': self.buying_power,
+                'daily_pl': 0.0}
+
+    def get_positions(self):
+        return {}
+
+def _order(order_id, qty, price, symbol="BTC/USD"):
+    return SimpleNamespace(id=order_id, side="buy", symbol=symbol, filled_qty=qty, filled_avg_price=price)
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(account.time, 'monotonic', lambda: now[0])
+    return now
+
+def _state(client=None):
+    return AccountState(client or FakeTradingClient(), logging.getLogger(__name__), reconcile_interval=60,
+                        start_stream=False)
+
+def test_fill_swaps_the_hold_for_the_cost():
+    state = _state()
+    state.reserve("a", 100.0)
+    assert state.buying_power == 900.0
+    state.apply_trade_update('partial_fill', _order("a", 0.001, 40000.0))
+    assert state.buying_power == 900.0  # still covered by the hold
+    state.apply_trade_update('fill', _order("a", 0.0024, 40000.0))
+    assert state.buying_power == pytest.approx(904.0)
+    assert state.get_position("BTC/USD") == pytest.approx(0.0024)
+
+def test_partial_fill_before_reserve_is_not_charged_twice():
+    state = _state()
+    state.apply_trade_update('partial_fill', _order("a", 0.001, 40000.0))
+    assert state.buying_power == pytest.approx(960.0)
+    state.reserve("a", 100.0)
+    assert state.buying_power == pytest.approx(900.0)
+    state.apply_trade_update('fill', _order("a", 0.0024, 40000.0))
+    assert state.buying_power == pytest.approx(904.0)
+    assert state.cash == pytest.approx(904.0)
+
+def test_fill_before_reserve_is_applied_once():
+    state = _state()
+    state.apply_trade_update('fill', _order("a", 0.0024, 40000.0))
+    state.reserve("a", 100.0)
+    assert state.buying_power == pytest.approx(904.0)
+    assert not state._reserved and not state._terminal
+
+def test_reconcile_keeps_pending_holds(clock):
+    client = FakeTradingClient()
+    state = _state(client)
+    state.reserve("a", 100.0)
+    client.buying_power = 950.0  # REST has seen something else, but not this order yet
+    state.refresh()
+    assert state.buying_power == 850.0
+    state.apply_trade_update('canceled', _order("a", 0, 0))
+    assert state.buying_power == 950.0
+
+def test_holds_and_finished_orders_expire(clock):
+    state = _state()
+    state.reserve("a", 100.0)
+    state.apply_trade_update('fill', _order("b", 0.001, 40000.0))  # not reserved (yet)
+    clock[0] += 61
+    state.refresh()
+    assert state.buying_power == 1000.0  # REST's word, with nothing held
+    assert not state._reserved and not state._terminal and not state._filled
+
+def test_reserve_before_ready_is_applied_by_the_first_snapshot():
+    client = FakeTradingClient()
+    client_info = client.get_account_info
+    client.get_account_info = lambda: None  # REST unreachable at startup
+    state = _state(client)
+    assert not state.ready
+    state.reserve("a", 100.0)
+    state.apply_trade_update('partial_fill', _order("a", 0.001, 40000.0))
+    assert state.get_account_info() is None
+    client.get_account_info = client_info
+    state.refresh()
+    assert state.buying_power == 900.0
\ No newline at end of file
@@ -0,0 +1,47 @@
+import os
+from datetime import datetime, timedelta, timezone
+from trading.bar_store import BAR_DTYPE, BarStore
+from trading.bars import Bar
+
+START = datetime(2024, 1, 2, 0, 0, tzinfo=timezone.utc)
+
+def _bar(minute, symbol="BTC/USD"):
+    price = 40000.0 + minute
+    return Bar(symbol, START + timedelta(minutes=minute), price, price + 5, price - 5, price + 1, 0.5 + minute)
+
+def _check(records, minutes):
+    assert [int(t) for t in records['timestamp']] == [int((START + timedelta(minutes=m)).timestamp()) for m in minutes]
+    for record, minute in zip(records, minutes):
+        expected = _bar(minute)
+        assert (record['open'], record['high'], record['low'], record['close'], record['volume']) == \
+            (expected.open, expected.high, expected.low, expected.close, expected.volume)
+
+def test_append_after_partial_record(tmp_path):
+    store = BarStore(str(tmp_path))
+    for minute in range(3):
+        store.append(_bar(minute))
+    store.close()
+
+    # A crash mid-write leaves part of a fourth record at the end of the file
+    path = os.path.join(tmp_path, "BTC-USD", "2024-01-02.bin")
+    with open(path, 'ab') as f:
+        f.write(b'\x01' * (BAR_DTYPE.itemsize // 2))
+
+    store = BarStore(str(tmp_path))
+    for minute in range(3, 6):
+        store.append(_bar(minute))
+    store.close()
+
+    assert os.path.getsize(path) == 6 * BAR_DTYPE.itemsize
+    _check(BarStore(str(tmp_path)).load_recent("BTC/USD", 10), range(6))
+
+def test_corrections_and_day_files(tmp_path):
+    store = BarStore(str(tmp_path))
+    # Two days of bars, with a correction to the last one
+    for minute in range(1430, 1450):
+        store.append(_bar(minute))
+    store.append(_bar(1449))
+    store.close()
+
+    assert sorted(os.listdir(os.path.join(tmp_path, "BTC-USD"))) == ["2024-01-02.bin", "2024-01-03.bin"]
+    _check(BarStore(str(tmp_path)).load_recent("BTC/USD", 15), range(1435, 1450))
\ No newline at end of file
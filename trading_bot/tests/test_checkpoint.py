@@ -0,0 +1,41 @@
+import os
+import pytest
+from trading.checkpoint import HEADER, MAGIC, VERSION, read_checkpoint, write_checkpoint
+
+STATE = {'saved_at': 1704153600.0, 'market': {'BTC/USD': {'closes': b'\x00' * 16, 'last_timestamp': 1704153540}},
+         'strategies': {'BTC/USD': {'last_trade_time': None, 'price_history': [40000.0, 40001.5]}}}
+
+def test_round_trip(tmp_path):
+    path = str(tmp_path / "checkpoint.bin")
+    size = write_checkpoint(path, STATE)
+    assert os.path.getsize(path) == size
+    assert read_checkpoint(path) == STATE
+    assert not os.path.exists(path + ".tmp")
+
+    # A second save replaces the first
+    write_checkpoint(path, {**STATE, 'saved_at': 1704153660.0})
+    assert read_checkpoint(path)['saved_at'] == 1704153660.0
+
+def _rewrite(path, change):
+    with open(path, 'rb') as f:
+        data = bytearray(f.read())
+    change(data)
+    with open(path, 'wb') as f:
+        f.write(data)
+
+def _set_version(data, version):
+    _, _, crc = HEADER.unpack_from(data)
+    HEADER.pack_into(data, 0, MAGIC, version, crc)
+
+@pytest.mark.parametrize('change, error', [
+    (lambda data: data.__setitem__(-1, data[-1] ^ 0xFF), "checksum mismatch"),
+    (lambda data: _set_version(data, VERSION + 1), f"format version {VERSION + 1}"),
+    (lambda data: data.__setitem__(slice(0, 4), b"XXXX"), "not a checkpoint file"),
+    (lambda data: data.__delitem__(slice(HEADER.size - 1, None)), "truncated"),
+])
+def test_damaged_or_foreign_files_are_rejected(tmp_path, change, error):
+    path = str(tmp_path / "checkpoint.bin")
+    write_checkpoint(path, STATE)
+    _rewrite(path, change)
+    with pytest.raises(ValueError, match=error):
+        read_checkpoint(path)
\ No newline at end of file
@@ -0,0 +1,67 @@
+import math
+import random
+from trading.indicators import EMA, RollingWindow
+
+def _check(window, values):
+    expected = values[-window.size:]
+    assert list(window.values) == expected
+    assert math.isclose(window.sum, sum(expected), rel_tol=1e-9, abs_tol=1e-9)
+    assert math.isclose(window.mean, sum(expected) / len(expected), rel_tol=1e-9)
+    assert window.min == min(expected)
+    assert window.max == max(expected)
+
+def test_append_and_replace_last_match_brute_force():
+    rng = random.Random(7)
+    for size in (1, 2, 5, 30):
+        window = RollingWindow(size)
+        values = []
+        for _ in range(2000):
+            # Few distinct prices, so ties and repeated replacements of the same minute are common
+            value = float(rng.randint(0, 20))
+            if values and rng.random() < 0.4:
+                values[-1] = value
+                window.replace_last(value)
+            else:
+                values.append(value)
+                window.append(value)
+            _check(window, values)
+
+def test_replace_current_min_and_max():
+    window = RollingWindow(4)
+    values = [5.0, 3.0, 8.0, 1.0]
+    for value in values:
+        window.append(value)
+
+    # The newest value is the min; raising it hands the min back to the one it displaced
+    for value in (9.0, 0.5, 3.0):
+        values[-1] = value
+        window.replace_last(value)
+        _check(window, values)
+
+    values.append(9.5)  # the new max
+    window.append(9.5)
+    for value in (2.0, 10.0, 7.0):
+        values[-1] = value
+        window.replace_last(value)
+        _check(window, values)
+
+    # Corrections after the old extremes have slid out of the window
+    for value in (4.0, 6.0, 4.5):
+        values.append(value)
+        window.append(value)
+        window.replace_last(value - 1)
+        values[-1] = value - 1
+        _check(window, values)
+
+def test_replace_last_on_empty_window_appends():
+    window = RollingWindow(3)
+    window.replace_last(2.0)
+    _check(window, [2.0])
+
+def test_ema_replace_last():
+    ema, corrected = EMA(3), EMA(3)
+    for value in (10.0, 12.0, 11.0):
+        ema.update(value)
+    for value in (10.0, 12.0, 15.0):
+        corrected.update(value)
+    assert ema.replace_last(15.0) == corrected.value
\ No newline at end of file
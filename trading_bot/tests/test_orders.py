@@ -0,0 +1,129 @@
+import logging
+import threading
+from types import SimpleNamespace
+import pytest
+from trading import orders
+from trading.orders import OrderPipeline, is_retryable
+
+class APIError(Exception):
+    def __init__(self, status_code):
+        super().__init__(f"HTTP {status_code}")
+        self.status_code = status_code
+
+class FakeTradingClient:
+    """Fails each submit with the next of `errors`, then accepts; `reached` errors are raised after the order lands"""
+    def __init__(self, errors=(), reached=False):
+        self.errors = list(errors)
+        self.reached = reached
+        self.orders = {}  # client order id -> order
+        self.submits = 0
+        self.lookups = 0
+        self.before_response = None  # called with the new order before submit returns, like an early stream update
+
+    def submit_buy_order(self, symbol, amount, client_order_id):
+        self.submits += 1
+        if self.errors and not self.reached:
+            raise self.errors.pop(0)
+        order = SimpleNamespace(id=f"order-{self.submits}", client_order_id=client_order_id, status="accepted")
+        self.orders[client_order_id] = order
+        if self.errors:
+            raise self.errors.pop(0)
+        if self.before_response is not None:
+            self.before_response(order)
+        return order
+
+    def find_order(self, client_order_id):
+        self.lookups += 1
+        return self.orders.get(client_order_id)
+
+    def get_order(self, order_id):
+        raise AssertionError("the trade updates stream should have been enough")
+
+class Recorder:
+    def __init__(self):
+        self.acks, self.done, self.errors = [], [], []
+        self.finished = threading.Event()
+
+    def on_ack(self, intent, order):
+        self.acks.append(order)
+
+    def on_done(self, intent, order):
+        self.done.append(order)
+        self.finished.set()
+
+    def on_error(self, intent, error):
+        self.errors.append(error)
+        self.finished.set()
+
+@pytest.fixture(autouse=True)
+def no_backoff(monkeypatch):
+    monkeypatch.setattr(orders, 'ORDER_RETRY_BACKOFF', 0)
+
+def _submit(client):
+    pipeline = OrderPipeline(client, logging.getLogger(__name__), workers=1, max_retries=2, poll_interval=3600)
+    recorder = Recorder()
+    pipeline.submit("BTC/USD", 100.0, "2024-01-02T00:00", recorder.on_ack, recorder.on_done, recorder.on_error)
+    assert recorder.finished.wait(5)
+    return pipeline, recorder
+
+def _acked(recorder):
+    event = threading.Event()
+    original = recorder.on_ack
+
+    def on_ack(intent, order):
+        original(intent, order)
+        event.set()
+
+    recorder.on_ack = on_ack
+    return event
+
+def test_only_transient_errors_are_retried():
+    assert is_retryable(APIError(503)) and is_retryable(APIError(429)) and is_retryable(APIError(408))
+    assert not is_retryable(APIError(403)) and not is_retryable(APIError(422))
+    assert is_retryable(ConnectionError()) and is_retryable(TimeoutError())
+    assert not is_retryable(ValueError("unparseable response"))
+
+@pytest.mark.parametrize('error', [APIError(403), ValueError("unparseable response")])
+def test_permanent_error_is_not_retried(error):
+    client = FakeTradingClient([error])
+    _, recorder = _submit(client)
+    assert recorder.errors == [error] and not recorder.acks
+    assert client.submits == 1 and client.lookups == 0
+
+def test_transient_error_is_looked_up_before_resubmitting():
+    client = FakeTradingClient([APIError(503), ConnectionError()])
+    pipeline = OrderPipeline(client, logging.getLogger(__name__), workers=1, max_retries=2, poll_interval=3600)
+    recorder = Recorder()
+    acked = _acked(recorder)
+    pipeline.submit("BTC/USD", 100.0, "2024-01-02T00:00", recorder.on_ack, recorder.on_done, recorder.on_error)
+    assert acked.wait(5)
+    assert client.submits == 3 and client.lookups == 2
+    assert not recorder.errors
+
+def test_order_that_reached_alpaca_is_not_sent_twice():
+    client = FakeTradingClient([TimeoutError()], reached=True)
+    pipeline = OrderPipeline(client, logging.getLogger(__name__), workers=1, max_retries=2, poll_interval=3600)
+    recorder = Recorder()
+    acked = _acked(recorder)
+    cid = pipeline.submit("BTC/USD", 100.0, "2024-01-02T00:00", recorder.on_ack, recorder.on_done, recorder.on_error)
+    assert acked.wait(5)
+    assert client.submits == 1 and client.lookups == 1
+    assert recorder.acks == [client.orders[cid]]
+
+    # The fill then comes from the trade updates stream
+    filled = SimpleNamespace(id=recorder.acks[0].id, client_order_id=cid, status="filled")
+    pipeline.on_trade_update('fill', filled)
+    pipeline.on_trade_update('fill', filled)  # a repeat doesn't finish it twice
+    assert recorder.done == [filled] and not pipeline.open_orders()
+
+def test_fill_that_beats_the_submit_response():
+    client = FakeTradingClient()
+    pipeline = OrderPipeline(client, logging.getLogger(__name__), workers=1, max_retries=2, poll_interval=3600)
+    client.before_response = lambda order: pipeline.on_trade_update(
+        'fill', SimpleNamespace(id=order.id, client_order_id=order.client_order_id, status="filled"))
+    recorder = Recorder()
+    pipeline.submit("BTC/USD", 100.0, "2024-01-02T00:00", recorder.on_ack, recorder.on_done, recorder.on_error)
+    assert recorder.finished.wait(5)
+    assert [order.status for order in recorder.acks] == ["accepted"]
+    assert [order.status for order in recorder.done] == ["filled"]
+    assert not pipeline.open_orders()
\ No newline at end of file
@@ -0,0 +1,29 @@
+import logging
+from datetime import datetime, timedelta, timezone
+from trading.events import BarEvent
+from trading.strategy import TradingStrategy
+
+START = datetime(2024, 1, 2, 0, 0, tzinfo=timezone.utc)
+
+def _evaluate(strategy, event, price):
+    # What execute() does with the price history, without a market or account
+    record = strategy.history_change(event)
+    strategy.should_buy(price, ([], None), record=record)
+    if record:
+        strategy.last_bar_time = int(event.timestamp.timestamp())
+
+def test_minute_history_steps_once_per_bar():
+    strategy = TradingStrategy(None, None, logging.getLogger(__name__), symbol="BTC/USD",
+                               params={'local_min_window': 3})
+    _evaluate(strategy, BarEvent("bar", "BTC/USD", START, 100.0), 100.0)
+    _evaluate(strategy, BarEvent("update", "BTC/USD", START, 100.5), 100.5)
+    _evaluate(strategy, None, 100.5)  # heartbeat
+    _evaluate(strategy, BarEvent("tick", "BTC/USD", START, 100.7), 100.7)
+    assert list(strategy.local_min_window.values) == [100.5]
+    assert list(strategy.price_history.values) == [100.5]
+
+    _evaluate(strategy, BarEvent("bar", "BTC/USD", START + timedelta(minutes=1), 99.0), 99.0)
+    _evaluate(strategy, BarEvent("bar", "BTC/USD", START + timedelta(minutes=1), 98.0), 98.0)  # repeated minute
+    _evaluate(strategy, BarEvent("update", "BTC/USD", START, 101.0), 101.0)  # too old to correct
+    assert list(strategy.local_min_window.values) == [100.5, 98.0]
+    assert strategy.price_history.mean == (100.5 + 98.0) / 2
\ No newline at end of file
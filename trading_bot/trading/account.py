@@ -0,0 +1,190 @@
+from config.settings import (ALPACA_API_KEY, ALPACA_SECRET_KEY, PAPER_TRADING, ALPACA_TRADING_STREAM_URL,
+                             ACCOUNT_RECONCILE_INTERVAL)
+from utils.metrics import metrics
+import threading
+import time
+
+# Trade update events after which an order can no longer fill
+TERMINAL_EVENTS = {'fill', 'canceled', 'expired', 'rejected', 'done_for_day', 'replaced'}
+
+def _position_key(symbol):
+    # Orders use "BTC/USD" while positions come back as "BTCUSD"
+    return symbol.replace("/", "")
+
+class AccountState:
+    """In-memory account and position state for the decision path.
+
+    Seeded from REST once at startup, then kept current from the trade
+    updates websocket: the notional of each order we submit is held back
+    from buying power until the order fills or is cancelled. A background
+    thread reconciles against REST every ACCOUNT_RECONCILE_INTERVAL seconds;
+    holds for orders still open are applied again on top of what REST
+    reports, so buying power errs low, never high, while they're pending.
+    """
+    def __init__(self, trading_client, logger, reconcile_interval=ACCOUNT_RECONCILE_INTERVAL, start_stream=True):
+        self.trading_client = trading_client
+        self.logger = logger
+        self.reconcile_interval = reconcile_interval
+        self.cash = None
+        self.buying_power = None
+        self.portfolio_value = None
+        self.daily_pl = None
+        self.positions = {}  # position symbol -> qty
+        self.ready = False
+        self.last_reconcile = None
+        self._reserved = {}  # order id -> (notional held back from buying power, monotonic time reserved)
+        self._filled = {}  # order id -> (qty, cost) filled so far, and how much of that cost was applied unreserved
+        self._terminal = {}  # order id -> monotonic time it finished, for orders not reserved (yet)
+        self._listeners = []  # called with (event, order) after each trade update is applied
+        self._lock = threading.Lock()
+
+        self.refresh()
+        if start_stream:
+            self._start_trade_stream()
+            self._start_reconciler()
+
+    def get_account_info(self):
+        """Same shape as AlpacaTradingClient.get_account_info, served from memory"""
+        if not self.ready:
+            return None
+        return {
+            'cash': self.cash,
+            'portfolio_value': self.portfolio_value,
+            'buying_power': self.buying_power,
+            'daily_pl': self.daily_pl
+        }
+
+    def get_position(self, symbol):
+        return self.positions.get(_position_key(symbol), 0.0)
+
+    def refresh(self):
+        """Replace local state with the account as reported by REST"""
+        with metrics.span('account_refresh'):
+            account_info = self.trading_client.get_account_info()
+            positions = self.trading_client.get_positions()
+        if account_info is None:
+            return False
+
+        with self._lock:
+            self._expire(time.monotonic())
+            # REST may not count orders that are still being accepted, so keep their holds
+            held = sum(amount for amount, _ in self._reserved.values())
+            buying_power = account_info['buying_power'] - held
+            if self.ready and abs(buying_power - self.buying_power) > 0.01:
+                self.logger.info(f"Account reconcile: buying power ${self.buying_power:,.2f} -> ${buying_power:,.2f}")
+            self.cash = account_info['cash'] - held
+            self.buying_power = buying_power
+            self.portfolio_value = account_info['portfolio_value']
+            self.daily_pl = account_info['daily_pl']
+            if positions is not None:
+                self.positions = positions
+            self.ready = True
+            self.last_reconcile = time.time()
+        return True
+
+    def reserve(self, order_id, amount):
+        """Hold back the notional of an order we just submitted"""
+        order_id = str(order_id)
+        with self._lock:
+            if self._terminal.pop(order_id, None) is not None:
+                # The fill already arrived and was applied in full
+                return
+            self._reserved[order_id] = (amount, time.monotonic())
+            # Before the first snapshot the hold is applied when it arrives. Partial
+            # fills that beat this call were applied directly; hold only the rest
+            qty, cost, applied = self._filled.get(order_id, (0.0, 0.0, 0.0))
+            self._filled[order_id] = (qty, cost, 0.0)
+            if self.ready:
+                self.buying_power -= amount - applied
+                self.cash -= amount - applied
+
+    def add_trade_listener(self, listener):
+        """Also pass each trade update (event, order) to listener, e.g. OrderPipeline.on_trade_update"""
+        self._listeners.append(listener)
+
+    def apply_trade_update(self, event, order):
+        """Adjust local state for one trade update event"""
+        order_id = str(order.id)
+        is_buy = str(getattr(order.side, 'value', order.side)).lower() == 'buy'
+        sign = 1 if is_buy else -1
+
+        with self._lock:
+            if event in ('fill', 'partial_fill'):
+                qty = float(order.filled_qty or 0)
+                cost = qty * float(order.filled_avg_price or 0)
+                prev_qty, prev_cost, applied = self._filled.get(order_id, (0.0, 0.0, 0.0))
+
+                key = _position_key(order.symbol)
+                self.positions[key] = self.positions.get(key, 0.0) + sign * (qty - prev_qty)
+
+                if order_id not in self._reserved and self.ready:
+                    # Not one of ours (or not reserved yet): apply the cash movement directly
+                    self.buying_power -= sign * (cost - prev_cost)
+                    self.cash -= sign * (cost - prev_cost)
+                    applied += sign * (cost - prev_cost)
+                self._filled[order_id] = (qty, cost, applied)
+
+            if event in TERMINAL_EVENTS:
+                _, cost, _ = self._filled.pop(order_id, (0.0, 0.0, 0.0))
+                if order_id in self._reserved:
+                    # Swap the hold for what the order actually cost
+                    reserved, _ = self._reserved.pop(order_id)
+                    if self.ready:
+                        self.buying_power += reserved - cost
+                        self.cash += reserved - cost
+                else:
+                    self._terminal[order_id] = time.monotonic()
+
+    def _expire(self, now):
+        """Forget finished orders nobody reserved for, and holds whose order never reported back"""
+        # A reserve follows its order's terminal event within moments, if at all
+        for order_id, finished in list(self._terminal.items()):
+            if now - finished > self.reconcile_interval:
+                del self._terminal[order_id]
+        # A missed trade update would otherwise hold the notional back forever
+        for order_id, (amount, reserved_at) in list(self._reserved.items()):
+            if now - reserved_at > self.reconcile_interval:
+                del self._reserved[order_id]
+                self._filled.pop(order_id, None)
+                self.logger.warning(f"Dropping ${amount:,.2f} hold for order {order_id}: no update for "
+                                    f"{self.reconcile_interval}s")
+
+    def _start_trade_stream(self):
+        """Follow fills and cancels on the trade updates websocket"""
+        async def handle_trade_update(data):
+            event = str(getattr(data.event, 'value', data.event))
+            try:
+                self.apply_trade_update(event, data.order)
+                if self.ready:
+                    self.logger.info(f"TRADE UPDATE: {event} {data.order.symbol} | "
+                                     f"Buying Power: ${self.buying_power:,.2f}")
+            except Exception as e:
+                self.logger.error(f"Error applying trade update: {str(e)}")
+            for listener in self._listeners:
+                try:
+                    listener(event, data.order)
+                except Exception as e:
+                    self.logger.error(f"Error in trade update listener: {str(e)}")
+
+        def run_stream():
+            from alpaca.trading.stream import TradingStream  # loaded on this thread, off the startup path
+
+            stream = TradingStream(ALPACA_API_KEY, ALPACA_SECRET_KEY, paper=PAPER_TRADING,
+                                   url_override=ALPACA_TRADING_STREAM_URL)
+            stream.subscribe_trade_updates(handle_trade_update)
+            self.logger.info("Trade updates stream connected and running")
+            stream.run()
+
+        threading.Thread(target=run_stream, daemon=True).start()
+
+    def _start_reconciler(self):
+        """Periodically correct any drift against the REST account"""
+        def run_reconciler():
+            while True:
+                time.sleep(self.reconcile_interval)
+                try:
+                    self.refresh()
+                except Exception as e:
+                    self.logger.error(f"Error reconciling account: {str(e)}")
+
+        threading.Thread(target=run_reconciler, daemon=True).start()
\ No newline at end of file
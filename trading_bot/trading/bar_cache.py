@@ -0,0 +1,152 @@
+from datetime import datetime, timedelta, timezone
+import threading
+import time
+from config.settings import ALPACA_API_KEY, ALPACA_SECRET_KEY, ALPACA_DATA_URL, BAR_CACHE_TTL
+from trading.gateway import gateway, adopt_sdk_client
+
+# Length of one bar for each timeframe unit we fetch (TimeFrameUnit values)
+_UNIT_PERIODS = {
+    'Min': timedelta(minutes=1),
+    'Hour': timedelta(hours=1),
+    'Day': timedelta(days=1),
+}
+
+def bar_timeframe(minutes=60):
+    """Alpaca TimeFrame for bars `minutes` long"""
+    # Imported here: the SDK takes most of a second to load, and backtests never need it
+    from alpaca.data.timeframe import TimeFrame, TimeFrameUnit
+    return TimeFrame.Hour if minutes == 60 else TimeFrame(minutes, TimeFrameUnit.Minute)
+
+class _CacheEntry:
+    __slots__ = ('bars', 'hours', 'fetched_at', 'bar_start', 'lock')
+
+    def __init__(self, hours):
+        self.bars = []  # oldest first
+        self.hours = hours  # how far back this entry holds bars
+        self.fetched_at = 0.0  # monotonic time of the last refresh
+        self.bar_start = None  # start of the bar period the last refresh ran in
+        # Held while refreshing, so callers wanting the same bars wait for that request
+        self.lock = threading.Lock()
+
+class BarCache:
+    """Historical bars shared by every caller, keyed by symbol and timeframe.
+
+    Each refresh only asks Alpaca for bars from the newest stored bar onwards
+    (that bar is re-fetched because it may have still been forming). Entries
+    go stale after BAR_CACHE_TTL seconds or when a new bar period starts.
+    get_bars_many() refreshes every stale symbol with one multi-symbol
+    request, and all requests go through the REST gateway. The historical
+    client is created on first use.
+    """
+    def __init__(self, logger, client=None, ttl=BAR_CACHE_TTL):
+        self._client = client
+        self.logger = logger
+        self.ttl = ttl
+        self.gateway = gateway
+        self._entries = {}
+        self._lock = threading.Lock()  # guards _entries and creating the client
+
+    @property
+    def client(self):
+        if self._client is None:
+            with self._lock:
+                if self._client is None:
+                    from alpaca.data.historical.crypto import CryptoHistoricalDataClient
+                    self._client = adopt_sdk_client(CryptoHistoricalDataClient(
+                        api_key=ALPACA_API_KEY,
+                        secret_key=ALPACA_SECRET_KEY,
+                        url_override=ALPACA_DATA_URL
+                    ))
+        return self._client
+
+    def get_bars(self, symbol, timeframe=None, hours=24):
+        """Return the bars for the last `hours` hours, oldest first (hourly bars unless a timeframe is given)"""
+        return self.get_bars_many([symbol], timeframe, hours)[symbol]
+
+    def get_bars_many(self, symbols, timeframe=None, hours=24):
+        """Return {symbol: bars for the last `hours` hours}, refreshing stale symbols in one request"""
+        timeframe = timeframe or bar_timeframe()
+        symbols = sorted(set(symbols))  # entry locks are always taken in this order
+        entries = {symbol: self._entry(symbol, timeframe, hours) for symbol in symbols}
+        for entry in entries.values():
+            entry.lock.acquire()
+        try:
+            now = datetime.now(timezone.utc)
+            stale = {symbol: entry for symbol, entry in entries.items() if self._is_stale(entry, timeframe, now)}
+            if stale:
+                try:
+                    self._refresh(stale, timeframe, now)
+                except Exception as e:
+                    if any(not entry.bars for entry in stale.values()):
+                        raise
+                    self.logger.error(f"Error refreshing {', '.join(stale)} bars, serving cached data: {str(e)}")
+
+            cutoff = now - timedelta(hours=hours)
+            return {symbol: [bar for bar in entry.bars if bar.timestamp >= cutoff]
+                    for symbol, entry in entries.items()}
+        finally:
+            for entry in entries.values():
+                entry.lock.release()
+
+    def fetch(self, request):
+        """Run a bars request through the REST gateway; identical requests in flight share one call"""
+        return self.gateway.call("data", self.client.get_crypto_bars, request, key=('bars', str(request)))
+
+    def _entry(self, symbol, timeframe, hours):
+        key = (symbol, str(timeframe))
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or hours > entry.hours:
+                # Nothing cached yet, or callers now want a longer window
+                entry = _CacheEntry(hours)
+                self._entries[key] = entry
+            return entry
+
+    def invalidate(self, symbol=None):
+        """Drop cached bars for one symbol, or everything"""
+        with self._lock:
+            if symbol is None:
+                self._entries.clear()
+            else:
+                for key in [k for k in self._entries if k[0] == symbol]:
+                    del self._entries[key]
+
+    def _is_stale(self, entry, timeframe, now):
+        if entry.bar_start is None:
+            return True
+        if time.monotonic() - entry.fetched_at > self.ttl:
+            return True
+        # A new bar has started since we last looked
+        return _bar_start(now, timeframe) != entry.bar_start
+
+    def _refresh(self, entries, timeframe, now):
+        """Bring {symbol: entry} up to date with one request from the earliest start any of them needs"""
+        from alpaca.data.requests import CryptoBarsRequest
+
+        starts = {
+            symbol: entry.bars[-1].timestamp if entry.bars else now - timedelta(hours=entry.hours)
+            for symbol, entry in entries.items()
+        }
+        request = CryptoBarsRequest(
+            symbol_or_symbols=list(entries),
+            timeframe=timeframe,
+            start=min(starts.values()),
+            end=now
+        )
+        response = self.fetch(request)
+
+        for symbol, entry in entries.items():
+            start = starts[symbol]
+            new_bars = [bar for bar in response.data.get(symbol, []) if bar.timestamp >= start]
+            # Replace the re-fetched tail and drop bars that fell out of the window
+            cutoff = now - timedelta(hours=entry.hours)
+            kept = [bar for bar in entry.bars if bar.timestamp < start and bar.timestamp >= cutoff]
+            entry.bars = kept + new_bars
+            entry.fetched_at = time.monotonic()
+            entry.bar_start = _bar_start(now, timeframe)
+
+def _bar_start(now, timeframe):
+    """Start of the bar period containing `now`"""
+    period = _UNIT_PERIODS.get(timeframe.unit.value, timedelta(hours=1)) * timeframe.amount
+    epoch = datetime(1970, 1, 1, tzinfo=timezone.utc)
+    return epoch + ((now - epoch) // period) * period
\ No newline at end of file
@@ -0,0 +1,146 @@
+import sys
+from multiprocessing import resource_tracker, shared_memory
+import numpy as np
+from config.settings import BAR_RING_CAPACITY
+
+# Live bars and corrections are handled like stream events; seeded bars (warm
+# starts and backfills) only update state, like MarketData._seed
+KINDS = ("bar", "update", "seed")
+
+RING_DTYPE = np.dtype([
+    ('seq', '<i8'),  # write sequence number; -1 while the record is being written
+    ('symbol', '<i4'),  # index into the ring's symbol list
+    ('kind', '<i4'),  # index into KINDS
+    ('timestamp', '<i8'),  # bar start, epoch seconds
+    ('open', '<f8'),
+    ('high', '<f8'),
+    ('low', '<f8'),
+    ('close', '<f8'),
+    ('volume', '<f8'),
+])
+HEADER_SIZE = 64  # starts with the count of records ever written (int64)
+
+class SharedBarRing:
+    """Minute bars in a shared-memory ring buffer, with one writer process and any number of readers.
+
+    Records have a fixed size and are written in place, and the header
+    counts the records written so far. Every process maps the same buffer
+    as a NumPy array, so nothing is pickled or sent through a pipe. Each
+    record's sequence number is written last, which lets a reader detect
+    records the writer overwrote while it was reading them.
+    """
+    def __init__(self, symbols, capacity=BAR_RING_CAPACITY, name=None):
+        self.symbols = list(symbols)
+        self._index = {symbol: i for i, symbol in enumerate(self.symbols)}
+        self.capacity = capacity
+        self.owner = name is None
+        if self.owner:
+            self.shm = shared_memory.SharedMemory(create=True, size=HEADER_SIZE + capacity * RING_DTYPE.itemsize)
+        else:
+            self.shm = _attach(name)
+        self.name = self.shm.name
+        self._written = np.ndarray((1,), dtype='<i8', buffer=self.shm.buf)
+        self.records = np.ndarray((capacity,), dtype=RING_DTYPE, buffer=self.shm.buf, offset=HEADER_SIZE)
+        if self.owner:
+            self.records['seq'] = -1
+            self._written[0] = 0
+
+    @property
+    def written(self):
+        """Records written since the ring was created"""
+        return int(self._written[0])
+
+    def write(self, kind, bar):
+        """Append one streamed bar ("bar") or correction ("update")"""
+        index = self._index.get(bar.symbol)
+        if index is None:
+            return
+        seq = int(self._written[0])
+        slot = seq % self.capacity
+        seqs = self.records['seq']
+        seqs[slot] = -1
+        self.records[slot] = (-1, index, KINDS.index(kind), int(bar.timestamp.timestamp()), bar.open, bar.high,
+                              bar.low, bar.close, bar.volume)
+        seqs[slot] = seq
+        self._written[0] = seq + 1
+
+    def write_records(self, symbol, records):
+        """Append BAR_DTYPE records (oldest first) as seeded bars"""
+        index = self._index.get(symbol)
+        if index is None or len(records) == 0:
+            return
+        records = records[-self.capacity:]
+        start = int(self._written[0])
+        seqs = np.arange(start, start + len(records))
+        slots = seqs % self.capacity
+
+        batch = np.empty(len(records), dtype=RING_DTYPE)
+        batch['seq'] = -1
+        batch['symbol'] = index
+        batch['kind'] = KINDS.index("seed")
+        for field in records.dtype.names:
+            batch[field] = records[field]
+        self.records['seq'][slots] = -1
+        self.records[slots] = batch
+        self.records['seq'][slots] = seqs
+        self._written[0] = start + len(records)
+
+    def close(self):
+        # Unlink first, so the segment is removed (and unregistered) even if
+        # the close below fails
+        if self.owner:
+            self.shm.unlink()
+        # Drop our views; the buffer can't be closed while any exist
+        self._written = None
+        self.records = None
+        try:
+            self.shm.close()
+        except BufferError:
+            pass  # a view is still held elsewhere (e.g. mid-write on shutdown); it's unmapped at exit
+
+def _attach(name):
+    """Open an existing ring's segment without making this process responsible for removing it"""
+    if sys.version_info >= (3, 13):
+        return shared_memory.SharedMemory(name=name, track=False)
+    # Before 3.13 attaching always registers the segment with this process's
+    # resource tracker, which removes whatever is still registered when the
+    # process tree exits. Processes started by multiprocessing share the
+    # creator's tracker, where the creator's unlink unregisters it (and
+    # unregistering here as well would make that fail). Any other process
+    # would start its own tracker, which would report the segment as leaked
+    # and remove it, so there it's unregistered right away.
+    shared_tracker = resource_tracker._resource_tracker._fd is not None
+    shm = shared_memory.SharedMemory(name=name)
+    if not shared_tracker:
+        resource_tracker.unregister(shm._name, "shared_memory")
+    return shm
+
+class RingReader:
+    """One reader's position in a SharedBarRing; starts at the oldest record still in it"""
+    def __init__(self, ring):
+        self.ring = ring
+        self.cursor = max(ring.written - ring.capacity, 0)
+        self.missed = 0  # records overwritten before this reader got to them
+
+    def read(self, limit=4096):
+        """Copy of up to `limit` records written since the last read, oldest first"""
+        ring = self.ring
+        written = ring.written
+        if written - self.cursor > ring.capacity:
+            # Lapped by the writer: skip to the oldest record still there
+            self.missed += written - ring.capacity - self.cursor
+            self.cursor = written - ring.capacity
+        end = min(written, self.cursor + limit)
+        if end == self.cursor:
+            return ring.records[:0].copy()
+
+        expected = np.arange(self.cursor, end)
+        slots = expected % ring.capacity
+        batch = ring.records[slots]
+        # A record rewritten while it was copied has a different sequence number
+        # before or after the copy; keep everything before the first one
+        valid = (batch['seq'] == expected) & (ring.records['seq'][slots] == expected)
+        if not valid.all():
+            batch = batch[:int(np.argmin(valid))]
+        self.cursor += len(batch)
+        return batch
\ No newline at end of file
@@ -0,0 +1,143 @@
+import atexit
+import os
+import queue
+import threading
+from datetime import datetime, timezone
+import numpy as np
+from config.settings import BAR_STORE_DIR
+
+# One fixed-size record per bar; corrections are appended as a new record
+BAR_DTYPE = np.dtype([
+    ('timestamp', '<i8'),  # bar start, epoch seconds
+    ('open', '<f8'),
+    ('high', '<f8'),
+    ('low', '<f8'),
+    ('close', '<f8'),
+    ('volume', '<f8'),
+])
+
+class BarStore:
+    """Append-only columnar minute-bar files, one per symbol per UTC day.
+
+    Files are raw arrays of BAR_DTYPE records, so they can be memory-mapped
+    straight back into NumPy. A bar that was corrected appears more than
+    once; readers keep the last record for each timestamp. Appends are
+    queued and written by a background thread, so the stream's event loop
+    never waits on the disk.
+    """
+    def __init__(self, root=BAR_STORE_DIR, logger=None):
+        self.root = root
+        self.logger = logger
+        self._files = {}  # symbol -> (day, open file); only the writer thread uses these
+        self._pending = queue.Queue()  # (symbol, records), or None to stop the writer
+        self._writer = None
+        self._lock = threading.Lock()
+
+    def append(self, bar):
+        """Queue one bar (or a correction) for its symbol's file for the day"""
+        row = (int(bar.timestamp.timestamp()), bar.open, bar.high, bar.low, bar.close, bar.volume)
+        self._put(bar.symbol, [row])
+
+    def append_many(self, symbol, records):
+        """Queue a batch of BAR_DTYPE records, oldest first"""
+        self._put(symbol, records)
+
+    def flush(self):
+        """Wait until everything queued so far is written"""
+        self._pending.join()
+
+    def load_recent(self, symbol, count):
+        """Return up to `count` of the newest bars for a symbol, oldest first"""
+        directory = self._symbol_dir(symbol)
+        if not os.path.isdir(directory):
+            return np.empty(0, dtype=BAR_DTYPE)
+
+        chunks = []
+        total = 0
+        # Walk back from the newest day until we have enough bars
+        for name in sorted(os.listdir(directory), reverse=True):
+            records = _map(os.path.join(directory, name))
+            if len(records):
+                chunks.append(records)
+                total += len(records)
+            if total >= count:
+                break
+        if not chunks:
+            return np.empty(0, dtype=BAR_DTYPE)
+
+        records = np.concatenate(chunks[::-1])
+        # Keep the last record written for each timestamp (corrections win)
+        _, last = np.unique(records['timestamp'][::-1], return_index=True)
+        records = records[len(records) - 1 - last]
+        return records[-count:]
+
+    def close(self):
+        """Write what's queued, stop the writer and close the files"""
+        with self._lock:
+            writer, self._writer = self._writer, None
+        if writer is not None:
+            self._pending.put(None)
+            writer.join()
+        for _, f in self._files.values():
+            f.close()
+        self._files.clear()
+
+    def _put(self, symbol, records):
+        if self._writer is None:
+            with self._lock:
+                if self._writer is None:
+                    self._writer = threading.Thread(target=self._write_pending, name="bar-store", daemon=True)
+                    self._writer.start()
+                    # Write whatever is still queued when the process exits
+                    atexit.register(self.close)
+        self._pending.put((symbol, records))
+
+    def _write_pending(self):
+        while True:
+            item = self._pending.get()
+            try:
+                if item is None:
+                    return
+                symbol, records = item
+                self._write(symbol, np.asarray(records, dtype=BAR_DTYPE))
+            except Exception as e:
+                if self.logger is not None:
+                    self.logger.error(f"Error writing bars to the bar store: {str(e)}")
+            finally:
+                self._pending.task_done()
+
+    def _write(self, symbol, records):
+        for day in np.unique(records['timestamp'] // 86400):
+            batch = records[records['timestamp'] // 86400 == day]
+            self._file_for(symbol, _day(int(day) * 86400)).write(batch.tobytes())
+
+    def _file_for(self, symbol, day):
+        current = self._files.get(symbol)
+        if current is not None and current[0] == day:
+            return current[1]
+        if current is not None:
+            current[1].close()
+        directory = self._symbol_dir(symbol)
+        os.makedirs(directory, exist_ok=True)
+        # Unbuffered so every bar reaches the file as soon as it is written
+        f = open(os.path.join(directory, f"{day}.bin"), 'ab', buffering=0)
+        # Drop a partial record left by a crash mid-write, or every record
+        # appended after it would be misaligned
+        size = os.fstat(f.fileno()).st_size
+        if size % BAR_DTYPE.itemsize:
+            f.truncate(size - size % BAR_DTYPE.itemsize)
+        self._files[symbol] = (day, f)
+        return f
+
+    def _symbol_dir(self, symbol):
+        return os.path.join(self.root, symbol.replace('/', '-'))
+
+def _day(timestamp):
+    return datetime.fromtimestamp(timestamp, timezone.utc).strftime('%Y-%m-%d')
+
+def _map(path):
+    # Ignore a partial trailing record left by a crash mid-write
+    count = os.path.getsize(path) // BAR_DTYPE.itemsize
+    if count == 0:
+        return np.empty(0, dtype=BAR_DTYPE)
+    return np.memmap(path, dtype=BAR_DTYPE, mode='r', shape=(count,))
\ No newline at end of file
@@ -0,0 +1,44 @@
+import csv
+from datetime import datetime, timedelta, timezone
+
+class Bar:
+    """Minimal stand-in for an alpaca Bar"""
+    __slots__ = ('symbol', 'timestamp', 'open', 'high', 'low', 'close', 'volume')
+
+    def __init__(self, symbol, timestamp, open, high, low, close, volume):
+        self.symbol = symbol
+        self.timestamp = timestamp
+        self.open = open
+        self.high = high
+        self.low = low
+        self.close = close
+        self.volume = volume
+
+def load_bars_csv(path, symbol):
+    """Load bars from a CSV with timestamp,open,high,low,close,volume columns"""
+    bars = []
+    with open(path, newline='') as f:
+        for row in csv.DictReader(f):
+            timestamp = datetime.fromisoformat(row['timestamp'].replace('Z', '+00:00'))
+            if timestamp.tzinfo is None:
+                timestamp = timestamp.replace(tzinfo=timezone.utc)
+            bars.append(Bar(symbol, timestamp, float(row['open']), float(row['high']),
+                            float(row['low']), float(row['close']), float(row['volume'])))
+    bars.sort(key=lambda bar: bar.timestamp)
+    return bars
+
+def resample_bars(bars, period=timedelta(hours=1)):
+    """Aggregate minute bars into bars of the given period"""
+    resampled = []
+    epoch = datetime(1970, 1, 1, tzinfo=timezone.utc)
+    for bar in bars:
+        start = epoch + ((bar.timestamp - epoch) // period) * period
+        if resampled and resampled[-1].timestamp == start:
+            last = resampled[-1]
+            last.high = max(last.high, bar.high)
+            last.low = min(last.low, bar.low)
+            last.close = bar.close
+            last.volume += bar.volume
+        else:
+            resampled.append(Bar(bar.symbol, start, bar.open, bar.high, bar.low, bar.close, bar.volume))
+    return resampled
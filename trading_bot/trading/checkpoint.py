@@ -0,0 +1,128 @@
+import os
+import struct
+import threading
+import time
+import zlib
+import msgpack
+from config.settings import CHECKPOINT_PATH, CHECKPOINT_INTERVAL
+
+# File layout: magic, format version and CRC32 of the payload, then the msgpack payload
+MAGIC = b"TBCK"
+VERSION = 1
+HEADER = struct.Struct('<4sHI')
+
+def write_checkpoint(path, state):
+    """Write state crash-safely: to a temp file, synced to disk, then renamed over the old one"""
+    payload = msgpack.packb(state, use_bin_type=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, VERSION, zlib.crc32(payload)))
+        f.write(payload)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+    _fsync_dir(os.path.dirname(os.path.abspath(path)))
+    return HEADER.size + len(payload)
+
+def _fsync_dir(path):
+    """Sync a directory so a rename in it survives a power cut"""
+    try:
+        fd = os.open(path, os.O_RDONLY)
+    except OSError:
+        return  # Windows can't open a directory to sync it
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+def read_checkpoint(path):
+    """State from a checkpoint file, raising ValueError if it's another version or damaged"""
+    with open(path, 'rb') as f:
+        data = f.read()
+    if len(data) < HEADER.size:
+        raise ValueError("file is truncated")
+    magic, version, crc = HEADER.unpack_from(data)
+    if magic != MAGIC:
+        raise ValueError("not a checkpoint file")
+    if version != VERSION:
+        raise ValueError(f"format version {version}, expected {VERSION}")
+    payload = memoryview(data)[HEADER.size:]
+    if zlib.crc32(payload) != crc:
+        raise ValueError("checksum mismatch")
+    return msgpack.unpackb(payload, raw=False, strict_map_key=False)
+
+def load_checkpoint(logger, path=CHECKPOINT_PATH):
+    """The last checkpoint's state, or None if there isn't a usable one"""
+    if not path or not os.path.exists(path):
+        return None
+    started = time.perf_counter()
+    try:
+        state = read_checkpoint(path)
+    except Exception as e:
+        logger.error(f"Ignoring checkpoint {path}: {str(e)}")
+        return None
+    logger.info(f"Loaded checkpoint saved {time.time() - state['saved_at']:.0f}s ago "
+                f"in {(time.perf_counter() - started) * 1000:.1f} ms")
+    return state
+
+class Checkpointer:
+    """Periodically saves market data and strategy state for the next start.
+
+    maybe_save() is called from the strategy loop between decisions, so
+    strategy state is read on the thread that owns it (MarketData copies
+    its own state on the stream's loop). Encoding and writing the file
+    happen on a background thread.
+    """
+    def __init__(self, market_data, strategies, logger, path=CHECKPOINT_PATH, interval=CHECKPOINT_INTERVAL):
+        self.market_data = market_data
+        self.strategies = strategies
+        self.logger = logger
+        self.path = path
+        self.interval = interval
+        self._last_save = time.monotonic()
+        self._write_lock = threading.Lock()  # one write at a time, in order
+
+    def capture(self):
+        return {
+            'saved_at': time.time(),
+            'market': self.market_data.checkpoint(),
+            'strategies': {symbol: strategy.checkpoint() for symbol, strategy in self.strategies.items()},
+        }
+
+    def maybe_save(self):
+        """Save in the background if CHECKPOINT_INTERVAL has passed since the last save"""
+        if time.monotonic() - self._last_save < self.interval:
+            return
+        self._last_save = time.monotonic()
+        try:
+            state = self.capture()
+        except Exception as e:
+            self.logger.error(f"Error capturing checkpoint: {str(e)}")
+            return
+        threading.Thread(target=self._write, args=(state,), daemon=True).start()
+
+    def save(self):
+        """Save now and wait for the write, e.g. on shutdown"""
+        try:
+            self._write(self.capture())
+        except Exception as e:
+            self.logger.error(f"Error capturing checkpoint: {str(e)}")
+
+    def _write(self, state):
+        with self._write_lock:
+            started = time.perf_counter()
+            try:
+                size = write_checkpoint(self.path, state)
+            except Exception as e:
+                self.logger.error(f"Error writing checkpoint: {str(e)}")
+                return
+            self.logger.debug("Checkpoint written: %d bytes in %.1f ms", size,
+                              (time.perf_counter() - started) * 1000)
+
+def restore_strategies(strategies, checkpoint):
+    """Resume each strategy that has state in the checkpoint"""
+    age = time.time() - checkpoint['saved_at']
+    for symbol, strategy in strategies.items():
+        state = checkpoint['strategies'].get(symbol)
+        if state is not None:
+            strategy.restore(state, age)
\ No newline at end of file
@@ -1,21 +1,26 @@
-from alpaca.trading.client import TradingClient as AlpacaClient
-from alpaca.trading.requests import MarketOrderRequest
-from alpaca.trading.enums import OrderSide, TimeInForce
-from alpaca.data.historical.crypto import CryptoHistoricalDataClient
-from alpaca.data.requests import CryptoBarsRequest
-from alpaca.data.timeframe import TimeFrame
-from datetime import datetime, timedelta
-from config.settings import ALPACA_API_KEY, ALPACA_SECRET_KEY, PAPER_TRADING
+from config.settings import ALPACA_API_KEY, ALPACA_SECRET_KEY, PAPER_TRADING, ORDER_WORKERS, ALPACA_TRADING_URL
+from trading.bar_cache import BarCache
+from trading.gateway import gateway, adopt_sdk_client
 
 class AlpacaTradingClient:
-    def __init__(self, logger):
-        self.client = AlpacaClient(ALPACA_API_KEY, ALPACA_SECRET_KEY, paper=PAPER_TRADING)
-        self.data_client = CryptoHistoricalDataClient(ALPACA_API_KEY, ALPACA_SECRET_KEY)
+    def __init__(self, logger, bar_cache=None):
+        # The SDK is imported when the first client is created, not when this module is
+        from alpaca.trading.client import TradingClient as AlpacaClient
+
+        # Retries are left to the gateway, and there are enough pooled
+        # keep-alive connections for every order worker
+        self.client = adopt_sdk_client(AlpacaClient(ALPACA_API_KEY, ALPACA_SECRET_KEY, paper=PAPER_TRADING,
+                                                    url_override=ALPACA_TRADING_URL), pool_size=ORDER_WORKERS)
+        # Historical bars come from the cache shared with MarketData
+        self.bar_cache = bar_cache or BarCache(logger)
         self.logger = logger
+        # Every request waits its turn in the process-wide REST rate limit
+        self.gateway = gateway
 
     def get_account_info(self):
         try:
-            account = self.client.get_account()
+            # Concurrent checks (reconcile, strategy fallback) share one request
+            account = self.gateway.call("account", self.client.get_account, key='account')
             return {
                 'cash': float(account.cash),
                 'portfolio_value': float(account.portfolio_value),
@@ -26,21 +31,53 @@ class AlpacaTradingClient:
             self.logger.error(f"Error getting account info: {str(e)}")
             return None
 
-    def place_buy_order(self, symbol, amount):
+    def get_positions(self):
+        """Get open positions as {symbol: qty}"""
+        try:
+            positions = self.gateway.call("account", self.client.get_all_positions, key='positions')
+            return {position.symbol: float(position.qty) for position in positions}
+        except Exception as e:
+            self.logger.error(f"Error getting positions: {str(e)}")
+            return None
+
+    def submit_buy_order(self, symbol, amount, client_order_id=None):
+        """Submit a market buy order, raising on failure"""
+        from alpaca.trading.requests import MarketOrderRequest
+        from alpaca.trading.enums import OrderSide, TimeInForce
+
+        # Create a market order request object
+        market_order_data = MarketOrderRequest(
+            symbol=symbol,
+            notional=amount,  # Convert dollar amount to quantity
+            side=OrderSide.BUY,
+            time_in_force=TimeInForce.GTC,
+            client_order_id=client_order_id
+        )
+        
+        # Submit the order using the approach from the video
+        return self.gateway.call("orders", self.client.submit_order, market_order_data)
+
+    def get_order(self, order_id):
+        """Get an order by its Alpaca order id, raising on failure"""
+        return self.gateway.call("orders", self.client.get_order_by_id, order_id, key=('order', str(order_id)))
+
+    def find_order(self, client_order_id):
+        """Look up an order by client order id, returning None if it doesn't exist"""
+        from alpaca.common.exceptions import APIError
+
+        try:
+            return self.gateway.call("orders", self.client.get_order_by_client_id, client_order_id,
+                                     key=('client_order', client_order_id))
+        except APIError as e:
+            if e.status_code == 404:
+                return None
+            raise
+
+    def place_buy_order(self, symbol, amount, client_order_id=None):
         """Place a market buy order"""
         try:
             self.logger.info(f"PLACING ORDER: ${amount} of {symbol}")
-            
-            # Create a market order request object
-            market_order_data = MarketOrderRequest(
-                symbol=symbol,
-                notional=amount,  # Convert dollar amount to quantity
-                side=OrderSide.BUY,
-                time_in_force=TimeInForce.GTC
-            )
-            
-            # Submit the order using the approach from the video
-            order = self.client.submit_order(market_order_data)
+            order = self.submit_buy_order(symbol, amount, client_order_id)
             
             if order:
                 self.logger.info(f"ORDER PLACED: ID {order.id} | Status: {order.status}")
@@ -53,20 +90,8 @@ class AlpacaTradingClient:
     def get_hourly_bars(self, symbol, limit=24):
         """Get hourly bars for the specified symbol"""
         try:
-            # Calculate start time based on limit
-            start_time = datetime.now() - timedelta(hours=limit)
-            
-            request = CryptoBarsRequest(
-                symbol_or_symbols=symbol,
-                timeframe=TimeFrame.Hour,
-                start=start_time,
-                end=datetime.now()
-            )
-            
-            bars_response = self.data_client.get_crypto_bars(request)
-            
-            # Convert to list and return
-            return list(bars_response[symbol])
+            # Served from the shared cache, which only fetches bars it hasn't seen
+            return self.bar_cache.get_bars(symbol, hours=limit)
         except Exception as e:
             self.logger.error(f"Error getting hourly bars: {str(e)}")
             return [] 
\ No newline at end of file
@@ -1,86 +1,549 @@
-from datetime import datetime, timedelta
-from alpaca.data.historical.crypto import CryptoHistoricalDataClient
-from alpaca.data.requests import CryptoBarsRequest
-from alpaca.data.timeframe import TimeFrame
-from config.settings import SMA_WINDOW, MINUTE_SMA_WINDOW, ALPACA_API_KEY, ALPACA_SECRET_KEY
-from alpaca.data.live import CryptoDataStream
 from collections import deque
+from concurrent.futures import Future
+from datetime import datetime, timezone
+from config.settings import (SMA_WINDOW, MINUTE_SMA_WINDOW, ALPACA_API_KEY, ALPACA_SECRET_KEY, ALPACA_DATA_STREAM_URL,
+                             SYMBOLS, STREAM_STALL_TIMEOUT, STREAM_RECONNECT_BACKOFF, STREAM_RECONNECT_MAX_BACKOFF,
+                             RESAMPLE_PERIODS, RESAMPLE_HISTORY_HOURS, RESAMPLE_VERIFY_INTERVAL, TICK_MODE,
+                             TICK_COALESCE_INTERVAL, TICK_BUFFER_SIZE)
+from trading.bar_cache import BarCache, bar_timeframe
+from trading.bar_store import BAR_DTYPE
+from trading.events import BarEvent, EventQueue
+from trading.indicators import RollingWindow
+from trading.resampler import BarResampler
+from utils.metrics import metrics
+from utils.startup import StartupTimer
 import asyncio
 import threading
+import time
+import numpy as np
+
+class MarketSnapshot:
+    """Immutable view of one symbol's market state at one bar.
+
+    The stream thread builds a new snapshot after every bar or correction
+    (and every coalesced tick update in TICK_MODE) and publishes it with a
+    single reference assignment, so readers on other threads always get a
+    price, SMA and bar timestamp that belong together, without taking a lock.
+    """
+    __slots__ = ('symbol', 'seq', 'timestamp', 'price', 'sma', 'bars', 'hourly', 'bid', 'ask', 'tick_time')
+
+    def __init__(self, symbol, seq, timestamp, price, sma, bars, hourly, bid=None, ask=None, tick_time=None):
+        set_field = object.__setattr__
+        set_field(self, 'symbol', symbol)
+        set_field(self, 'seq', seq)  # increases with every snapshot published for the symbol
+        set_field(self, 'timestamp', timestamp)  # start of the bar, epoch seconds
+        set_field(self, 'price', price)
+        set_field(self, 'sma', sma)
+        set_field(self, 'bars', bars)  # minute bars behind the SMA
+        set_field(self, 'hourly', hourly)  # (completed hourly bars, forming hourly bar) as of this bar
+        # Latest quote, and for snapshots published by a tick update the time of
+        # the newest quote or trade in it (epoch seconds); None for bar updates
+        set_field(self, 'bid', bid)
+        set_field(self, 'ask', ask)
+        set_field(self, 'tick_time', tick_time)
+
+    @property
+    def mid(self):
+        return (self.bid + self.ask) / 2 if self.bid and self.ask else None
+
+    def __setattr__(self, name, value):
+        raise AttributeError("MarketSnapshot is immutable")
+
+class SymbolState:
+    """Real-time state for one symbol, fed by the shared stream.
+
+    Everything but `snapshot` is owned by the stream thread; other threads
+    only read the latest published snapshot.
+    """
+    __slots__ = ('symbol', 'minute_closes', 'resamplers', 'hourly', 'latest_bar', 'last_timestamp', 'seq',
+                 'snapshot', 'bid', 'ask', 'last_trade', 'tick_time', 'ticks', 'ticks_lock', 'tick_flush_pending',
+                 'tick_published_at')
+
+    def __init__(self, symbol, window=MINUTE_SMA_WINDOW, periods=RESAMPLE_PERIODS):
+        self.symbol = symbol
+        # Minute price history (running sums keep the SMA O(1) per bar)
+        self.minute_closes = RollingWindow(window)
+        # Longer bars built from the minute bars, keyed by length in minutes (hourly always included)
+        self.resamplers = {
+            minutes: BarResampler(symbol, minutes, RESAMPLE_HISTORY_HOURS * 60 // minutes)
+            for minutes in sorted(set(periods) | {60})
+        }
+        self.hourly = self.resamplers[60]
+        self.latest_bar = None
+        self.last_timestamp = None  # start of the newest minute bar, epoch seconds
+        self.seq = 0
+        self.snapshot = None  # latest MarketSnapshot; None until the first bar
+        # Quotes and trades, in TICK_MODE
+        self.bid = None
+        self.ask = None
+        self.last_trade = None
+        self.tick_time = None  # newest quote or trade, epoch seconds
+        self.ticks = deque(maxlen=TICK_BUFFER_SIZE)  # recent (time, price, size) trades
+        self.ticks_lock = threading.Lock()  # get_ticks copies the ring from other threads
+        self.tick_flush_pending = False  # a coalesced tick update is scheduled
+        self.tick_published_at = 0.0  # monotonic time of the last tick update
 
 class MarketData:
-    def __init__(self, logger):
-        # Keep the client for hourly/daily data
-        self.client = CryptoHistoricalDataClient(
-            api_key=ALPACA_API_KEY,
-            secret_key=ALPACA_SECRET_KEY
-        )
+    def __init__(self, logger, bar_cache=None, symbols=SYMBOLS, start_stream=True, bar_store=None,
+                 window=MINUTE_SMA_WINDOW, ticks=TICK_MODE, tick_interval=TICK_COALESCE_INTERVAL, restore=None,
+                 bar_ring=None, startup=None):
         self.logger = logger
-        # Initialize minute price history
-        self.minute_closes = deque(maxlen=MINUTE_SMA_WINDOW)
-        self.minute_sma = None
-        self.latest_price = None
-        self.latest_bar = None
-        self.stream_ready = False
-        
-        # Start the WebSocket stream in a background thread
+        # Hourly/daily data comes from the bar cache shared with the trading client
+        self.bar_cache = bar_cache or BarCache(logger)
+        self.symbols = list(symbols)
+        self.window = window
+        self.states = {symbol: SymbolState(symbol, window) for symbol in self.symbols}
+        # Bar and bar-correction (and, with ticks on, coalesced tick) events for the event-driven run mode
+        self.events = EventQueue()
+        self.ticks = ticks
+        self.tick_interval = tick_interval
+        # Local minute-bar history written by the stream and read back on startup
+        self.bar_store = bar_store
+        # Shared-memory ring every applied bar is copied to for strategy worker processes
+        self.bar_ring = bar_ring
+        # Stream supervision (only touched from the stream's event loop, except the heartbeat)
+        self.stream = None
+        self._heartbeat = 0.0  # close time of the newest streamed bar, or of the last (re)connect
+        self._pending = None  # live (kind, bar) events held back while a backfill is in flight
+        self._backfill_generation = 0
+        # Startup: the first backfill waits for history to load, and ready is set once it's applied
+        self.startup = startup or StartupTimer()
+        self._history_loaded = threading.Event()
+        self.ready = threading.Event()
+        # Symbols resumed from a checkpoint skip the REST seed and the bar store
+        restored = self.restore(restore) if restore else set()
+        if not start_stream:
+            # Backtests feed bars through _on_bar/_on_update instead of a stream
+            if bar_store is not None or restored:
+                self.warm_start(skip=restored)
+            self._history_loaded.set()
+            self.ready.set()
+            return
+
+        # Start the WebSocket stream in a background thread first, so connecting and
+        # authenticating overlap loading history; the connect backfill fills the gap after
         self._start_crypto_stream()
+        with self.startup.phase("history"):
+            # Completed hourly bars from REST; everything after is built from the stream
+            self.seed_resamplers(symbols=[symbol for symbol in self.symbols if symbol not in restored])
+            if bar_store is not None or restored:
+                self.warm_start(skip=restored, backfill=False)
+        self._history_loaded.set()
 
-    def _start_crypto_stream(self):
-        """Start the WebSocket stream in a background thread"""
-        self.logger.info(f"Starting WebSocket stream for real-time data (will build {MINUTE_SMA_WINDOW}-min SMA over time)...")
+    def _on_bar(self, bar):
+        """Apply a new minute bar to its symbol's state"""
+        state = self.states.get(bar.symbol)
+        if state is None:
+            return
+        timestamp = int(bar.timestamp.timestamp())
+        if state.last_timestamp is not None and timestamp < state.last_timestamp:
+            return  # already have this minute
+        if self.bar_store is not None:
+            self.bar_store.append(bar)  # queued; the store writes on its own thread
+        state.latest_bar = bar
         
-        # Define the WebSocket handlers
-        async def handle_bar(bar):
-            self.latest_bar = bar
-            self.latest_price = bar.close
-            
-            # Update our minute history with this latest bar
-            self.minute_closes.append(bar.close)
-            # Recalculate SMA
-            if len(self.minute_closes) > 0:
-                self.minute_sma = sum(self.minute_closes) / len(self.minute_closes)
-                self.stream_ready = True
-            
-            # More concise logging
-            self.logger.info(f"NEW PRICE: ${bar.close:,.2f} | SMA ({len(self.minute_closes)}/{MINUTE_SMA_WINDOW}): ${self.minute_sma:,.2f}")
+        # Update our minute history with this latest bar (a repeat of the
+        # newest minute, e.g. after a backfill, replaces it instead)
+        if timestamp == state.last_timestamp:
+            state.minute_closes.replace_last(bar.close)
+            for resampler in state.resamplers.values():
+                resampler.correct(timestamp, bar.open, bar.high, bar.low, bar.close, bar.volume)
+        else:
+            state.minute_closes.append(bar.close)
+            for resampler in state.resamplers.values():
+                resampler.update(timestamp, bar.open, bar.high, bar.low, bar.close, bar.volume)
+        state.last_timestamp = timestamp
+        snapshot = self._publish(state, bar.close)
+        if self.bar_ring is not None:
+            self.bar_ring.write("bar", bar)
         
-        async def handle_update(bar):
-            self.latest_bar = bar
-            self.latest_price = bar.close
-            
-            # Update the most recent price in our deque (replace the last entry)
-            if len(self.minute_closes) > 0:
-                self.minute_closes.pop()  # Remove the last entry
-                self.minute_closes.append(bar.close)  # Add the corrected close
-                self.minute_sma = sum(self.minute_closes) / len(self.minute_closes)
-            
-            self.logger.info(f"\n[STREAM] Bar update @ {bar.timestamp}")
-            self.logger.info(f"  Corrected close: ${bar.close:,.2f}")
-            self.logger.info(f"  Corrected volume: {bar.volume:,.6f}")
-            self.logger.info(f"  Updated {MINUTE_SMA_WINDOW}-min SMA: ${self.minute_sma:,.2f}")
+        # More concise logging
+        # Lazy %-style arguments: formatted by the log writer thread, if at all
+        self.logger.info("NEW PRICE %s: $%.2f | SMA (%d/%d): $%.2f", bar.symbol, bar.close,
+                         snapshot.bars, self.window, snapshot.sma)
+        self.events.publish(BarEvent("bar", bar.symbol, bar.timestamp, bar.close))
+
+    def _on_update(self, bar):
+        """Apply a correction to the most recent minute bar"""
+        state = self.states.get(bar.symbol)
+        if state is None or int(bar.timestamp.timestamp()) != state.last_timestamp:
+            return  # only the newest minute can be corrected
+        if self.bar_store is not None:
+            self.bar_store.append(bar)
+        state.latest_bar = bar
         
-        # Function to run the stream in a separate thread
-        def run_stream():
-            stream = CryptoDataStream(ALPACA_API_KEY, ALPACA_SECRET_KEY)
-            stream.subscribe_bars(handle_bar, "BTC/USD")
-            stream.subscribe_updated_bars(handle_update, "BTC/USD")
-            self.logger.info("WebSocket stream connected and running")
-            stream.run()
+        # Update the most recent price in our window (replace the last entry)
+        state.minute_closes.replace_last(bar.close)
+        for resampler in state.resamplers.values():
+            resampler.correct(state.last_timestamp, bar.open, bar.high, bar.low, bar.close, bar.volume)
+        snapshot = self._publish(state, bar.close)
+        if self.bar_ring is not None:
+            self.bar_ring.write("update", bar)
         
-        # Start the stream in a background thread
-        stream_thread = threading.Thread(target=run_stream, daemon=True)
+        self.logger.info("[STREAM] %s bar update @ %s | Corrected close: $%.2f | Corrected volume: %.6f | "
+                         "Updated %d-min SMA: $%.2f", bar.symbol, bar.timestamp, bar.close, bar.volume,
+                         self.window, snapshot.sma)
+        self.events.publish(BarEvent("update", bar.symbol, bar.timestamp, bar.close))
+
+    def _on_quote(self, quote):
+        """Record the latest bid/ask; returns the symbol's state, or None if it isn't tracked"""
+        state = self.states.get(quote.symbol)
+        if state is None:
+            return None
+        state.bid = quote.bid_price
+        state.ask = quote.ask_price
+        state.tick_time = quote.timestamp.timestamp()
+        return state
+
+    def _on_trade(self, trade):
+        """Record a trade in the symbol's tick ring; returns the symbol's state, or None"""
+        state = self.states.get(trade.symbol)
+        if state is None:
+            return None
+        tick_time = trade.timestamp.timestamp()
+        state.last_trade = trade.price
+        state.tick_time = tick_time
+        with state.ticks_lock:
+            state.ticks.append((tick_time, trade.price, trade.size))
+        return state
+
+    def _schedule_tick(self, state, loop):
+        """Coalesce ticks: at most one tick update per symbol every tick_interval seconds"""
+        if state.tick_flush_pending:
+            return  # this tick is picked up by the update already scheduled
+        state.tick_flush_pending = True
+        # The first tick after a quiet spell goes out on the next loop iteration,
+        # which still folds in the rest of the frame it arrived in
+        delay = state.tick_published_at + self.tick_interval - time.monotonic()
+        loop.call_later(max(delay, 0.0), self._flush_ticks, state)
+
+    def _flush_ticks(self, state):
+        """Publish one snapshot and event for all quotes and trades since the last tick update"""
+        state.tick_flush_pending = False
+        if self._pending is not None or state.last_timestamp is None:
+            return  # backfilling, or no minute bars yet to decide against
+        price = (state.bid + state.ask) / 2 if state.bid and state.ask else state.last_trade
+        if price is None:
+            return
+        state.tick_published_at = time.monotonic()
+        self._publish(state, price, state.tick_time)
+        self.events.publish(BarEvent("tick", state.symbol, datetime.fromtimestamp(state.tick_time, timezone.utc),
+                                     price))
+
+    def warm_start(self, skip=(), backfill=True):
+        """Fill the minute windows from the bar store, then backfill the gap since with one request"""
+        now = int(datetime.now(timezone.utc).timestamp()) // 60 * 60
+        window_start = now - self.window * 60
+
+        for symbol, state in self.states.items():
+            if symbol in skip or self.bar_store is None:
+                continue
+            records = self.bar_store.load_recent(symbol, self.window)
+            # Bars older than the window would stretch the SMA across downtime
+            records = records[records['timestamp'] >= window_start]
+            self._seed(state, records)
+            self.logger.info(f"Loaded {len(records)} stored minute bars for {symbol}")
+
+        if not backfill:
+            return  # the stream backfills when it connects
+        try:
+            gap = self._fetch_gap(now)
+        except Exception as e:
+            self.logger.error(f"Error backfilling minute bars: {str(e)}")
+            return
+        self._apply_gap(gap)
+
+    def _fetch_gap(self, now):
+        """Minute bars every symbol is missing since its newest bar, fetched with one historical request"""
+        window_start = now - self.window * 60
+        start = min(
+            max(state.last_timestamp + 60, window_start) if state.last_timestamp is not None else window_start
+            for state in self.states.values()
+        )
+        if start >= now:
+            return {}
+        from alpaca.data.requests import CryptoBarsRequest  # the SDK is only loaded once it's needed
+
+        with metrics.span('backfill'):
+            request = CryptoBarsRequest(
+                symbol_or_symbols=self.symbols,
+                timeframe=bar_timeframe(1),
+                start=datetime.fromtimestamp(start, timezone.utc),
+                end=datetime.fromtimestamp(now, timezone.utc)
+            )
+            response = self.bar_cache.fetch(request)
+
+        gap = {}
+        for symbol in self.symbols:
+            bars = response.data.get(symbol, [])
+            gap[symbol] = np.array(
+                [(int(bar.timestamp.timestamp()), bar.open, bar.high, bar.low, bar.close, bar.volume) for bar in bars],
+                dtype=BAR_DTYPE
+            )
+        return gap
+
+    def _apply_gap(self, gap):
+        """Append fetched bars newer than each symbol's newest bar, in timestamp order, without publishing events"""
+        for symbol, records in gap.items():
+            state = self.states[symbol]
+            if len(records):
+                # Keep the last copy of each minute, and only minutes we don't have yet
+                records = np.sort(records, order='timestamp', kind='stable')
+                records = records[np.append(records['timestamp'][1:] != records['timestamp'][:-1], True)]
+            if state.last_timestamp is not None:
+                records = records[records['timestamp'] > state.last_timestamp]
+            if len(records):
+                if self.bar_store is not None:
+                    self.bar_store.append_many(symbol, records)
+                self._seed(state, records)
+                self.logger.info(f"Backfilled {len(records)} minute bars for {symbol} ({len(state.minute_closes)}/{self.window})")
+
+    def _seed(self, state, records):
+        """Load historical BAR_DTYPE records into a symbol's window without publishing events"""
+        if len(records) == 0:
+            return
+        for timestamp, open_, high, low, close, volume in records.tolist():
+            state.minute_closes.append(close)
+            for resampler in state.resamplers.values():
+                resampler.update(timestamp, open_, high, low, close, volume)
+        state.last_timestamp = int(records['timestamp'][-1])
+        self._publish(state, float(records['close'][-1]))
+        if self.bar_ring is not None:
+            self.bar_ring.write_records(state.symbol, records)
+
+    def seed_resamplers(self, now=None, symbols=None):
+        """Load the completed bars of the last RESAMPLE_HISTORY_HOURS from historical data"""
+        now = now or datetime.now(timezone.utc)
+        symbols = symbols if symbols is not None else self.symbols
+        # One request per bar length covers every symbol
+        for minutes in sorted({minutes for symbol in symbols for minutes in self.states[symbol].resamplers}):
+            timeframe = None if minutes == 60 else bar_timeframe(minutes)  # None is hourly
+            try:
+                fetched = self.bar_cache.get_bars_many(symbols, timeframe, hours=RESAMPLE_HISTORY_HOURS)
+            except Exception as e:
+                self.logger.error(f"Error seeding {minutes}-min bars: {str(e)}")
+                continue
+            for symbol in symbols:
+                resampler = self.states[symbol].resamplers[minutes]
+                # The newest bar may still be forming; the stream builds that one
+                resampler.seed([bar for bar in fetched[symbol]
+                                if bar.timestamp.timestamp() + resampler.period <= now.timestamp()])
+        for symbol in symbols:
+            self.logger.info(f"Seeded {len(self.states[symbol].hourly.completed)} hourly bars for {symbol}")
+
+    def checkpoint(self):
+        """Every symbol's minute window and resampled bars, captured on the stream's loop"""
+        stream = self.stream
+        if stream is None or stream.loop is None or not stream.loop.is_running():
+            return self._capture()
+        # The stream thread owns this state; copy it between two of its callbacks
+        future = Future()
+
+        def capture():
+            try:
+                future.set_result(self._capture())
+            except Exception as e:
+                future.set_exception(e)
+
+        stream.loop.call_soon_threadsafe(capture)
+        return future.result(timeout=5)
+
+    def _capture(self):
+        return {
+            symbol: {
+                'last_timestamp': state.last_timestamp,
+                'closes': np.array(state.minute_closes.values, dtype='<f8').tobytes(),
+                'resamplers': {minutes: resampler.checkpoint() for minutes, resampler in state.resamplers.items()},
+            }
+            for symbol, state in self.states.items()
+        }
+
+    def restore(self, saved):
+        """Load state from checkpoint(); returns the symbols restored (the gap since is backfilled after)"""
+        window_start = time.time() - self.window * 60
+        restored = set()
+        for symbol, saved_state in saved.items():
+            state = self.states.get(symbol)
+            if state is None or saved_state['last_timestamp'] is None:
+                continue
+            if saved_state['last_timestamp'] < window_start:
+                continue  # every bar in it has left the window
+            if not all(minutes in saved_state['resamplers'] for minutes in state.resamplers):
+                continue  # bar lengths added since; seed this symbol from REST instead
+            for close in np.frombuffer(saved_state['closes'], dtype='<f8').tolist():
+                state.minute_closes.append(close)
+            for minutes, resampler in state.resamplers.items():
+                resampler.restore(saved_state['resamplers'][minutes])
+            state.last_timestamp = saved_state['last_timestamp']
+            if len(state.minute_closes):
+                self._publish(state, state.minute_closes[-1])
+            restored.add(symbol)
+            self.logger.info(f"Restored {len(state.minute_closes)} minute bars and "
+                             f"{len(state.hourly.completed)} hourly bars for {symbol} from checkpoint")
+        return restored
+
+    def _publish(self, state, price, tick_time=None):
+        """Swap in a new snapshot of a symbol's state once it has been fully updated"""
+        state.seq += 1
+        snapshot = MarketSnapshot(state.symbol, state.seq, state.last_timestamp, price, state.minute_closes.mean,
+                                  len(state.minute_closes), state.hourly.view, state.bid, state.ask, tick_time)
+        state.snapshot = snapshot
+        return snapshot
+
+    def _start_crypto_stream(self):
+        """Start the supervised WebSocket stream in a background thread"""
+        self.logger.info(f"Starting WebSocket stream for {', '.join(self.symbols)} (will build {self.window}-min SMA over time)...")
+        if self.ticks:
+            self.logger.info(f"Tick mode on: quotes and trades coalesced to one update per symbol "
+                             f"every {self.tick_interval:g}s")
+        self._stream_started = time.monotonic()
+        stream_thread = threading.Thread(target=self._supervise_stream, name="stream-supervisor", daemon=True)
         stream_thread.start()
+        if RESAMPLE_VERIFY_INTERVAL:
+            threading.Thread(target=self._verify_hourly_bars, daemon=True).start()
         self.logger.info("WebSocket stream thread started")
 
+    def _supervise_stream(self):
+        """Keep one stream running, restarting it with backoff if run() gives up
+
+        Reconnects, including those for a stream that has gone quiet, happen
+        inside run() (see `data_timeout` in _create_stream); every one of them
+        calls _on_stream_connect, which backfills the gap.
+        """
+        failures = 0
+        while True:
+            started = time.time()
+            self.stream = self._create_stream()
+            runner = threading.Thread(target=self.stream.run, name="market-data-stream", daemon=True)
+            runner.start()
+            self.logger.info("WebSocket stream connected and running")
+
+            runner.join()
+
+            # run() only returns on errors it won't retry; start over with a new stream
+            failures = 0 if self._heartbeat > started + 60 else failures + 1
+            delay = min(STREAM_RECONNECT_BACKOFF * 2 ** failures, STREAM_RECONNECT_MAX_BACKOFF)
+            self.logger.error(f"WebSocket stream stopped, restarting in {delay:.0f}s")
+            time.sleep(delay)
+
+    def _create_stream(self):
+        # Define the WebSocket handlers
+        async def handle_bar(bar):
+            # How long after the bar's minute closed it reached us
+            closed_at = bar.timestamp.timestamp() + 60
+            metrics.record('stream_receipt', time.time() - closed_at)
+            self._heartbeat = max(self._heartbeat, closed_at)
+            if self._pending is not None:
+                self._pending.append(("bar", bar))
+                return
+            with metrics.span('state_update'):
+                self._on_bar(bar)
+        
+        async def handle_update(bar):
+            if self._pending is not None:
+                self._pending.append(("update", bar))
+                return
+            with metrics.span('state_update'):
+                self._on_update(bar)
+
+        async def handle_quote(quote):
+            state = self._on_quote(quote)
+            if state is not None:
+                self._schedule_tick(state, asyncio.get_running_loop())
+
+        async def handle_trade(trade):
+            state = self._on_trade(trade)
+            if state is not None:
+                self._schedule_tick(state, asyncio.get_running_loop())
+
+        from trading.stream import SupervisedCryptoStream  # loads the SDK's stream code
+
+        # One connection subscribes to every configured symbol
+        stream = SupervisedCryptoStream(self._on_stream_connect, ALPACA_API_KEY, ALPACA_SECRET_KEY,
+                                        url_override=ALPACA_DATA_STREAM_URL, data_timeout=STREAM_STALL_TIMEOUT)
+        stream.subscribe_bars(handle_bar, *self.symbols)
+        stream.subscribe_updated_bars(handle_update, *self.symbols)
+        if self.ticks:
+            stream.subscribe_quotes(handle_quote, *self.symbols)
+            stream.subscribe_trades(handle_trade, *self.symbols)
+        return stream
+
+    def _on_stream_connect(self, loop):
+        """Runs on the stream's loop at every (re)connect: hold live bars until the missed minutes are filled"""
+        self._heartbeat = max(self._heartbeat, time.time())
+        if not self.ready.is_set():
+            self.startup.record("stream connect", self._stream_started)
+        self._backfill_generation += 1
+        if self._pending is None:
+            self._pending = []
+        threading.Thread(target=self._backfill, args=(loop, self._backfill_generation), daemon=True).start()
+
+    def _backfill(self, loop, generation):
+        # Backfill from the newest bar history loaded (the first connect usually beats it)
+        self._history_loaded.wait()
+        began = time.monotonic()
+        now = int(datetime.now(timezone.utc).timestamp()) // 60 * 60
+        try:
+            gap = self._fetch_gap(now)
+        except Exception as e:
+            self.logger.error(f"Error backfilling minute bars after reconnect: {str(e)}")
+            gap = {}
+        if not self.ready.is_set():
+            self.startup.record("backfill", began)
+        try:
+            loop.call_soon_threadsafe(self._finish_backfill, generation, gap)
+        except RuntimeError:
+            pass  # that connection's loop is gone; the next connect backfills again
+
+    def _finish_backfill(self, generation, gap):
+        """Merge the backfill, then replay the live bars that arrived meanwhile (newer copies win)"""
+        self._apply_gap(gap)
+        if generation != self._backfill_generation:
+            return  # reconnected again since; that backfill releases the held bars
+        pending, self._pending = self._pending, None
+        for kind, bar in pending:
+            with metrics.span('state_update'):
+                if kind == "bar":
+                    self._on_bar(bar)
+                else:
+                    self._on_update(bar)
+        self.ready.set()
+
+    def _verify_hourly_bars(self):
+        """Periodically check the stream-built hourly bars against REST, off the decision path"""
+        while True:
+            time.sleep(RESAMPLE_VERIFY_INTERVAL)
+            try:
+                fetched = self.bar_cache.get_bars_many(self.symbols, hours=RESAMPLE_HISTORY_HOURS)
+            except Exception as e:
+                self.logger.error(f"Error verifying hourly bars: {str(e)}")
+                continue
+            for symbol, bars in fetched.items():
+                stream = self.stream
+                if stream is not None and stream.loop is not None and stream.loop.is_running():
+                    # Resamplers belong to the stream thread, so fixes are applied there
+                    stream.loop.call_soon_threadsafe(self._apply_verified_bars, symbol, bars)
+
+    def _apply_verified_bars(self, symbol, bars):
+        state = self.states[symbol]
+        replaced = state.hourly.verify(bars)
+        if replaced:
+            self.logger.warning(f"{replaced} hourly bar(s) for {symbol} differed from REST and were replaced")
+            if state.snapshot is not None:
+                self._publish(state, state.snapshot.price)
+
+    def wait_for_event(self, timeout=None):
+        """Wait for the next bar or bar-correction event from the stream"""
+        return self.events.wait(timeout)
+
     def get_current_price(self, symbol):
         try:
             # If we have a price from the WebSocket stream, use it
-            if self.stream_ready and self.latest_price is not None:
-                self.logger.info("\nUsing real-time WebSocket price:")
-                self.logger.info(f"  Latest price: ${self.latest_price:,.2f}")
-                self.logger.info(f"  {len(self.minute_closes)}/{MINUTE_SMA_WINDOW}-min SMA: ${self.minute_sma:,.2f}")
-                return self.latest_price
+            snapshot = self.states[symbol].snapshot
+            if snapshot is not None:
+                self.logger.debug("Using real-time WebSocket price for %s: $%.2f | %d/%d-min SMA: $%.2f", symbol,
+                                  snapshot.price, snapshot.bars, self.window, snapshot.sma)
+                return snapshot.price
                 
             # If WebSocket isn't ready yet, return None and wait
             self.logger.info("Waiting for WebSocket data...")
@@ -92,21 +555,15 @@ class MarketData:
     def get_simple_moving_average(self, symbol):
         try:
             # Get 24-hour data in hourly bars
-            request = CryptoBarsRequest(
-                symbol_or_symbols=symbol,
-                timeframe=TimeFrame.Hour,
-                start=datetime.now() - timedelta(hours=SMA_WINDOW),
-                end=datetime.now()
-            )
-            bars = self.client.get_crypto_bars(request)
-            prices = [bar.close for bar in bars[symbol]]
+            bars = self.bar_cache.get_bars(symbol, hours=SMA_WINDOW)
+            prices = [bar.close for bar in bars]
             
             # Log more detailed SMA information
             self.logger.info("\nSMA Analysis:")
             self.logger.info(f"  Number of periods: {len(prices)}")
             self.logger.info(f"  Highest price: ${max(prices):,.2f}")
             self.logger.info(f"  Lowest price: ${min(prices):,.2f}")
-            self.logger.info(f"  Average volume: {sum([bar.volume for bar in bars[symbol]])/len(bars[symbol]):,.2f}")
+            self.logger.info(f"  Average volume: {sum([bar.volume for bar in bars])/len(bars):,.2f}")
             
             return sum(prices) / len(prices)
         except Exception as e:
@@ -116,14 +573,8 @@ class MarketData:
     def get_daily_price_range(self, symbol):
         """Get 24-hour price range"""
         try:
-            request = CryptoBarsRequest(
-                symbol_or_symbols=symbol,
-                timeframe=TimeFrame.Hour,
-                start=datetime.now() - timedelta(hours=24),
-                end=datetime.now()
-            )
-            bars = self.client.get_crypto_bars(request)
-            prices = [bar.close for bar in bars[symbol]]
+            bars = self.bar_cache.get_bars(symbol, hours=24)
+            prices = [bar.close for bar in bars]
             
             self.logger.info("\n24-Hour Range:")
             self.logger.info(f"  High: ${max(prices):,.2f}")
@@ -138,18 +589,38 @@ class MarketData:
     def get_hourly_prices(self, symbol):
         """Get hourly price data"""
         try:
-            request = CryptoBarsRequest(
-                symbol_or_symbols=symbol,
-                timeframe=TimeFrame.Hour,
-                start=datetime.now() - timedelta(hours=24),
-                end=datetime.now()
-            )
-            bars = self.client.get_crypto_bars(request)
-            return [bar.close for bar in bars[symbol]]
+            bars = self.bar_cache.get_bars(symbol, hours=24)
+            return [bar.close for bar in bars]
         except Exception as e:
             self.logger.error(f"Error getting hourly prices: {str(e)}")
             return None
 
     def get_minute_sma(self, symbol: str, window: int = MINUTE_SMA_WINDOW) -> float | None:
         """Return the current SMA from our cached minute history"""
-        return self.minute_sma 
\ No newline at end of file
+        snapshot = self.get_snapshot(symbol)
+        return snapshot.sma if snapshot is not None else None
+
+    def get_bars(self, symbol, minutes=60):
+        """Stream-built bars of the given length (completed, then forming), oldest first"""
+        state = self.states.get(symbol)
+        if state is None or minutes not in state.resamplers:
+            return []
+        return state.resamplers[minutes].bars()
+
+    def get_latest_bar(self, symbol):
+        """Newest (possibly corrected) minute bar for a symbol, or None"""
+        state = self.states.get(symbol)
+        return state.latest_bar if state is not None else None
+
+    def get_ticks(self, symbol):
+        """Recent (time, price, size) trades for a symbol, oldest first (TICK_MODE only)"""
+        state = self.states.get(symbol)
+        if state is None:
+            return []
+        with state.ticks_lock:
+            return list(state.ticks)
+
+    def get_snapshot(self, symbol):
+        """Latest MarketSnapshot for a symbol, or None before its first bar; safe from any thread"""
+        state = self.states.get(symbol)
+        return state.snapshot if state is not None else None 
\ No newline at end of file
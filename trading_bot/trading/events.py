@@ -0,0 +1,34 @@
+import queue
+import time
+
+class BarEvent:
+    """A new or corrected minute bar, or a coalesced tick update, published by the stream handlers"""
+    __slots__ = ('kind', 'symbol', 'timestamp', 'close', 'received_at')
+
+    def __init__(self, kind, symbol, timestamp, close):
+        self.kind = kind  # "bar", "update" or "tick"
+        self.symbol = symbol
+        self.timestamp = timestamp
+        self.close = close
+        # Monotonic receipt time so bar-to-decision latency can be measured
+        self.received_at = time.monotonic()
+
+    def latency(self):
+        """Seconds elapsed since this event was received from the stream"""
+        return time.monotonic() - self.received_at
+
+class EventQueue:
+    """Thread-safe hand-off of bar events from the stream thread to the strategy"""
+    def __init__(self):
+        self._queue = queue.Queue()
+
+    def publish(self, event):
+        # Never blocks, so the stream's event loop is never held up
+        self._queue.put_nowait(event)
+
+    def wait(self, timeout=None):
+        """Block until the next event arrives, or return None after timeout seconds"""
+        try:
+            return self._queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
\ No newline at end of file
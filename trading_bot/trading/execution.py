@@ -0,0 +1,186 @@
+import threading
+import time
+from collections import deque
+from config.settings import (EXECUTION_STYLE, EXECUTION_DURATION, EXECUTION_SLICES, EXECUTION_PARTICIPATION,
+                             EXECUTION_MIN_CHILD, EXECUTION_INTERVAL)
+
+class ParentOrder:
+    """A buy of `amount` dollars worked as child orders, measured against the price when it was decided"""
+    __slots__ = ('symbol', 'amount', 'key', 'style', 'arrival_price', 'on_ack', 'on_error', 'origin', 'started',
+                 'slices', 'submitted', 'children', 'open', 'failed', 'filled_qty', 'filled_notional',
+                 'volume_budget', 'last_bar', 'stopped', 'done')
+
+    def __init__(self, symbol, amount, key, style, arrival_price, slices, on_ack=None, on_error=None, origin=None):
+        self.symbol = symbol
+        self.amount = amount
+        self.key = key
+        self.style = style  # "twap" or "pov"
+        self.arrival_price = arrival_price
+        self.on_ack = on_ack
+        self.on_error = on_error
+        self.origin = origin  # monotonic receipt time of the bar that triggered the order
+        self.started = time.monotonic()
+        self.slices = slices  # TWAP child count
+        self.submitted = 0.0  # notional sent as child orders
+        self.children = 0
+        self.open = 0  # children sent that haven't reached a terminal status
+        self.failed = 0.0  # notional of children that could not be placed
+        self.filled_qty = 0.0
+        self.filled_notional = 0.0
+        self.volume_budget = 0.0  # POV: notional allowed by observed volume and not sent yet
+        self.last_bar = None  # POV: start of the newest minute bar counted
+        self.stopped = False  # a child failed; nothing more is sent
+        self.done = False
+
+    @property
+    def remaining(self):
+        return self.amount - self.submitted
+
+    @property
+    def average_price(self):
+        return self.filled_notional / self.filled_qty if self.filled_qty else None
+
+    @property
+    def slippage_bps(self):
+        """Average fill price above the arrival price, in basis points (positive costs us)"""
+        if self.average_price is None or not self.arrival_price:
+            return None
+        return (self.average_price - self.arrival_price) / self.arrival_price * 1e4
+
+class ExecutionScheduler:
+    """Works buy orders as child orders through the OrderPipeline.
+
+    A background thread checks every active parent order each `interval`
+    seconds and sends whatever its schedule says is due: equal TWAP slices
+    spread over `duration`, or for POV a `participation` share of the
+    notional traded in each new minute bar. Child fills are collected from
+    the pipeline's on_done callbacks; once every child is done the parent's
+    average fill price and slippage against the arrival price are logged
+    and the parent is kept in `completed`.
+    """
+    def __init__(self, order_pipeline, market_data, logger, style=EXECUTION_STYLE, duration=EXECUTION_DURATION,
+                 slices=EXECUTION_SLICES, participation=EXECUTION_PARTICIPATION, min_child=EXECUTION_MIN_CHILD,
+                 interval=EXECUTION_INTERVAL):
+        self.order_pipeline = order_pipeline
+        self.market_data = market_data
+        self.logger = logger
+        self.style = style or "twap"
+        self.duration = duration
+        self.slices = slices
+        self.participation = participation
+        self.min_child = min_child
+        self.interval = interval
+        self.completed = deque(maxlen=100)  # finished parent orders, newest last
+        self._active = {}  # key -> parent order still being worked
+        self._lock = threading.RLock()  # child callbacks may run while a step holds it
+
+        threading.Thread(target=self._run, daemon=True).start()
+
+    def submit(self, symbol, amount, key, arrival_price, on_ack=None, on_error=None, origin=None):
+        """Start working a buy; returns the parent order, or None if one with this key is already active"""
+        # Never slice below the smallest child order
+        slices = max(1, min(self.slices, int(amount // self.min_child)))
+        parent = ParentOrder(symbol, amount, key, self.style, arrival_price, slices, on_ack, on_error, origin)
+        with self._lock:
+            if key in self._active:
+                return None
+            self._active[key] = parent
+        self.logger.info(f"EXECUTION STARTED: ${amount} of {symbol} by {parent.style.upper()} over "
+                         f"{self.duration}s | Arrival price: ${arrival_price:,.2f}")
+        self._step(parent, time.monotonic())
+        return None if parent.done else parent
+
+    def active(self):
+        with self._lock:
+            return list(self._active.values())
+
+    def _run(self):
+        while True:
+            time.sleep(self.interval)
+            now = time.monotonic()
+            for parent in self.active():
+                try:
+                    self._step(parent, now)
+                except Exception as e:
+                    self.logger.error(f"Error in execution scheduler: {str(e)}")
+
+    def _step(self, parent, now):
+        """Send the child order the parent's schedule has made due, if any"""
+        with self._lock:
+            if parent.stopped or parent.remaining < 0.01:
+                return
+            due = self._due(parent, now) - parent.submitted
+            if due >= parent.remaining - 0.01:
+                due = parent.remaining
+            elif due < self.min_child:
+                return
+            self._send(parent, round(due, 2))
+
+    def _due(self, parent, now):
+        """Total notional the parent should have sent by `now`"""
+        elapsed = now - parent.started
+        if elapsed >= self.duration:
+            return parent.amount
+        if parent.style == "twap":
+            # The first slice goes straight away, the last one slice-length before the deadline
+            sent_slices = min(int(elapsed / (self.duration / parent.slices)) + 1, parent.slices)
+            return parent.amount * sent_slices / parent.slices
+        bar = self.market_data.get_latest_bar(parent.symbol)
+        if bar is not None and bar.timestamp != parent.last_bar:
+            parent.last_bar = bar.timestamp
+            parent.volume_budget += self.participation * bar.volume * bar.close
+        return parent.submitted + parent.volume_budget
+
+    def _send(self, parent, notional):
+        parent.children += 1
+        parent.open += 1
+        parent.submitted += notional
+        parent.volume_budget = max(parent.volume_budget - notional, 0.0)
+        queued = self.order_pipeline.submit(
+            parent.symbol, notional, f"{parent.key}:{parent.children}", on_ack=parent.on_ack,
+            on_done=lambda intent, order: self._on_child_done(parent, order),
+            on_error=lambda intent, error: self._on_child_error(parent, intent, error),
+            origin=parent.origin)
+        if queued is None:
+            parent.open -= 1
+            self._stop(parent, notional)
+            self._finish_if_done(parent, None)
+
+    def _on_child_done(self, parent, order):
+        """Called from the order pipeline when a child reaches a terminal status"""
+        qty = float(order.filled_qty or 0)
+        with self._lock:
+            parent.open -= 1
+            parent.filled_qty += qty
+            parent.filled_notional += qty * float(order.filled_avg_price or 0)
+            self._finish_if_done(parent, None)
+
+    def _on_child_error(self, parent, intent, error):
+        """Called from the order pipeline when a child could not be placed; stops the parent"""
+        with self._lock:
+            parent.open -= 1
+            self._stop(parent, intent.amount)
+            self._finish_if_done(parent, error)
+
+    def _stop(self, parent, notional):
+        parent.failed += notional
+        parent.stopped = True
+
+    def _finish_if_done(self, parent, error):
+        if parent.done or parent.open > 0 or (parent.remaining >= 0.01 and not parent.stopped):
+            return
+        parent.done = True
+        self._active.pop(parent.key, None)
+        self.completed.append(parent)
+
+        if parent.filled_qty:
+            self.logger.info(f"EXECUTION DONE: {parent.symbol} ${parent.filled_notional:,.2f} of "
+                             f"${parent.amount:,.2f} in {parent.children} orders | Avg ${parent.average_price:,.2f} "
+                             f"vs arrival ${parent.arrival_price:,.2f} | Slippage {parent.slippage_bps:+.1f} bps")
+        else:
+            self.logger.error(f"EXECUTION FAILED: nothing filled for ${parent.amount} of {parent.symbol}")
+        if parent.stopped and not parent.filled_qty and parent.on_error is not None:
+            try:
+                parent.on_error(parent, error)
+            except Exception as e:
+                self.logger.error(f"Error in order callback: {str(e)}")
\ No newline at end of file
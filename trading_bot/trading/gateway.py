@@ -0,0 +1,119 @@
+import heapq
+import itertools
+import threading
+import time
+from concurrent.futures import Future
+from config.settings import REST_RATE_LIMIT, REST_BURST, REST_ORDER_RESERVE, REST_RETRIES
+from utils.metrics import metrics
+
+# Request priorities, most urgent first
+PRIORITIES = ("orders", "account", "data")
+
+class RestGateway:
+    """The one way out to the Alpaca REST API, shared by every client in the process.
+
+    Each call takes a token from a bucket refilled at `rate` requests a
+    minute. Callers queue for tokens by priority (then arrival), so order
+    traffic always goes ahead of account checks and bar fetches, and only
+    orders may spend the last `reserve` tokens. Calls given the same `key`
+    while one is already in flight wait for that call's result instead of
+    sending another request. A 429 from Alpaca empties the bucket, and the
+    call queues again for up to `retries` more tries (the SDK clients'
+    own retries are turned off, see adopt_sdk_client).
+    """
+    def __init__(self, rate=REST_RATE_LIMIT, burst=REST_BURST, reserve=REST_ORDER_RESERVE, retries=REST_RETRIES):
+        self.rate = rate / 60.0  # tokens per second
+        self.burst = burst
+        self.reserve = min(reserve, burst - 1)
+        self.retries = retries
+        self.throttled = 0  # 429s seen
+        self._tokens = float(burst)
+        self._refilled_at = time.monotonic()
+        self._waiting = []  # heap of (priority, arrival) tickets
+        self._arrivals = itertools.count()
+        self._inflight = {}  # key -> Future of the call in flight
+        self._cond = threading.Condition()
+
+    def call(self, priority, fn, *args, key=None, **kwargs):
+        """Run fn(*args, **kwargs) when a token is free, returning its result or raising its error"""
+        if key is not None:
+            with self._cond:
+                future = self._inflight.get(key)
+                if future is None:
+                    future = self._inflight[key] = Future()
+                    owner = True
+                else:
+                    owner = False
+            if not owner:
+                return future.result()
+
+        try:
+            for attempt in range(self.retries + 1):
+                self._acquire(PRIORITIES.index(priority), priority)
+                try:
+                    result = fn(*args, **kwargs)
+                    break
+                except Exception as e:
+                    if getattr(e, 'status_code', None) != 429:
+                        raise
+                    with self._cond:
+                        self.throttled += 1
+                        self._tokens = min(self._tokens, 0.0)
+                    if attempt == self.retries:
+                        raise
+        except Exception as e:
+            if key is not None:
+                self._finish(key).set_exception(e)
+            raise
+        if key is not None:
+            self._finish(key).set_result(result)
+        return result
+
+    def _finish(self, key):
+        with self._cond:
+            return self._inflight.pop(key)
+
+    def _acquire(self, level, priority):
+        started = time.monotonic()
+        # Orders may use the reserve; everything else has to leave it
+        needed = 1.0 if level == 0 else 1.0 + self.reserve
+        with self._cond:
+            ticket = (level, next(self._arrivals))
+            heapq.heappush(self._waiting, ticket)
+            try:
+                while True:
+                    self._refill()
+                    if self._waiting[0] == ticket and self._tokens >= needed:
+                        self._tokens -= 1.0
+                        break
+                    # Wake up when enough tokens have built up, or when the queue changes
+                    self._cond.wait(max(needed - self._tokens, 0.01) / self.rate)
+            finally:
+                self._waiting.remove(ticket)
+                heapq.heapify(self._waiting)
+                self._cond.notify_all()
+        metrics.record_since(f'rest_wait_{priority}', started)
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.burst, self._tokens + (now - self._refilled_at) * self.rate)
+        self._refilled_at = now
+
+def adopt_sdk_client(client, pool_size=None):
+    """Hand an alpaca-py REST client's throttling to the gateway, optionally resizing its connection pool
+
+    The SDK retries 429s itself (3 times, 3s apart) inside the call, where
+    the gateway can neither see nor reorder them, and has no public setting
+    for it on the trading client. This reaches into RESTClient's private
+    `_retry` and `_session`, as they are in alpaca-py 0.44; check them when
+    upgrading the SDK.
+    """
+    client._retry = 0
+    if pool_size:
+        from requests.adapters import HTTPAdapter
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size + 2)
+        client._session.mount("https://", adapter)
+        client._session.mount("http://", adapter)
+    return client
+
+gateway = RestGateway()
\ No newline at end of file
@@ -0,0 +1,146 @@
+from collections import deque
+import math
+
+class RollingWindow:
+    """Fixed-size window with O(1) SMA/variance and amortized O(1) min/max.
+
+    Supports replacing the most recent value (for corrected bars) without
+    rescanning the window.
+    """
+    def __init__(self, size):
+        self.size = size
+        self.values = deque(maxlen=size)
+        self._sum = 0.0
+        self._sum_sq = 0.0
+        # Monotonic deques of (index, value) for rolling min and max
+        self._mins = deque()
+        self._maxes = deque()
+        # Entries popped off the tail by the last push, so it can be undone
+        self._popped_mins = []
+        self._popped_maxes = []
+        self._count = 0  # total values ever appended, used as the index
+        self._since_resum = 0
+
+    def __len__(self):
+        return len(self.values)
+
+    def __getitem__(self, idx):
+        return self.values[idx]
+
+    def append(self, value):
+        """Add a new value, evicting the oldest one once the window is full"""
+        value = float(value)
+        if len(self.values) == self.size:
+            old = self.values[0]
+            self._sum -= old
+            self._sum_sq -= old * old
+        self.values.append(value)
+        self._sum += value
+        self._sum_sq += value * value
+
+        idx = self._count
+        self._count += 1
+        # Drop extremes that have slid out of the window
+        while self._mins and self._mins[0][0] <= idx - self.size:
+            self._mins.popleft()
+        while self._maxes and self._maxes[0][0] <= idx - self.size:
+            self._maxes.popleft()
+        self._push(idx, value)
+
+        # Re-sum once per window length to stop floating-point drift building up
+        self._since_resum += 1
+        if self._since_resum >= self.size:
+            self._resum()
+
+    def replace_last(self, value):
+        """Replace the most recent value, e.g. when a bar is corrected"""
+        if not self.values:
+            self.append(value)
+            return
+        value = float(value)
+        old = self.values[-1]
+        self.values[-1] = value
+        self._sum += value - old
+        self._sum_sq += value * value - old * old
+
+        # The newest entry is always at the tail of both deques; undo its push
+        # (restoring anything it displaced) and push the corrected value instead
+        idx = self._count - 1
+        self._mins.pop()
+        self._mins.extend(self._popped_mins)
+        self._maxes.pop()
+        self._maxes.extend(self._popped_maxes)
+        self._push(idx, value)
+
+    def _push(self, idx, value):
+        self._popped_mins = []
+        while self._mins and self._mins[-1][1] >= value:
+            self._popped_mins.append(self._mins.pop())
+        self._popped_mins.reverse()
+        self._mins.append((idx, value))
+
+        self._popped_maxes = []
+        while self._maxes and self._maxes[-1][1] <= value:
+            self._popped_maxes.append(self._maxes.pop())
+        self._popped_maxes.reverse()
+        self._maxes.append((idx, value))
+
+    def _resum(self):
+        self._sum = math.fsum(self.values)
+        self._sum_sq = math.fsum(v * v for v in self.values)
+        self._since_resum = 0
+
+    @property
+    def sum(self):
+        return self._sum
+
+    @property
+    def mean(self):
+        if not self.values:
+            return None
+        return self._sum / len(self.values)
+
+    @property
+    def variance(self):
+        """Population variance of the values in the window"""
+        n = len(self.values)
+        if n == 0:
+            return None
+        mean = self._sum / n
+        return max(self._sum_sq / n - mean * mean, 0.0)
+
+    @property
+    def std(self):
+        variance = self.variance
+        return None if variance is None else math.sqrt(variance)
+
+    @property
+    def min(self):
+        return self._mins[0][1] if self._mins else None
+
+    @property
+    def max(self):
+        return self._maxes[0][1] if self._maxes else None
+
+class EMA:
+    """Exponential moving average with support for correcting the last value"""
+    def __init__(self, span):
+        self.span = span
+        self.alpha = 2.0 / (span + 1)
+        self.value = None
+        self._prev = None
+
+    def update(self, value):
+        self._prev = self.value
+        self.value = self._step(self._prev, float(value))
+        return self.value
+
+    def replace_last(self, value):
+        # Recompute from the value before the last update
+        self.value = self._step(self._prev, float(value))
+        return self.value
+
+    def _step(self, prev, value):
+        if prev is None:
+            return value
+        return prev + self.alpha * (value - prev)
\ No newline at end of file
@@ -0,0 +1,190 @@
+import hashlib
+import queue
+import threading
+import time
+from config.settings import (ORDER_QUEUE_SIZE, ORDER_WORKERS, ORDER_MAX_RETRIES, ORDER_RETRY_BACKOFF,
+                             ORDER_STATUS_POLL_INTERVAL)
+from utils.metrics import metrics
+
+# Order statuses after which nothing more will happen to an order
+TERMINAL_STATUSES = {'filled', 'canceled', 'expired', 'rejected', 'done_for_day', 'replaced'}
+
+def client_order_id(symbol, key):
+    """Deterministic client order id, so resubmitting the same intent can't double-buy"""
+    digest = hashlib.sha1(f"{symbol}|{key}".encode()).hexdigest()[:24]
+    return f"tb-{symbol.replace('/', '')}-{digest}"
+
+def order_status(order):
+    return str(getattr(order.status, 'value', order.status)).lower()
+
+def is_retryable(error):
+    # Client errors (bad request, insufficient funds...) will fail again;
+    # rate limits, timeouts, server errors and dropped connections may not.
+    # Anything else (a bug, a response we can't parse) isn't retried
+    status_code = getattr(error, 'status_code', None)
+    if status_code is not None:
+        return status_code in (408, 429) or status_code >= 500
+    from requests.exceptions import ConnectionError as RequestsConnectionError, Timeout
+    return isinstance(error, (ConnectionError, TimeoutError, RequestsConnectionError, Timeout))
+
+class OrderIntent:
+    __slots__ = ('symbol', 'amount', 'client_order_id', 'on_ack', 'on_done', 'on_error', 'queued_at', 'origin',
+                 'order', 'updated_at')
+
+    def __init__(self, symbol, amount, client_order_id, on_ack, on_done, on_error, origin=None):
+        self.symbol = symbol
+        self.amount = amount
+        self.client_order_id = client_order_id
+        self.on_ack = on_ack
+        self.on_done = on_done
+        self.on_error = on_error
+        self.queued_at = time.monotonic()
+        self.origin = origin  # monotonic receipt time of the bar that triggered the order
+        self.order = None  # latest known state of the submitted order
+        self.updated_at = None  # monotonic time `order` was last heard about
+
+class OrderPipeline:
+    """Submits orders from a bounded queue on worker threads.
+
+    Every order carries a deterministic client_order_id. If a submit fails
+    or times out, the order is looked up by that id before trying again,
+    so an order that did reach Alpaca is never sent twice. Submitted orders
+    are followed to a terminal status through on_trade_update (fed by the
+    trade updates stream); one the stream hasn't reported on for
+    `poll_interval` seconds is checked over REST instead. Callbacks run on
+    the pipeline's (or the stream's) threads: on_ack(intent, order) once
+    Alpaca accepts the order, on_done(intent, order) at a terminal status,
+    on_error(intent, error) if it could not be submitted.
+    """
+    def __init__(self, trading_client, logger, max_queue=ORDER_QUEUE_SIZE, workers=ORDER_WORKERS,
+                 max_retries=ORDER_MAX_RETRIES, poll_interval=ORDER_STATUS_POLL_INTERVAL):
+        self.trading_client = trading_client
+        self.logger = logger
+        self.max_retries = max_retries
+        self.poll_interval = poll_interval
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._open = {}  # client order id -> intent awaiting a terminal status
+        self._early = {}  # client order id -> (order, monotonic time) for updates that beat the submit response
+        self._lock = threading.Lock()
+
+        for _ in range(workers):
+            threading.Thread(target=self._run_worker, daemon=True).start()
+        threading.Thread(target=self._run_tracker, daemon=True).start()
+
+    def submit(self, symbol, amount, key, on_ack=None, on_done=None, on_error=None, origin=None):
+        """Queue a market buy and return its client order id, or None if the queue is full"""
+        intent = OrderIntent(symbol, amount, client_order_id(symbol, key), on_ack, on_done, on_error, origin)
+        try:
+            self._queue.put_nowait(intent)
+        except queue.Full:
+            self.logger.error(f"Order queue full, dropping ${amount} order for {symbol}")
+            return None
+        return intent.client_order_id
+
+    def open_orders(self):
+        with self._lock:
+            return list(self._open.values())
+
+    def _run_worker(self):
+        while True:
+            intent = self._queue.get()
+            try:
+                self._submit(intent)
+            except Exception as e:
+                self.logger.error(f"Error in order worker: {str(e)}")
+
+    def _submit(self, intent):
+        order = None
+        for attempt in range(self.max_retries + 1):
+            try:
+                if attempt > 0:
+                    # The previous attempt may have reached Alpaca before failing
+                    order = self.trading_client.find_order(intent.client_order_id)
+                if order is None:
+                    self.logger.info(f"PLACING ORDER: ${intent.amount} of {intent.symbol} ({intent.client_order_id})")
+                    with metrics.span('order_submit'):
+                        order = self.trading_client.submit_buy_order(intent.symbol, intent.amount,
+                                                                     intent.client_order_id)
+                break
+            except Exception as e:
+                if not is_retryable(e) or attempt == self.max_retries:
+                    self.logger.error(f"Error placing buy order {intent.client_order_id}: {str(e)}")
+                    self._callback(intent.on_error, intent, e)
+                    return
+                self.logger.error(f"Order submit failed (attempt {attempt + 1}), retrying: {str(e)}")
+                time.sleep(ORDER_RETRY_BACKOFF * 2 ** attempt)
+
+        intent.order = order
+        metrics.record_since('order_ack', intent.queued_at)
+        if intent.origin is not None:
+            metrics.record_since('bar_to_ack', intent.origin)
+        self.logger.info(f"ORDER PLACED: ID {order.id} | Status: {order_status(order)} | "
+                         f"{(time.monotonic() - intent.queued_at) * 1000:.0f} ms after queueing")
+        self._callback(intent.on_ack, intent, order)
+        self._track(intent)
+
+    def on_trade_update(self, event, order):
+        """Trade updates stream callback: how open orders normally learn they're done"""
+        client_id = getattr(order, 'client_order_id', None)
+        done = order_status(order) in TERMINAL_STATUSES
+        with self._lock:
+            intent = self._open.get(client_id)
+            if intent is None:
+                if done:
+                    # The stream can report a fill before the submit call returns
+                    self._early[client_id] = (order, time.monotonic())
+                return
+            intent.order = order
+            intent.updated_at = time.monotonic()
+            if not done:
+                return
+            del self._open[client_id]
+        self._finish(intent, order)
+
+    def _track(self, intent):
+        with self._lock:
+            early = self._early.pop(intent.client_order_id, None)
+            if early is None and order_status(intent.order) not in TERMINAL_STATUSES:
+                intent.updated_at = time.monotonic()
+                self._open[intent.client_order_id] = intent
+                return
+        self._finish(intent, early[0] if early is not None else intent.order)
+
+    def _finish(self, intent, order):
+        intent.order = order
+        self.logger.info(f"ORDER {order_status(order).upper()}: {intent.client_order_id}")
+        self._callback(intent.on_done, intent, order)
+
+    def _run_tracker(self):
+        """Check open orders over REST when the stream hasn't reported on them for a while"""
+        while True:
+            time.sleep(self.poll_interval / 2)
+            now = time.monotonic()
+            with self._lock:
+                # Updates for orders that never showed up here (placed elsewhere)
+                for client_id, (_, received) in list(self._early.items()):
+                    if now - received > 60:
+                        del self._early[client_id]
+            for intent in self.open_orders():
+                if now - intent.updated_at < self.poll_interval:
+                    continue
+                try:
+                    order = self.trading_client.get_order(intent.order.id)
+                except Exception as e:
+                    self.logger.error(f"Error checking order {intent.client_order_id}: {str(e)}")
+                    continue
+                intent.order = order
+                intent.updated_at = time.monotonic()
+                if order_status(order) in TERMINAL_STATUSES:
+                    with self._lock:
+                        if self._open.pop(intent.client_order_id, None) is None:
+                            continue  # the stream got there first
+                    self._finish(intent, order)
+
+    def _callback(self, callback, intent, arg):
+        if callback is None:
+            return
+        try:
+            callback(intent, arg)
+        except Exception as e:
+            self.logger.error(f"Error in order callback: {str(e)}")
\ No newline at end of file
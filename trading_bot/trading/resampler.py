@@ -0,0 +1,130 @@
+from collections import deque
+from datetime import datetime, timezone
+import numpy as np
+from trading.bar_store import BAR_DTYPE
+from trading.bars import Bar
+
+# Relative price difference at which a stream-built bar counts as differing from REST
+VERIFY_TOLERANCE = 1e-6
+
+class BarResampler:
+    """Builds `minutes`-long OHLCV bars from minute bars, keeping a ring of completed ones.
+
+    The completed bars and the bar still forming are published together as
+    one (completed, forming) tuple in `view`, replaced rather than mutated
+    on every update, so other threads can read it without a lock. A bar is
+    completed when the first minute of a later period arrives. Corrections
+    of the newest minute rebuild the forming bar from its minutes.
+    """
+    def __init__(self, symbol, minutes=60, capacity=24):
+        self.symbol = symbol
+        self.period = minutes * 60
+        self.completed = deque(maxlen=capacity)
+        self.view = ((), None)
+        self._minutes = []  # (open, high, low, close, volume) of the forming bar's minutes
+        self._minute_start = None  # start of the newest minute, epoch seconds
+        self._start = None  # start of the forming bar, epoch seconds
+        self._forming = None
+
+    def seed(self, bars):
+        """Load completed bars (from REST or a backtest's history), oldest first"""
+        for bar in bars:
+            if self.completed and bar.timestamp <= self.completed[-1].timestamp:
+                continue
+            self.completed.append(bar)
+        self._publish(True)
+
+    def update(self, timestamp, open, high, low, close, volume):
+        """Add a new minute bar starting at `timestamp` (epoch seconds)"""
+        start = timestamp - timestamp % self.period
+        if self._start is not None and start < self._start:
+            return  # older than the bar we're building
+        if self._start is None and self.completed and start <= self.completed[-1].timestamp.timestamp():
+            return  # that period was already seeded as complete
+
+        rolled = start != self._start
+        if rolled:
+            if self._forming is not None:
+                self.completed.append(self._forming)
+            self._start = start
+            self._minutes = []
+            self._forming = Bar(self.symbol, datetime.fromtimestamp(start, timezone.utc), open, high, low, close,
+                                volume)
+        else:
+            last = self._forming
+            self._forming = Bar(self.symbol, last.timestamp, last.open, max(last.high, high), min(last.low, low),
+                                close, last.volume + volume)
+        self._minutes.append((open, high, low, close, volume))
+        self._minute_start = timestamp
+        self._publish(rolled)
+
+    def correct(self, timestamp, open, high, low, close, volume):
+        """Replace the newest minute with a corrected version of it"""
+        if timestamp != self._minute_start or not self._minutes:
+            return
+        self._minutes[-1] = (open, high, low, close, volume)
+        self._rebuild_forming()
+        self._publish(False)
+
+    def verify(self, reference_bars):
+        """Replace completed bars that differ from the reference (REST) bars; returns how many did"""
+        replaced = 0
+        by_start = {bar.timestamp: bar for bar in reference_bars}
+        for i, bar in enumerate(self.completed):
+            reference = by_start.get(bar.timestamp)
+            if reference is None:
+                continue
+            if any(abs(ours - theirs) > VERIFY_TOLERANCE * abs(theirs) for ours, theirs in
+                   ((bar.high, reference.high), (bar.low, reference.low), (bar.close, reference.close))):
+                self.completed[i] = Bar(self.symbol, bar.timestamp, reference.open, reference.high, reference.low,
+                                        reference.close, reference.volume)
+                replaced += 1
+        if replaced:
+            self._publish(True)
+        return replaced
+
+    def checkpoint(self):
+        """Completed bars and the forming bar's minutes, as bytes for a checkpoint"""
+        completed = np.array([(int(bar.timestamp.timestamp()), bar.open, bar.high, bar.low, bar.close, bar.volume)
+                              for bar in self.completed], dtype=BAR_DTYPE)
+        return {
+            'completed': completed.tobytes(),
+            'minutes': np.array(self._minutes, dtype='<f8').tobytes(),
+            'start': self._start,
+            'minute_start': self._minute_start,
+        }
+
+    def restore(self, state):
+        """Replace this resampler's bars with ones from checkpoint()"""
+        self.completed.clear()
+        for timestamp, open_, high, low, close, volume in np.frombuffer(state['completed'], dtype=BAR_DTYPE).tolist():
+            self.completed.append(Bar(self.symbol, datetime.fromtimestamp(timestamp, timezone.utc), open_, high, low,
+                                      close, volume))
+        minutes = np.frombuffer(state['minutes'], dtype='<f8').reshape(-1, 5)
+        self._minutes = [tuple(minute) for minute in minutes.tolist()]
+        self._start = state['start']
+        self._minute_start = state['minute_start']
+        self._forming = None
+        if self._minutes:
+            self._rebuild_forming()
+        self._publish(True)
+
+    def bars(self):
+        """Completed bars plus the forming one, oldest first"""
+        completed, forming = self.view
+        return list(completed) + ([forming] if forming is not None else [])
+
+    def _rebuild_forming(self):
+        """Recompute the forming bar from its minutes"""
+        first = self._minutes[0]
+        if self._forming is not None:
+            start = self._forming.timestamp
+        else:
+            start = datetime.fromtimestamp(self._start, timezone.utc)
+        self._forming = Bar(self.symbol, start, first[0],
+                            max(minute[1] for minute in self._minutes), min(minute[2] for minute in self._minutes),
+                            self._minutes[-1][3], sum(minute[4] for minute in self._minutes))
+
+    def _publish(self, completed_changed):
+        completed = tuple(self.completed) if completed_changed else self.view[0]
+        self.view = (completed, self._forming)
\ No newline at end of file
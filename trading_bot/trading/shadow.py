@@ -0,0 +1,136 @@
+import itertools
+import time
+import numpy as np
+from config.settings import TRADE_AMOUNT, SHADOW_VARIANTS, SHADOW_GRID, SHADOW_REPORT_INTERVAL
+from trading.strategy import DEFAULT_PARAMS, BUY_RULES
+
+def shadow_variants(variants=SHADOW_VARIANTS, grid=SHADOW_GRID):
+    """Variant param overrides from the settings: the listed ones, then every combination in the grid"""
+    variants = [dict(variant) for variant in variants]
+    if grid:
+        keys = list(grid)
+        for values in itertools.product(*(grid[key] for key in keys)):
+            variant = dict(zip(keys, values))
+            variant['name'] = ",".join(f"{key}={value}" for key, value in variant.items())
+            variants.append(variant)
+    return variants
+
+def shadow_books(symbols, logger, params=None, variants=None):
+    """{symbol: ShadowBook}, or {} when no shadow variants are configured"""
+    variants = shadow_variants() if variants is None else variants
+    if not variants:
+        return {}
+    return {symbol: ShadowBook(symbol, variants, logger, params) for symbol in symbols}
+
+class ShadowBook:
+    """Strategy variants run next to one symbol's live strategy, trading only on paper.
+
+    A variant is a name plus overrides of the live strategy's params; the
+    first variant, "live", has none, as a baseline. On each bar the inputs
+    every variant shares (distance from the hour's low, change in the
+    hourly low, and a local minimum check for each distinct window size)
+    are computed once, then the buy rules are evaluated for all variants at
+    once with NumPy. A variant that would buy outside its cooldown gets a
+    paper fill of `amount` at the bar's price. Buying power and order
+    failures are ignored.
+    """
+    def __init__(self, symbol, variants, logger, params=None, amount=TRADE_AMOUNT,
+                 report_interval=SHADOW_REPORT_INTERVAL):
+        self.symbol = symbol
+        self.logger = logger
+        self.amount = amount
+        self.report_interval = report_interval
+        base = {**DEFAULT_PARAMS, **(params or {})}
+        variants = [{'name': "live"}] + [variant for variant in variants if variant.get('name') != "live"]
+        self.names = [variant.get('name', f"variant-{i}") for i, variant in enumerate(variants)]
+        params = [{**base, **{k: v for k, v in variant.items() if k != 'name'}} for variant in variants]
+
+        self.near_low_pct = np.array([p['near_low_pct'] for p in params], dtype=float)
+        self.low_change_pct = np.array([p['low_change_pct'] for p in params], dtype=float)
+        self.min_trade_interval = np.array([p['min_trade_interval'] for p in params], dtype=float)
+        rules = np.array([BUY_RULES[p['rule']] for p in params], dtype=bool)
+        self.use_dropping, self.use_local_min, self.need_all = rules.T
+        # Variants sharing a local minimum window share its check
+        self.window_sizes, self.window_of = np.unique([p['local_min_window'] for p in params], return_inverse=True)
+        self.prices = np.full(int(self.window_sizes.max()), np.nan)  # recent minute prices, newest last
+
+        count = len(params)
+        self.last_trade = np.full(count, -np.inf)
+        self.buys = np.zeros(count, dtype=int)
+        self.qty = np.zeros(count)
+        self.spent = np.zeros(count)
+        self.last_price = None
+        self._reported_at = time.monotonic()
+
+    def evaluate(self, snapshot, now, record=None, price=None):
+        """Run every variant on one snapshot (at `price`, if given); `record` is should_buy's minute history change"""
+        price = snapshot.price if price is None else price
+        if record == "bar":
+            self.prices[:-1] = self.prices[1:]
+            self.prices[-1] = price
+        elif record == "update":
+            self.prices[-1] = price
+        self.last_price = price
+
+        completed, forming = snapshot.hourly
+        if forming is not None and completed:
+            # The same hourly inputs TradingStrategy.analyze_hourly_pattern computes
+            hour_low = forming.low
+            price_from_hour_low = (price - hour_low) / hour_low * 100
+            hour_low_change = (hour_low - completed[-1].low) / completed[-1].low * 100
+
+            local_min = np.zeros(len(self.window_sizes), dtype=bool)
+            for i, size in enumerate(self.window_sizes):
+                window = self.prices[-size:]
+                # NaN (a window not full yet) compares False, like an unfilled RollingWindow
+                local_min[i] = window[size // 2] <= window.min()
+            local_min = local_min[self.window_of]
+
+            dropping = hour_low_change < self.low_change_pct
+            any_confirmed = (dropping & self.use_dropping) | (local_min & self.use_local_min)
+            all_confirmed = (dropping | ~self.use_dropping) & (local_min | ~self.use_local_min)
+            signal = (price_from_hour_low <= self.near_low_pct) & np.where(self.need_all, all_confirmed,
+                                                                            any_confirmed)
+            buy = signal & (now - self.last_trade >= self.min_trade_interval)
+            if buy.any():
+                self.last_trade[buy] = now
+                self.buys[buy] += 1
+                self.qty[buy] += self.amount / price
+                self.spent[buy] += self.amount
+
+        if time.monotonic() - self._reported_at >= self.report_interval:
+            self._reported_at = time.monotonic()
+            self.report()
+
+    def checkpoint(self):
+        """The minute price history, so the variants' windows survive a restart like the live strategy's"""
+        return {'prices': self.prices.astype('<f8').tobytes()}
+
+    def restore(self, state):
+        """Load checkpoint() state; the newest prices are kept if the longest window has changed since"""
+        prices = np.frombuffer(state['prices'], dtype='<f8')[-len(self.prices):]
+        self.prices[:] = np.nan
+        if len(prices):
+            self.prices[-len(prices):] = prices
+
+    def summary(self):
+        """Each variant's paper buys and P&L at the last price, best first"""
+        value = self.qty * self.last_price if self.last_price else np.zeros(len(self.names))
+        pnl = value - self.spent
+        rows = [{
+            'name': name,
+            'buys': int(self.buys[i]),
+            'spent': float(self.spent[i]),
+            'pnl': float(pnl[i]),
+            'return_pct': float(pnl[i] / self.spent[i] * 100) if self.spent[i] else 0.0,
+        } for i, name in enumerate(self.names)]
+        return sorted(rows, key=lambda row: row['pnl'], reverse=True)
+
+    def report(self, top=3):
+        rows = self.summary()
+        live = next(row for row in rows if row['name'] == "live")
+        self.logger.info(f"SHADOW {self.symbol} ({len(rows)} variants): live is #{rows.index(live) + 1} with "
+                         f"{live['buys']} buys, P&L ${live['pnl']:+,.2f} ({live['return_pct']:+.2f}%)")
+        for rank, row in enumerate(rows[:top], 1):
+            self.logger.info(f"  #{rank} {row['name']}: {row['buys']} buys, P&L ${row['pnl']:+,.2f} "
+                             f"({row['return_pct']:+.2f}%)")
\ No newline at end of file
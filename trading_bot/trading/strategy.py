@@ -1,89 +1,103 @@
-import time
-from datetime import datetime, timedelta
-from config.settings import MIN_TRADE_INTERVAL, MINUTE_SMA_WINDOW
+from datetime import datetime, timezone
+from config.settings import (MIN_TRADE_INTERVAL, MINUTE_SMA_WINDOW, SYMBOLS, NEAR_HOUR_LOW_PCT,
+                             HOUR_LOW_DROP_PCT, LOCAL_MIN_WINDOW, BUY_RULE, CHECKPOINT_MAX_AGE)
+from trading.indicators import RollingWindow
+from utils.clock import SystemClock
+from utils.metrics import metrics
+
+# Tunable thresholds; pass overrides as TradingStrategy(params={...})
+DEFAULT_PARAMS = {
+    'near_low_pct': NEAR_HOUR_LOW_PCT,
+    'low_change_pct': HOUR_LOW_DROP_PCT,
+    'local_min_window': LOCAL_MIN_WINDOW,
+    'min_trade_interval': MIN_TRADE_INTERVAL,
+    'rule': BUY_RULE,
+}
+
+# Conditions (besides being near the hour's low) each buy rule needs: (hourly lows dropping, local minimum, need all)
+BUY_RULES = {
+    'either': (True, True, False),
+    'both': (True, True, True),
+    'dropping': (True, False, False),
+    'local_min': (False, True, False),
+}
 
 class TradingStrategy:
-    def __init__(self, trading_client, market_data, logger):
+    def __init__(self, trading_client, market_data, logger, account_state=None, symbol=None, clock=None, params=None,
+                 order_pipeline=None, execution=None, shadow=None):
+        self.symbol = symbol or SYMBOLS[0]  # each strategy instance trades one symbol
+        self.clock = clock or SystemClock()  # a simulated clock when backtesting
+        self.params = {**DEFAULT_PARAMS, **(params or {})}
+        self.order_pipeline = order_pipeline  # submits orders off this thread, if available
+        self.execution = execution  # works orders as child orders through the pipeline, if enabled
+        self.shadow = shadow  # ShadowBook of paper-traded variants, if any
         self.trading_client = trading_client
         self.market_data = market_data
+        self.account_state = account_state  # streamed account state, if available
         self.logger = logger
         self.last_trade_time = None
         self.last_price = None
-        self.price_history = []  # Store recent minute prices
-        self.hourly_lows = []   # Store hourly lows
+        self.price_history = RollingWindow(30)  # Store recent minute prices
+        self.local_min_window = RollingWindow(self.params['local_min_window'])  # Window checked for a local minimum
         self.in_cooldown = False
-        self.current_hour = None
-        self.current_hour_low = None
-        self.prev_hour_low = None
-        self.last_hourly_data_pull = 0  # Timestamp of last data pull
-        self.hourly_data_pull_interval = 300  # Pull data every 5 minutes (300 seconds)
-
-    def analyze_hourly_pattern(self, current_price):
-        """Analyze hourly price patterns"""
+        self.current_hour = None  # start of the hourly bar last analyzed
+        self.last_bar_time = None  # start of the newest minute in the price windows, epoch seconds
+
+    def checkpoint(self):
+        """State that should survive a restart"""
+        return {
+            'last_trade_time': self.last_trade_time,
+            'last_price': self.last_price,
+            'price_history': list(self.price_history.values),
+            'local_min_window': list(self.local_min_window.values),
+            'current_hour': self.current_hour.timestamp() if self.current_hour is not None else None,
+            'last_bar_time': self.last_bar_time,
+            'shadow': self.shadow.checkpoint() if self.shadow is not None else None,
+        }
+
+    def restore(self, state, age):
+        """Resume from checkpoint() state saved `age` seconds ago"""
+        # The cooldown always carries over, so a restart can't trade early
+        self.last_trade_time = state['last_trade_time']
+        if age > CHECKPOINT_MAX_AGE:
+            return  # the price windows would span the downtime
+        self.last_price = state['last_price']
+        for price in state['price_history']:
+            self.price_history.append(price)
+        for price in state['local_min_window']:
+            self.local_min_window.append(price)
+        if state['current_hour'] is not None:
+            self.current_hour = datetime.fromtimestamp(state['current_hour'], timezone.utc)
+        self.last_bar_time = state.get('last_bar_time')  # not in older checkpoints
+        if self.shadow is not None and state.get('shadow') is not None:  # older checkpoints have no shadow
+            self.shadow.restore(state['shadow'])
+
+    def analyze_hourly_pattern(self, current_price, hourly):
+        """Analyze hourly price patterns from the stream-built hourly bars"""
         try:
-            current_time = time.time()
-            now = datetime.now().replace(minute=0, second=0, microsecond=0)
-            
-            # Only pull historical data at the start of a new hour or if it's been more than 5 minutes
-            pull_historical_data = (self.current_hour != now or 
-                                   (current_time - self.last_hourly_data_pull) > self.hourly_data_pull_interval)
-            
-            if pull_historical_data:
-                # Save our current real-time hourly low before pulling new data
-                saved_current_hour_low = self.current_hour_low
-                
-                # Get hourly bars for the last 24 hours
-                hourly_bars = self.trading_client.get_hourly_bars("BTC/USD", limit=24)
-                self.hourly_lows = [bar.low for bar in hourly_bars]
-                self.last_hourly_data_pull = current_time
-                self.logger.info("Updated historical hourly data from Alpaca")
-                
-                # If we already have a real-time hourly low for the current hour that's lower than what Alpaca returned,
-                # keep our real-time value instead of overwriting it
-                if self.current_hour is not None and self.current_hour == now and saved_current_hour_low is not None:
-                    api_current_hour_low = self.hourly_lows[0] if self.hourly_lows else float('inf')
-                    if saved_current_hour_low < api_current_hour_low:
-                        self.logger.info(f"Keeping real-time hourly low (${saved_current_hour_low:.2f}) which is lower than API data (${api_current_hour_low:.2f})")
-                        # Keep our real-time value but update the rest of the historical data
-                        self.current_hour_low = saved_current_hour_low
-            
-            # Check if we're in a new hour
-            if self.current_hour != now:
-                self.current_hour = now
-                self.logger.info(f"New hour started: {now.strftime('%Y-%m-%d %H:00')}")
-                
-                # Update previous hour low
-                if self.current_hour_low is not None:
-                    self.prev_hour_low = self.current_hour_low
-                
-                # Initialize current hour low from API data if available
-                if self.hourly_lows:
-                    self.current_hour_low = self.hourly_lows[0]
-                else:
-                    # If no API data, use current price as starting point
-                    self.current_hour_low = current_price
-            
-            # Update the current hour's low if real-time price is lower
-            if current_price < self.current_hour_low:
-                self.logger.info(f"Updating hourly low: ${self.current_hour_low:.2f} to ${current_price:.2f}")
-                self.current_hour_low = current_price
-            
-            if len(self.hourly_lows) < 2:
+            completed, forming = hourly
+            if forming is None or not completed:
                 return None, None, None
-            
-            last_hour_low = self.current_hour_low  # Use our real-time updated low
-            prev_hour_low = self.prev_hour_low if self.prev_hour_low is not None else self.hourly_lows[1]
+
+            # Check if we're in a new hour
+            if self.current_hour != forming.timestamp:
+                self.current_hour = forming.timestamp
+                self.logger.info(f"New hour started: {forming.timestamp.strftime('%Y-%m-%d %H:00')}")
+
+            # The forming bar already includes every minute (and correction) of this hour
+            last_hour_low = forming.low
+            prev_hour_low = completed[-1].low
             
             price_from_hour_low = ((current_price - last_hour_low) / last_hour_low) * 100
             hour_low_change = ((last_hour_low - prev_hour_low) / prev_hour_low) * 100
 
             # Calculate average hourly low
-            avg_hourly_low = sum(self.hourly_lows) / len(self.hourly_lows)
+            avg_hourly_low = (sum(bar.low for bar in completed) + last_hour_low) / (len(completed) + 1)
 
             # More concise hourly analysis logging
-            self.logger.info(f"Hourly: Price ${current_price:,.2f} | Current Low ${last_hour_low:,.2f} | " +
-                            f"Prev Low ${prev_hour_low:,.2f} | +{price_from_hour_low:.2f}% from low | " +
-                            f"Low change {hour_low_change:.2f}% | 24h Avg ${avg_hourly_low:.2f}")
+            self.logger.info("Hourly %s: Price $%.2f | Current Low $%.2f | Prev Low $%.2f | +%.2f%% from low | "
+                             "Low change %.2f%% | 24h Avg $%.2f", self.symbol, current_price, last_hour_low,
+                             prev_hour_low, price_from_hour_low, hour_low_change, avg_hourly_low)
 
             return last_hour_low, price_from_hour_low, hour_low_change
 
@@ -91,88 +105,143 @@ class TradingStrategy:
             self.logger.error(f"Error in hourly analysis: {str(e)}")
             return None, None, None
 
-    def is_local_minimum(self, prices, center_idx, window=5):
-        """Check if price point is a local minimum within window"""
-        if len(prices) < window or center_idx < window//2 or center_idx >= len(prices) - window//2:
-            return False
-        
-        center_price = prices[center_idx]
-        left_prices = prices[center_idx - window//2:center_idx]
-        right_prices = prices[center_idx + 1:center_idx + window//2 + 1]
-        
-        return all(center_price <= p for p in left_prices) and all(center_price <= p for p in right_prices)
-
-    def should_buy(self, current_price):
+    def is_local_minimum(self):
+        """True when the middle of the last local_min_window prices is their minimum"""
+        # A full window's middle is a local minimum when it equals the window's rolling min
+        window = self.local_min_window
+        return len(window) == window.size and window[window.size // 2] <= window.min
+
+    def history_change(self, event):
+        """How an event moves the minute price history: "bar" adds a minute, "update" corrects the newest, else None
+
+        Only bars and bar corrections count, once per minute however often the
+        symbol is evaluated; ticks and heartbeats are judged against the history
+        without joining it.
+        """
+        if event is None or event.kind == "tick":
+            return None
+        timestamp = int(event.timestamp.timestamp())
+        if self.last_bar_time is not None and timestamp <= self.last_bar_time:
+            # A repeat of the newest minute (e.g. after a backfill) replaces it; older ones are gone
+            return "update" if timestamp == self.last_bar_time else None
+        return "bar"
+
+    def should_buy(self, current_price, hourly, record=None):
         """Determine if we should buy based on hourly lows analysis"""
-        # Add current price to history
-        self.price_history.append(current_price)
-        if len(self.price_history) > 30:  # Keep last 30 minute prices
-            self.price_history.pop(0)
+        # Add a new minute's price to history (windows drop their oldest entry themselves),
+        # or correct the newest one
+        if record == "bar":
+            self.price_history.append(current_price)
+            self.local_min_window.append(current_price)
+        elif record == "update":
+            self.price_history.replace_last(current_price)
+            self.local_min_window.replace_last(current_price)
 
         # Get hourly analysis
-        hour_low, price_from_hour_low, hour_low_change = self.analyze_hourly_pattern(current_price)
+        with metrics.span('hourly_analysis'):
+            hour_low, price_from_hour_low, hour_low_change = self.analyze_hourly_pattern(current_price, hourly)
         if hour_low is None:
             return False
 
         # Check for local minimum in recent prices
-        is_local_min = False
-        if len(self.price_history) >= 5:
-            is_local_min = self.is_local_minimum(
-                self.price_history, 
-                len(self.price_history) - 3
-            )
+        is_local_min = self.is_local_minimum()
 
         # Buying conditions
-        price_near_hour_low = price_from_hour_low <= 0.5  # Within 0.5% of hour's low
-        hourly_lows_dropping = hour_low_change < -0.1  # Hour's low is dropping
+        price_near_hour_low = price_from_hour_low <= self.params['near_low_pct']  # Close to the hour's low
+        hourly_lows_dropping = hour_low_change < self.params['low_change_pct']  # Hour's low is dropping
         found_local_minimum = is_local_min
 
-        self.logger.info("\nBuy Signal Analysis:")
-        self.logger.info(f"  Near Hour's Low: {price_near_hour_low}")
-        self.logger.info(f"  Hourly Lows Dropping: {hourly_lows_dropping}")
-        self.logger.info(f"  Local Minimum Found: {found_local_minimum}")
+        self.logger.info("Buy Signal Analysis (%s): Near Hour's Low: %s | Hourly Lows Dropping: %s | "
+                         "Local Minimum Found: %s", self.symbol, price_near_hour_low, hourly_lows_dropping,
+                         found_local_minimum)
 
-        # Buy if price is near hour's low AND either:
+        # Buy if price is near hour's low AND (by default) either:
         # 1. Hourly lows are dropping (catching a dip)
         # 2. OR we found a local minimum
-        return price_near_hour_low and (hourly_lows_dropping or found_local_minimum)
+        use_dropping, use_local_min, need_all = BUY_RULES[self.params['rule']]
+        if need_all:
+            confirmed = (hourly_lows_dropping or not use_dropping) and (found_local_minimum or not use_local_min)
+        else:
+            confirmed = (hourly_lows_dropping and use_dropping) or (found_local_minimum and use_local_min)
+        return price_near_hour_low and confirmed
 
-    def execute(self, symbol, amount):
+    def execute(self, symbol, amount, event=None):
+        """Evaluate the strategy, optionally in response to a stream BarEvent"""
         try:
             # Check if we're in the cooldown period
             if self.last_trade_time:
-                elapsed = time.time() - self.last_trade_time
-                if elapsed < MIN_TRADE_INTERVAL:
+                elapsed = self.clock.time() - self.last_trade_time
+                if elapsed < self.params['min_trade_interval']:
                     self.in_cooldown = True
-                    remaining = MIN_TRADE_INTERVAL - elapsed
+                    remaining = self.params['min_trade_interval'] - elapsed
                     # Only log cooldown status every 30 seconds
                     if int(remaining) % 30 == 0 or remaining < 10:
-                        self.logger.info(f"COOLDOWN: {remaining:.1f} seconds remaining until next trade")
+                        self.logger.info("COOLDOWN: %.1f seconds remaining until next trade", remaining)
                 else:
                     # Cooldown period is over
                     if self.in_cooldown:
                         self.logger.info("COOLDOWN ENDED: Bot can trade again")
                         self.in_cooldown = False
 
-            current_price = self.market_data.get_current_price(symbol)
-            # Get the cached 500-bar SMA (already updated in get_current_price)
-            minute_sma = self.market_data.get_minute_sma(symbol)
+            # One consistent snapshot of the symbol's market state for this whole decision
+            snapshot = self.market_data.get_snapshot(symbol)
+            if snapshot is None:
+                self.logger.info("Waiting for WebSocket data...")
+                return False
+            record = self.history_change(event)
+            # A bar or correction is decided on its own close, even if a tick has moved the snapshot on since
+            current_price = event.close if record else snapshot.price
 
-            account_info = self.trading_client.get_account_info()
+            # Read buying power from memory when we have streamed account state,
+            # otherwise fall back to a REST call
+            with metrics.span('account_fetch'):
+                if self.account_state is not None:
+                    account_info = self.account_state.get_account_info()
+                else:
+                    account_info = self.trading_client.get_account_info()
             if not all([current_price, account_info]):
                 return False
 
             buying_power = account_info['buying_power']
 
-            if buying_power >= amount and self.should_buy(current_price) and not self.in_cooldown:
+            with metrics.span('decision'):
+                buy_signal = self.should_buy(current_price, snapshot.hourly, record=record)
+            if record:
+                self.last_bar_time = int(event.timestamp.timestamp())
+
+            trade = buying_power >= amount and buy_signal and not self.in_cooldown
+            if trade:
                 self.logger.info("TRADE SIGNAL: Price near hour's low and conditions met for buying")
-                order = self.trading_client.place_buy_order(symbol, amount)
-                if order:
-                    self.last_trade_time = time.time()
-                    self.logger.info(f"Next trade possible in: {MIN_TRADE_INTERVAL/60:.1f} minutes")
-            else:
-                if self.should_buy(current_price):
-                    self.logger.info("MONITORING: Conditions not ideal for trading yet")
+                if self.order_pipeline is not None:
+                    # Queue the order and return straight away; keying it on the bar (or
+                    # tick) it was decided on means at most one order per symbol per bar
+                    key = snapshot.tick_time or snapshot.timestamp
+                    origin = event.received_at if event else None
+                    if self.execution is not None:
+                        # Sliced into child orders; slippage is measured against this price
+                        queued = self.execution.submit(symbol, amount, key, current_price, on_ack=self._on_order_ack,
+                                                       on_error=self._on_order_error, origin=origin)
+                    else:
+                        queued = self.order_pipeline.submit(symbol, amount, key, on_ack=self._on_order_ack,
+                                                            on_error=self._on_order_error, origin=origin)
+                    if queued:
+                        self.last_trade_time = self.clock.time()
+                        self.logger.info(f"Next trade possible in: {self.params['min_trade_interval']/60:.1f} minutes")
+                else:
+                    order = self.trading_client.place_buy_order(symbol, amount)
+                    if order:
+                        self.last_trade_time = self.clock.time()
+                        if self.account_state is not None:
+                            self.account_state.reserve(order.id, amount)
+                        self.logger.info(f"Next trade possible in: {self.params['min_trade_interval']/60:.1f} minutes")
+            elif buy_signal:
+                self.logger.info("MONITORING: Conditions not ideal for trading yet")
+
+            if self.shadow is not None:
+                # Only after the live decision (and its order), so the variants never delay it
+                with metrics.span('shadow'):
+                    self.shadow.evaluate(snapshot, self.clock.time(), record, current_price)
+            if not trade:
                 return False
 
             self.last_price = current_price
@@ -180,4 +249,15 @@ class TradingStrategy:
 
         except Exception as e:
             self.logger.error(f"ERROR: Strategy execution failed: {str(e)}")
-            return False 
\ No newline at end of file
+            return False
+
+    def _on_order_ack(self, intent, order):
+        """Called from the order pipeline once Alpaca has accepted an order"""
+        if self.account_state is not None:
+            self.account_state.reserve(order.id, intent.amount)
+
+    def _on_order_error(self, intent, error):
+        """Called from the order pipeline when an order could not be placed"""
+        # Nothing was bought, so don't hold the symbol in cooldown
+        self.last_trade_time = None
+        self.logger.error(f"ORDER FAILED: ${intent.amount} of {intent.symbol}, cooldown cleared") 
\ No newline at end of file
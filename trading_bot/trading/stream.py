@@ -0,0 +1,26 @@
+import asyncio
+from alpaca.data.live import CryptoDataStream
+
+# alpaca-py has no public connect callback, so the one hook below wraps the coroutine
+# its run() awaits on every (re)connect before subscribing. That is the only private
+# piece: reconnecting, its backoff and stale-stream detection (data_timeout) are left
+# to the SDK. Checked against alpaca-py 0.44 (pinned in the README); fail loudly on an
+# SDK that has moved it rather than silently never backfilling
+if not asyncio.iscoroutinefunction(getattr(CryptoDataStream, '_start_ws', None)):
+    raise ImportError("this alpaca-py's CryptoDataStream has no _start_ws; trading/stream.py needs updating")
+
+class SupervisedCryptoStream(CryptoDataStream):
+    """CryptoDataStream that reports every (re)connection to `on_connect`
+
+    `loop` is the stream's event loop once it has connected, for handing work
+    to the thread that owns the streamed state.
+    """
+    def __init__(self, on_connect, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.on_connect = on_connect  # called on the stream's event loop, before subscribing
+        self.loop = None
+
+    async def _start_ws(self):
+        await super()._start_ws()
+        self.loop = asyncio.get_running_loop()
+        self.on_connect(self.loop)
\ No newline at end of file
@@ -0,0 +1,180 @@
+import argparse
+import bisect
+import csv
+import itertools
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+from config.settings import TRADE_AMOUNT
+from trading.bars import load_bars_csv
+from trading.strategy import DEFAULT_PARAMS, BUY_RULES
+
+# Grid used when none is given on the command line
+DEFAULT_GRID = {
+    'near_low_pct': [0.1, 0.25, 0.5, 1.0],
+    'low_change_pct': [-0.5, -0.25, -0.1, 0.0],
+    'local_min_window': [3, 5, 9, 15],
+    'min_trade_interval': [60, 120, 600, 1800],
+}
+
+class SignalData:
+    """Minute bars plus the parameter-independent hourly features of TradingStrategy.should_buy"""
+    def __init__(self, timestamps, closes, horizon=60, lows=None):
+        self.timestamps = timestamps  # int64 epoch seconds
+        self.closes = closes
+        self.lows = closes if lows is None else lows
+        self.horizon = horizon
+
+        # Hourly bars hold the minutes that start within the hour, as the
+        # stream-built bars the strategy reads do
+        hours = timestamps // 3600
+        starts = np.flatnonzero(np.diff(hours, prepend=hours[0] - 1))
+        ends = np.append(starts[1:], len(closes))
+
+        # Low of the forming hourly bar so far, and the final low of the bar before
+        self.hour_low = np.empty_like(closes)
+        self.prev_hour_low = np.full_like(closes, np.nan)
+        prev_low = np.nan
+        for start, end in zip(starts, ends):
+            self.hour_low[start:end] = np.minimum.accumulate(self.lows[start:end])
+            self.prev_hour_low[start:end] = prev_low
+            prev_low = self.hour_low[end - 1]
+
+        self.price_from_hour_low = (closes - self.hour_low) / self.hour_low * 100
+        self.hour_low_change = (self.hour_low - self.prev_hour_low) / self.prev_hour_low * 100
+
+        # Return from each entry to `horizon` minutes later, and to the end of the data
+        forward = np.roll(closes, -horizon)
+        forward[-horizon:] = closes[-1]
+        self.forward_return = forward / closes - 1
+        self.hold_return = closes[-1] / closes - 1
+        self._local_minima = {}  # window -> flags, shared by every combination using that window
+
+    def local_minimum(self, window):
+        """True where the middle of the trailing window is its minimum"""
+        flags = self._local_minima.get(window)
+        if flags is None:
+            flags = self._local_minima[window] = np.zeros(len(self.closes), dtype=bool)
+            if len(self.closes) >= window:
+                windows = sliding_window_view(self.closes, window)
+                flags[window - 1:] = windows[:, window // 2] <= windows.min(axis=1)
+        return flags
+
+    def signals(self, params):
+        """Vectorized should_buy for one parameter set"""
+        dropping = self.hour_low_change < params['low_change_pct']
+        local_min = self.local_minimum(params['local_min_window'])
+        use_dropping, use_local_min, need_all = BUY_RULES[params['rule']]
+        if need_all:
+            confirmed = (dropping | (not use_dropping)) & (local_min | (not use_local_min))
+        else:
+            confirmed = (dropping & use_dropping) | (local_min & use_local_min)
+        signal = (self.price_from_hour_low <= params['near_low_pct']) & confirmed
+        signal &= ~np.isnan(self.prev_hour_low)
+        return signal
+
+    def trades(self, params):
+        """Indices of the signals that survive the trade cooldown"""
+        candidates = np.flatnonzero(self.signals(params))
+        if len(candidates) == 0:
+            return candidates
+        times = self.timestamps[candidates].tolist()
+        interval = params['min_trade_interval']
+        taken = []
+        i = 0
+        while i < len(times):
+            taken.append(i)
+            # Jump straight to the first signal after the cooldown ends
+            i = bisect.bisect_left(times, times[i] + interval, i + 1)
+        return candidates[taken]
+
+    def evaluate(self, params, amount=TRADE_AMOUNT):
+        trades = self.trades(params)
+        count = len(trades)
+        return {
+            **params,
+            'trades': count,
+            'pnl': float(amount * self.hold_return[trades].sum()) if count else 0.0,
+            'avg_forward_bps': float(self.forward_return[trades].mean() * 10000) if count else 0.0,
+            'hit_rate': float((self.forward_return[trades] > 0).mean()) if count else 0.0,
+        }
+
+_data = None
+
+def _init_worker(timestamps, closes, horizon, lows):
+    # Each worker builds the shared features once and reuses them for every combination
+    global _data
+    _data = SignalData(timestamps, closes, horizon, lows)
+
+def _evaluate(params):
+    return _data.evaluate(params)
+
+def expand_grid(grid):
+    """Every combination of the grid's values, with unspecified parameters at their defaults"""
+    base = dict(DEFAULT_PARAMS)
+    keys = list(grid)
+    for values in itertools.product(*(grid[key] for key in keys)):
+        yield {**base, **dict(zip(keys, values))}
+
+def run_sweep(timestamps, closes, grid, horizon=60, workers=None, rank_by='pnl', lows=None):
+    """Evaluate every combination in the grid across a process pool, best first"""
+    combos = list(expand_grid(grid))
+    workers = workers or os.cpu_count()
+    chunksize = max(1, len(combos) // (workers * 4))
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(timestamps, closes, horizon, lows)) as pool:
+        results = list(pool.map(_evaluate, combos, chunksize=chunksize))
+    return sorted(results, key=lambda result: result[rank_by], reverse=True)
+
+def format_table(results, limit=20):
+    if not results:
+        return "No results"
+    columns = list(results[0])
+    rows = [[_format_cell(result[column]) for column in columns] for result in results[:limit]]
+    widths = [max(len(column), *(len(row[i]) for row in rows)) for i, column in enumerate(columns)]
+    lines = ["  ".join(column.rjust(width) for column, width in zip(columns, widths))]
+    lines += ["  ".join(cell.rjust(width) for cell, width in zip(row, widths)) for row in rows]
+    return "\n".join(lines)
+
+def _format_cell(value):
+    if isinstance(value, float):
+        return f"{value:.4f}"
+    return str(value)
+
+def main():
+    parser = argparse.ArgumentParser(description="Sweep strategy thresholds over historical minute bars")
+    parser.add_argument('--bars', required=True, help="minute bars CSV (timestamp,open,high,low,close,volume)")
+    parser.add_argument('--grid', help="JSON file mapping parameter names to lists of values")
+    parser.add_argument('--horizon', type=int, default=60, help="minutes used for the forward return")
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--rank-by', default='pnl', choices=['pnl', 'avg_forward_bps', 'hit_rate', 'trades'])
+    parser.add_argument('--top', type=int, default=20)
+    parser.add_argument('--csv', help="write the full ranked table to this file")
+    args = parser.parse_args()
+
+    grid = DEFAULT_GRID
+    if args.grid:
+        with open(args.grid) as f:
+            grid = json.load(f)
+
+    bars = load_bars_csv(args.bars, "sweep")
+    timestamps = np.array([int(bar.timestamp.timestamp()) for bar in bars], dtype=np.int64)
+    closes = np.array([bar.close for bar in bars], dtype=np.float64)
+    lows = np.array([bar.low for bar in bars], dtype=np.float64)
+
+    started = time.perf_counter()
+    results = run_sweep(timestamps, closes, grid, args.horizon, args.workers, args.rank_by, lows)
+    print(f"Evaluated {len(results)} parameter sets over {len(bars):,} bars in {time.perf_counter() - started:.2f}s\n")
+    print(format_table(results, args.top))
+
+    if args.csv:
+        with open(args.csv, 'w', newline='') as f:
+            writer = csv.DictWriter(f, fieldnames=list(results[0]))
+            writer.writeheader()
+            writer.writerows(results)
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
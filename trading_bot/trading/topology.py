@@ -0,0 +1,229 @@
+import logging
+import multiprocessing
+import queue
+import threading
+import time
+from collections import defaultdict
+from datetime import datetime, timezone
+import numpy as np
+from config.settings import (SYMBOLS, STRATEGY_WORKERS, BAR_RING_POLL_INTERVAL, ORDER_QUEUE_SIZE, EXECUTION_STYLE,
+                             HEARTBEAT_INTERVAL, METRICS_REPORT_INTERVAL, LATENCY_ALERT_MS)
+from trading.account import AccountState
+from trading.bar_cache import BarCache
+from trading.bar_ring import KINDS, SharedBarRing, RingReader
+from trading.bar_store import BAR_DTYPE
+from trading.bars import Bar
+from trading.client import AlpacaTradingClient
+from trading.data import MarketData
+from trading.execution import ExecutionScheduler
+from trading.orders import OrderPipeline, client_order_id
+from trading.shadow import shadow_books
+from trading.strategy import TradingStrategy
+from utils.logger import setup_logger, child_log_queue
+from utils.metrics import metrics
+from utils.profiler import profile_on_signal
+
+# Layout of the shared account array the execution process keeps current
+ACCOUNT_FIELDS = ('ready', 'cash', 'portfolio_value', 'buying_power', 'daily_pl')
+
+def _bar(symbol, row):
+    """Bar for one ring record (as a tuple)"""
+    _, _, _, timestamp, open_, high, low, close, volume = row
+    return Bar(symbol, datetime.fromtimestamp(timestamp, timezone.utc), open_, high, low, close, volume)
+
+def follow_ring(ring, market_data, logger, poll_interval=BAR_RING_POLL_INTERVAL):
+    """Feed a process's MarketData from the ring; this thread plays the part of the stream thread"""
+    reader = RingReader(ring)
+    symbols = set(market_data.symbols)
+    seed = KINDS.index("seed")
+
+    # What's already in the ring is history: load it without events, like a warm start
+    history = defaultdict(list)
+    for row in reader.read(ring.capacity).tolist():
+        if ring.symbols[row[1]] in symbols:
+            history[ring.symbols[row[1]]].append(row[3:])
+    _apply_seeded(market_data, history)
+
+    while True:
+        batch = reader.read()
+        if len(batch) == 0:
+            time.sleep(poll_interval)
+            continue
+        seeded = defaultdict(list)
+        for row in batch.tolist():
+            symbol = ring.symbols[row[1]]
+            if symbol not in symbols:
+                continue
+            if row[2] == seed:
+                seeded[symbol].append(row[3:])
+                continue
+            # Keep the stream's order: backfilled bars before the live ones after them
+            _apply_seeded(market_data, seeded)
+            with metrics.span('state_update'):
+                if KINDS[row[2]] == "bar":
+                    market_data._on_bar(_bar(symbol, row))
+                else:
+                    market_data._on_update(_bar(symbol, row))
+        _apply_seeded(market_data, seeded)
+        if reader.missed:
+            logger.error(f"Fell behind the shared bar ring, {reader.missed} bars lost")
+            reader.missed = 0
+
+def _apply_seeded(market_data, seeded):
+    """Apply {symbol: [(timestamp, open, high, low, close, volume)]} without events, then clear it"""
+    if seeded:
+        market_data._apply_gap({symbol: np.array(rows, dtype=BAR_DTYPE) for symbol, rows in seeded.items()})
+        seeded.clear()
+
+class SharedAccount:
+    """Read-only account view for strategy workers, kept current by the execution process"""
+    def __init__(self, values):
+        self.values = values
+
+    def get_account_info(self):
+        with self.values.get_lock():
+            ready, cash, portfolio_value, buying_power, daily_pl = self.values[:]
+        if not ready:
+            return None
+        return {'cash': cash, 'portfolio_value': portfolio_value, 'buying_power': buying_power, 'daily_pl': daily_pl}
+
+    def reserve(self, order_id, amount):
+        pass  # the execution process holds back buying power for the orders it places
+
+class IntentSender:
+    """Stands in for the OrderPipeline in a strategy worker: sends each order to the execution process.
+
+    Acks and errors stay in the execution process, so a failed order
+    doesn't clear the strategy's cooldown the way it does in one process.
+    """
+    def __init__(self, intents, market_data, logger):
+        self.intents = intents
+        self.market_data = market_data
+        self.logger = logger
+
+    def submit(self, symbol, amount, key, on_ack=None, on_done=None, on_error=None, origin=None):
+        snapshot = self.market_data.get_snapshot(symbol)
+        arrival_price = snapshot.price if snapshot is not None else None
+        try:
+            self.intents.put_nowait((symbol, amount, key, arrival_price, origin))
+        except queue.Full:
+            self.logger.error(f"Order queue full, dropping ${amount} order for {symbol}")
+            return None
+        return client_order_id(symbol, key)
+
+class RingBars:
+    """Newest minute bar per symbol, followed from the ring (sizes POV child orders)"""
+    def __init__(self, ring, poll_interval=BAR_RING_POLL_INTERVAL):
+        self.ring = ring
+        self.poll_interval = poll_interval
+        self.latest = {}
+        threading.Thread(target=self._follow, daemon=True).start()
+
+    def get_latest_bar(self, symbol):
+        return self.latest.get(symbol)
+
+    def _follow(self):
+        reader = RingReader(self.ring)
+        while True:
+            batch = reader.read()
+            if len(batch) == 0:
+                time.sleep(self.poll_interval)
+                continue
+            for row in batch.tolist():
+                symbol = self.ring.symbols[row[1]]
+                self.latest[symbol] = _bar(symbol, row)
+
+def _run_strategy_worker(ring_name, symbols, worker_symbols, intents, account, log_queue):
+    """Strategy process: its symbols' market state, rebuilt from the ring, and their strategies"""
+    from main import run_event_loop  # main imports this module
+
+    logger = setup_logger(__name__, log_queue)
+    metrics.start_reporter(logger, METRICS_REPORT_INTERVAL, None, LATENCY_ALERT_MS)
+    profile_on_signal(logger)  # each process profiles itself: kill -USR1 <its pid>
+    ring = SharedBarRing(symbols, name=ring_name)
+    # The ingest process already logs every bar and correction
+    state_logger = logger.getChild('ring')
+    state_logger.setLevel(logging.WARNING)
+    market_data = MarketData(state_logger, BarCache(logger), symbols=worker_symbols, start_stream=False)
+    market_data.seed_resamplers()
+    threading.Thread(target=follow_ring, args=(ring, market_data, logger), daemon=True).start()
+
+    sender = IntentSender(intents, market_data, logger)
+    account_view = SharedAccount(account)
+    shadows = shadow_books(worker_symbols, logger)
+    strategies = {
+        symbol: TradingStrategy(None, market_data, logger, account_view, symbol, order_pipeline=sender,
+                                shadow=shadows.get(symbol))
+        for symbol in worker_symbols
+    }
+    logger.info(f"Strategy worker running for {', '.join(worker_symbols)}")
+    run_event_loop(strategies, market_data, logger)
+
+def _run_execution(ring_name, symbols, intents, account, log_queue):
+    """Execution process: the only one that places orders or follows the account"""
+    logger = setup_logger(__name__, log_queue)
+    metrics.start_reporter(logger, METRICS_REPORT_INTERVAL, None, LATENCY_ALERT_MS)
+    profile_on_signal(logger)  # each process profiles itself: kill -USR1 <its pid>
+    trading_client = AlpacaTradingClient(logger, BarCache(logger))
+    account_state = AccountState(trading_client, logger)
+    order_pipeline = OrderPipeline(trading_client, logger)
+    account_state.add_trade_listener(order_pipeline.on_trade_update)
+    execution = None
+    if EXECUTION_STYLE:
+        execution = ExecutionScheduler(order_pipeline, RingBars(SharedBarRing(symbols, name=ring_name)), logger)
+
+    def share_account():
+        while True:
+            info = account_state.get_account_info()
+            if info is not None:
+                with account.get_lock():
+                    account[:] = [1.0] + [info[field] for field in ACCOUNT_FIELDS[1:]]
+            time.sleep(0.2)
+
+    def on_ack(intent, order):
+        account_state.reserve(order.id, intent.amount)
+
+    threading.Thread(target=share_account, daemon=True).start()
+    logger.info("Execution process running")
+    while True:
+        symbol, amount, key, arrival_price, origin = intents.get()
+        if execution is not None and arrival_price is not None:
+            execution.submit(symbol, amount, key, arrival_price, on_ack=on_ack, origin=origin)
+        else:
+            order_pipeline.submit(symbol, amount, key, on_ack=on_ack, origin=origin)
+
+def run_multiprocess(logger, bar_cache, bar_store=None, symbols=SYMBOLS, workers=STRATEGY_WORKERS):
+    """Run the market data stream here and strategies and execution in child processes until one exits"""
+    context = multiprocessing.get_context('spawn')
+    ring = SharedBarRing(symbols)
+    log_queue = child_log_queue(context)
+    intents = context.Queue(ORDER_QUEUE_SIZE)
+    account = context.Array('d', len(ACCOUNT_FIELDS))
+    workers = max(1, min(workers, len(symbols)))
+
+    processes = [context.Process(target=_run_execution, name="execution", daemon=True,
+                                 args=(ring.name, symbols, intents, account, log_queue))]
+    for i in range(workers):
+        processes.append(context.Process(target=_run_strategy_worker, name=f"strategy-{i}", daemon=True,
+                                         args=(ring.name, symbols, symbols[i::workers], intents, account,
+                                               log_queue)))
+    try:
+        for process in processes:
+            process.start()
+        logger.info(f"Started {workers} strategy worker(s) and an execution process")
+
+        market_data = MarketData(logger, bar_cache, symbols, bar_store=bar_store, bar_ring=ring)
+        while True:
+            # Nothing decides in this process; just keep the event queue drained
+            market_data.wait_for_event(timeout=HEARTBEAT_INTERVAL)
+            stopped = [process for process in processes if not process.is_alive()]
+            if stopped:
+                logger.error(f"{stopped[0].name} process exited with code {stopped[0].exitcode}, shutting down")
+                return
+    finally:
+        for process in processes:
+            if process.is_alive():
+                process.terminate()
+        for process in processes:
+            process.join(timeout=5)
+        ring.close()
\ No newline at end of file
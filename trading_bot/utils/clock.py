@@ -0,0 +1,24 @@
+import time
+from datetime import datetime
+
+class SystemClock:
+    """Wall-clock time, used when trading live"""
+    def time(self):
+        return time.time()
+
+    def now(self):
+        return datetime.now()
+
+class SimulatedClock:
+    """Clock that only moves when told to, used to replay history"""
+    def __init__(self, start=None):
+        self._now = start
+
+    def set(self, dt):
+        self._now = dt
+
+    def time(self):
+        return self._now.timestamp()
+
+    def now(self):
+        return self._now
\ No newline at end of file
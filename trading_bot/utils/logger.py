@@ -1,30 +1,107 @@
+import atexit
 import logging
-import os
-import glob
-from datetime import datetime
-
-def setup_logger(name):
-    # Create a log filename with today's date
-    today = datetime.now().strftime('%Y-%m-%d')
-    log_filename = f'trading_bot_{today}.log'
-    
-    # Delete old log files (from previous days)
-    old_logs = glob.glob('trading_bot_*.log')
-    for old_log in old_logs:
-        # Skip today's log file
-        if old_log != log_filename:
-            try:
-                os.remove(old_log)
-                print(f"Deleted old log file: {old_log}")
-            except Exception as e:
-                print(f"Could not delete {old_log}: {e}")
-    
-    logging.basicConfig(
-        level=logging.INFO,
-        format='%(asctime)s - %(levelname)s - %(message)s',
-        handlers=[
-            logging.FileHandler(log_filename),
-            logging.StreamHandler()
-        ]
-    )
-    return logging.getLogger(name) 
\ No newline at end of file
+import logging.handlers
+import queue
+import time
+from config.settings import LOG_FILE, LOG_MAX_BYTES, LOG_BACKUP_COUNT, LOG_RATE_LIMITS
+
+_configured = False
+_handlers = None  # file and console handlers, shared by every writer thread
+
+class DeferredQueueHandler(logging.handlers.QueueHandler):
+    """Queue handler that leaves message formatting to the writer thread"""
+    def prepare(self, record):
+        # The default prepare() formats the message on the calling thread; our
+        # callers pass plain values as args, so the record can be queued as is
+        return record
+
+class RateLimitFilter(logging.Filter):
+    """Lets through at most one record per interval for each rate-limited message type and symbol.
+
+    Message types are matched by the start of the unformatted message, e.g.
+    {"NEW PRICE": 60} keeps one "NEW PRICE" line a minute for each symbol.
+    The symbol is the record's first argument, so every rate-limited message
+    passes it first. The next line that gets through reports how many were
+    dropped.
+    """
+    def __init__(self, limits):
+        super().__init__()
+        self.limits = limits
+        self._types = {}  # message template -> matching prefix, or None
+        self._next_allowed = {}
+        self._suppressed = {}
+
+    def filter(self, record):
+        msg = record.msg
+        if not isinstance(msg, str):
+            return True
+        prefix = self._types.get(msg, False)
+        if prefix is False:
+            prefix = next((p for p in self.limits if msg.lstrip().startswith(p)), None)
+            self._types[msg] = prefix
+        if prefix is None:
+            return True
+
+        args = record.args
+        key = (prefix, args[0] if isinstance(args, tuple) and args else None)
+        now = time.monotonic()
+        if now < self._next_allowed.get(key, 0):
+            self._suppressed[key] = self._suppressed.get(key, 0) + 1
+            return False
+        self._next_allowed[key] = now + self.limits[prefix]
+        suppressed = self._suppressed.pop(key, 0)
+        if suppressed and isinstance(record.args, tuple):
+            record.msg = msg + " (%d similar suppressed)"
+            record.args = record.args + (suppressed,)
+        return True
+
+def _file_handler():
+    # Rotate by size when LOG_MAX_BYTES is set, otherwise once a day
+    if LOG_MAX_BYTES:
+        return logging.handlers.RotatingFileHandler(LOG_FILE, maxBytes=LOG_MAX_BYTES, backupCount=LOG_BACKUP_COUNT)
+    return logging.handlers.TimedRotatingFileHandler(LOG_FILE, when='midnight', backupCount=LOG_BACKUP_COUNT)
+
+def _start_writer(log_queue):
+    """Write records from log_queue to the log file and console on a background thread"""
+    global _handlers
+    if _handlers is None:
+        formatter = logging.Formatter('%(asctime)s - %(levelname)s - %(message)s')
+        _handlers = [_file_handler(), logging.StreamHandler()]
+        for handler in _handlers:
+            handler.setFormatter(formatter)
+    listener = logging.handlers.QueueListener(log_queue, *_handlers, respect_handler_level=True)
+    listener.start()
+    # Flush whatever is still queued when the process exits
+    atexit.register(listener.stop)
+    return listener
+
+def setup_logger(name, log_queue=None):
+    """Return a logger whose records are written by a background thread.
+
+    Logging calls only put the record on a queue; formatting and file and
+    console I/O happen on the writer thread, so they never stall the stream
+    event loop or the decision path. Child processes pass the queue from
+    child_log_queue() so their records go through the parent's writer.
+    """
+    global _configured
+    if not _configured:
+        _configured = True
+        if log_queue is None:
+            log_queue = queue.SimpleQueue()
+            _start_writer(log_queue)
+            queue_handler = DeferredQueueHandler(log_queue)
+        else:
+            # Records are pickled to cross processes, so format them here first
+            queue_handler = logging.handlers.QueueHandler(log_queue)
+        queue_handler.addFilter(RateLimitFilter(LOG_RATE_LIMITS))
+
+        root = logging.getLogger()
+        root.setLevel(logging.INFO)
+        root.addHandler(queue_handler)
+    return logging.getLogger(name)
+
+def child_log_queue(context):
+    """A queue that child processes of `context` can log to, written by this process's writer"""
+    log_queue = context.Queue()
+    _start_writer(log_queue)
+    return log_queue
\ No newline at end of file
@@ -0,0 +1,171 @@
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit, parse_qs
+
+# Values below 2**_PRECISION_BITS ns get their own bucket; above that each
+# power of two is split into 2**(_PRECISION_BITS - 1) buckets (<1% error)
+_PRECISION_BITS = 7
+_SUB_BUCKETS = 1 << (_PRECISION_BITS - 1)
+_MAX_SHIFT = 40  # up to ~2**47 ns, about 39 hours
+
+PERCENTILES = (50, 90, 99, 99.9)
+
+def _bucket(value):
+    if value < (1 << _PRECISION_BITS):
+        return value
+    shift = min(value.bit_length() - _PRECISION_BITS, _MAX_SHIFT)
+    return shift * _SUB_BUCKETS + min(value >> shift, 2 * _SUB_BUCKETS - 1)
+
+def _bucket_value(index):
+    """Upper edge of a bucket, in ns"""
+    if index < (1 << _PRECISION_BITS):
+        return index
+    shift = index // _SUB_BUCKETS - 1
+    return ((index - shift * _SUB_BUCKETS + 1) << shift) - 1
+
+class LatencyHistogram:
+    """HDR-style log-linear histogram of nanosecond latencies with O(1) recording"""
+    def __init__(self, counts=None):
+        self.counts = counts or [0] * ((_MAX_SHIFT + 2) * _SUB_BUCKETS)
+        self.count = sum(self.counts)
+        self.max = max((_bucket_value(i) for i, c in enumerate(self.counts) if c), default=0)
+        self._lock = threading.Lock()
+
+    def record(self, nanoseconds):
+        nanoseconds = max(int(nanoseconds), 0)
+        with self._lock:
+            self.counts[_bucket(nanoseconds)] += 1
+            self.count += 1
+            if nanoseconds > self.max:
+                self.max = nanoseconds
+
+    def percentile(self, pct):
+        """Latency in ns at or below which pct percent of samples fall"""
+        if self.count == 0:
+            return 0
+        target = max(1, int(self.count * pct / 100 + 0.5))
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen >= target:
+                return min(_bucket_value(index), self.max)
+        return self.max
+
+    def since(self, previous_counts):
+        """Histogram of the samples recorded after previous_counts was copied"""
+        with self._lock:
+            counts = [now - before for now, before in zip(self.counts, previous_counts)]
+        return LatencyHistogram(counts)
+
+    def summary(self):
+        summary = {'count': self.count, 'max_ms': self.max / 1e6}
+        for pct in PERCENTILES:
+            summary[f"p{pct:g}_ms"] = self.percentile(pct) / 1e6
+        return summary
+
+class Span:
+    """Times a `with` block into a stage's histogram"""
+    __slots__ = ('histogram', 'start')
+
+    def __init__(self, histogram):
+        self.histogram = histogram
+
+    def __enter__(self):
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc):
+        self.histogram.record(time.perf_counter_ns() - self.start)
+        return False
+
+class Metrics:
+    """Process-wide latency histograms, one per pipeline stage"""
+    def __init__(self):
+        self._histograms = {}
+        self._lock = threading.Lock()
+
+    def histogram(self, stage):
+        histogram = self._histograms.get(stage)
+        if histogram is None:
+            with self._lock:
+                histogram = self._histograms.setdefault(stage, LatencyHistogram())
+        return histogram
+
+    def span(self, stage):
+        return Span(self.histogram(stage))
+
+    def record(self, stage, seconds):
+        self.histogram(stage).record(seconds * 1e9)
+
+    def record_since(self, stage, start):
+        """Record the time since a time.monotonic() start"""
+        self.record(stage, time.monotonic() - start)
+
+    def summary(self):
+        return {stage: histogram.summary() for stage, histogram in sorted(self._histograms.items())}
+
+    def start_reporter(self, logger, interval, port=None, alert_ms=None, profiler=None):
+        """Log per-interval percentiles (warning on slow stages) and optionally serve them over HTTP
+
+        With a profiler, a POST to /profile?seconds=N on the same port starts a profile.
+        """
+        alert_ms = alert_ms or {}
+
+        def report():
+            previous = {}
+            while True:
+                time.sleep(interval)
+                for stage, histogram in sorted(self._histograms.items()):
+                    recent = histogram.since(previous.get(stage, [0] * len(histogram.counts)))
+                    previous[stage] = list(histogram.counts)
+                    if recent.count == 0:
+                        continue
+                    p50, p99 = recent.percentile(50) / 1e6, recent.percentile(99) / 1e6
+                    limit = alert_ms.get(stage)
+                    log = logger.warning if limit is not None and p99 > limit else logger.info
+                    log("LATENCY %s: n=%d p50=%.2fms p99=%.2fms max=%.2fms%s", stage, recent.count, p50, p99,
+                        recent.max / 1e6, f" (over {limit}ms alert)" if log is logger.warning else "")
+
+        threading.Thread(target=report, daemon=True).start()
+
+        if port:
+            metrics = self
+
+            class Handler(BaseHTTPRequestHandler):
+                def do_GET(self):
+                    self._reply(200, metrics.summary())
+
+                def do_POST(self):
+                    url = urlsplit(self.path)
+                    if url.path != '/profile' or profiler is None:
+                        self._reply(404, {'error': "not found"})
+                        return
+                    seconds = parse_qs(url.query).get('seconds')
+                    try:
+                        options = {'duration': float(seconds[0])} if seconds else {}
+                    except ValueError:
+                        self._reply(400, {'error': "seconds must be a number"})
+                        return
+                    # 409 when a profile is already running
+                    started = profiler.start(**options)
+                    self._reply(202 if started else 409, {'profiling': started, 'output_dir': profiler.output_dir})
+
+                def _reply(self, status, payload):
+                    body = json.dumps(payload, indent=2).encode()
+                    self.send_response(status)
+                    self.send_header('Content-Type', 'application/json')
+                    self.send_header('Content-Length', str(len(body)))
+                    self.end_headers()
+                    self.wfile.write(body)
+
+                def log_message(self, *args):
+                    pass
+
+            # Local only: percentiles are for operators on this machine
+            server = ThreadingHTTPServer(('127.0.0.1', port), Handler)
+            threading.Thread(target=server.serve_forever, daemon=True).start()
+            logger.info(f"Latency metrics available at http://127.0.0.1:{port}/")
+
+metrics = Metrics()
\ No newline at end of file
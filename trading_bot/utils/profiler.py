@@ -0,0 +1,128 @@
+import os
+import signal
+import sys
+import threading
+import time
+from collections import Counter
+from config.settings import PROFILE_DIR, PROFILE_DURATION, PROFILE_INTERVAL
+
+_STDLIB = os.path.dirname(os.__file__)
+
+class SamplingProfiler:
+    """Samples every thread's stack while turned on, for finding what a running bot spends its time on.
+
+    Nothing is hooked into the interpreter: while a profile runs, one
+    background thread reads all threads' current frames every `interval`
+    seconds, and when it's off there is no thread and no cost at all.
+    Samples are wall-clock, so a thread waiting on a socket or a queue
+    shows up in the wait, and each stack starts with its thread's name
+    (the main loop, the stream thread and so on).
+
+    When a profile ends, two files are written to `output_dir`: collapsed
+    stacks (`.collapsed`, one "frame;frame;frame count" line per stack, the
+    input flamegraph.pl and speedscope take) and a table of each function's
+    self and cumulative time (`.txt`).
+    """
+    def __init__(self, logger, output_dir=PROFILE_DIR, interval=PROFILE_INTERVAL):
+        self.logger = logger
+        self.output_dir = output_dir
+        self.interval = interval
+        self._labels = {}  # code object -> "function (file:line)"
+        self._stop = threading.Event()
+        self._thread = None
+        self._lock = threading.RLock()  # start() can be re-entered from a signal handler
+
+    @property
+    def running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self, duration=PROFILE_DURATION):
+        """Start sampling for `duration` seconds; False if a profile is already running"""
+        with self._lock:
+            if self.running:
+                return False
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, args=(duration,), name="profiler", daemon=True)
+            self._thread.start()
+        return True
+
+    def stop(self):
+        """End the running profile early (its files are still written)"""
+        self._stop.set()
+
+    def toggle(self, duration=PROFILE_DURATION):
+        if not self.start(duration):
+            self.stop()
+
+    def _run(self, duration):
+        # Logged from here rather than start(), which may be running in a signal handler
+        self.logger.info(f"PROFILE started for {duration:g}s, sampling every {self.interval * 1000:g} ms")
+        stacks = Counter()
+        rounds = 0
+        own = threading.get_ident()
+        started = time.monotonic()
+        deadline = started + duration
+        while not self._stop.is_set() and time.monotonic() < deadline:
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():
+                if ident != own:
+                    stacks[self._stack(names.get(ident, str(ident)), frame)] += 1
+            rounds += 1
+            self._stop.wait(self.interval)
+        elapsed = time.monotonic() - started
+        try:
+            self._write(stacks, rounds, elapsed)
+        except OSError as e:
+            self.logger.error(f"PROFILE could not be written to {self.output_dir}: {e}")
+
+    def _stack(self, thread_name, frame):
+        """Frame labels from the thread down to the running function"""
+        stack = []
+        while frame is not None:
+            code = frame.f_code
+            label = self._labels.get(code)
+            if label is None:
+                label = self._labels[code] = f"{code.co_name} ({_short_path(code.co_filename)}:{code.co_firstlineno})"
+            stack.append(label)
+            frame = frame.f_back
+        stack.append(thread_name)
+        return tuple(reversed(stack))
+
+    def _write(self, stacks, rounds, elapsed):
+        os.makedirs(self.output_dir, exist_ok=True)
+        base = os.path.join(self.output_dir, f"profile-{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}")
+        with open(base + ".collapsed", "w") as f:
+            for stack, count in stacks.most_common():
+                # Semicolons separate frames in this format
+                f.write(";".join(frame.replace(";", ":") for frame in stack) + f" {count}\n")
+
+        # Each sample stands for one sampling round's worth of wall time
+        per_sample = elapsed / rounds if rounds else 0.0
+        leaf, total = Counter(), Counter()
+        for stack, count in stacks.items():
+            leaf[stack[-1]] += count
+            for frame in set(stack[1:]):  # once per stack, however deep the recursion
+                total[frame] += count
+        with open(base + ".txt", "w") as f:
+            f.write(f"{rounds} samples of every thread over {elapsed:.1f}s ({per_sample * 1000:.1f} ms each); "
+                    f"times are wall time summed over threads\n")
+            f.write(f"{'self s':>10} {'total s':>10}  function\n")
+            for frame, count in total.most_common():
+                f.write(f"{leaf[frame] * per_sample:>10.3f} {count * per_sample:>10.3f}  {frame}\n")
+        self.logger.info(f"PROFILE written to {base}.collapsed and {base}.txt ({rounds} samples, {elapsed:.1f}s)")
+
+def _short_path(filename):
+    """Path relative to site-packages, the standard library or the working directory, when it's under one"""
+    head, sep, tail = filename.rpartition("site-packages" + os.sep)
+    if sep:
+        return tail
+    for root in (_STDLIB, os.getcwd()):
+        if filename.startswith(root + os.sep):
+            return os.path.relpath(filename, root)
+    return filename
+
+def profile_on_signal(logger, signum=signal.SIGUSR1):
+    """A SamplingProfiler that `kill -USR1 <pid>` starts (and, while it runs, stops early); main thread only"""
+    profiler = SamplingProfiler(logger)
+    signal.signal(signum, lambda signum, frame: profiler.toggle())
+    return profiler
\ No newline at end of file
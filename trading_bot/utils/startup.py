@@ -0,0 +1,66 @@
+import importlib
+import threading
+import time
+from concurrent.futures import Future
+from contextlib import contextmanager
+
+def preload(*modules):
+    """Import modules ahead of first use, e.g. from a background thread"""
+    for module in modules:
+        importlib.import_module(module)
+
+class StartupTimer:
+    """Times the phases of startup, some of which run at the same time.
+
+    Times are seconds since `started` (taken at the top of main.py, before
+    the imports), so the report shows both how long each phase took and
+    when it finished relative to process start.
+    """
+    def __init__(self, started=None):
+        self.started = started if started is not None else time.monotonic()
+        self.phases = []  # (name, began, ended)
+        self._lock = threading.Lock()
+
+    def record(self, name, began, ended=None):
+        """Record a phase from monotonic times"""
+        ended = ended if ended is not None else time.monotonic()
+        with self._lock:
+            self.phases.append((name, began - self.started, ended - self.started))
+
+    @contextmanager
+    def phase(self, name):
+        began = time.monotonic()
+        try:
+            yield
+        finally:
+            self.record(name, began)
+
+    def run(self, name, fn, *args):
+        """Run fn(*args) as a phase on its own thread; returns a Future for its result"""
+        future = Future()
+
+        def target():
+            try:
+                with self.phase(name):
+                    result = fn(*args)
+            except BaseException as e:
+                future.set_exception(e)
+            else:
+                future.set_result(result)
+
+        threading.Thread(target=target, name=f"startup-{name}", daemon=True).start()
+        return future
+
+    def elapsed_ms(self):
+        return (time.monotonic() - self.started) * 1000
+
+    def report(self, logger, budget_ms):
+        """Log the time to ready and each phase, warning if it took longer than budget_ms"""
+        elapsed = self.elapsed_ms()
+        with self._lock:
+            phases = sorted(self.phases, key=lambda phase: phase[2])
+        breakdown = " | ".join(f"{name} {(ended - began) * 1000:.0f} ms (done at {ended * 1000:.0f})"
+                               for name, began, ended in phases)
+        log = logger.warning if elapsed > budget_ms else logger.info
+        log(f"READY TO TRADE in {elapsed:.0f} ms{' (over budget)' if elapsed > budget_ms else ''}: {breakdown}")
+        return elapsed
\ No newline at end of file